@@ -0,0 +1,91 @@
+# benchmarks/bench_context.py
+# Ingests the announcement cycle of N things into an IoTContext, then replays it
+# to measure the cost of re-announcements. Run from the serviceIDE folder:
+#   python -m benchmarks.bench_context --things 10000 --cycles 3
+import argparse
+import threading
+import time
+
+from models.base_classes import IoTContext
+from service_discover.processor import process_tweet
+from benchmarks.bench_listener import make_thing_tweets
+
+
+def ingest(context, tweets, addr):
+    start = time.perf_counter()
+    for tweet in tweets:
+        process_tweet(tweet, addr, context=context)
+    return time.perf_counter() - start
+
+
+def reader(context, stop, counter):
+    """Iterates the registry like the GUI tabs do, to check that readers are never broken by writers"""
+    while not stop.is_set():
+        for thing in context.get_things():
+            for entity in thing.entities:
+                len(entity.services)
+        len(context.get_services())
+        len(context.get_relationships())
+        counter[0] += 1
+
+
+def follower(context, stop, counter, errors):
+    """Follows the registry through changes_since like the incremental refresh of the GUI tabs"""
+    seen = 0
+    try:
+        while not stop.is_set():
+            version = context.version
+            changes = context.changes_since(seen)
+            seen = version if changes is None else seen + len(changes)
+            counter[0] += 1
+    except Exception as e:
+        errors.append(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IoTContext ingest benchmark")
+    parser.add_argument("--things", type=int, default=10000)
+    parser.add_argument("--cycles", type=int, default=3, help="re-announcement cycles after the first one")
+    parser.add_argument("--readers", type=int, default=1,
+                        help="threads reading the registry during ingest, and as many following changes_since")
+    args = parser.parse_args()
+
+    addr = ("10.0.0.1", 1235)
+    tweets = [t for i in range(args.things) for t in make_thing_tweets(i)]
+    context = IoTContext()
+    stop = threading.Event()
+    reads = [0]
+    follows = [0]
+    errors = []
+    readers = [threading.Thread(target=reader, args=(context, stop, reads), daemon=True) for _ in range(args.readers)]
+    readers += [threading.Thread(target=follower, args=(context, stop, follows, errors), daemon=True)
+                for _ in range(args.readers)]
+    for t in readers:
+        t.start()
+
+    elapsed = ingest(context, tweets, addr)
+    print(f"first announcement: {len(tweets)} tweets in {elapsed:.3f}s "
+          f"({1e6 * elapsed / len(tweets):.1f} us/tweet)")
+    for cycle in range(1, args.cycles + 1):
+        elapsed = ingest(context, tweets, addr)
+        print(f"re-announcement {cycle}: {len(tweets)} tweets in {elapsed:.3f}s "
+              f"({1e6 * elapsed / len(tweets):.1f} us/tweet)")
+
+    stop.set()
+    for t in readers:
+        t.join()
+    print(f"snapshot reads during ingest: {reads[0]}")
+    print(f"changes_since reads during ingest: {follows[0]}, errors: {len(errors)}")
+    if errors:
+        print(f"first error: {errors[0]!r}")
+    print(f"things={len(context.get_things())} services={len(context.get_services())} "
+          f"relationships={len(context.get_relationships())}")
+
+    start = time.perf_counter()
+    context.evict_stale(ttl=0.0, now=time.monotonic() + 1.0)
+    elapsed = time.perf_counter() - start
+    print(f"eviction of every thing: {1e3 * elapsed:.1f} ms, things left={len(context.get_things())}")
+
+
+if __name__ == "__main__":
+    main()
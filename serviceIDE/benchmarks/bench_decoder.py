@@ -0,0 +1,86 @@
+# benchmarks/bench_decoder.py
+# Compares the tweet decoder with the previous path (utf-8 decode, regex repair of the API field
+# on every datagram, json.loads) on a corpus of valid, Atlas-misquoted and malformed datagrams.
+# Run from the serviceIDE folder:
+#   python -m benchmarks.bench_decoder --rounds 20000
+import argparse
+import json
+import re
+import time
+
+from service_discover.processor import TWEET_TYPES
+from service_discover.tweet_decoder import decode_tweet, TweetDecodeError
+from benchmarks.bench_listener import make_thing_tweets
+
+
+def legacy_fix_invalid_json(json_str):
+    """The repair previously applied by TweetListener to every datagram"""
+    def escape_quotes(match):
+        field_content = match.group(1).replace('"', r'\"')
+        return f'"API": "{field_content}"'
+    return re.sub(r'"API"\s*:\s*"([^"]+:\[.*?\]\:\(.*?\))"', escape_quotes, json_str)
+
+
+def legacy_decode(data):
+    return json.loads(legacy_fix_invalid_json(data.decode('utf-8')))
+
+
+def new_decode(data):
+    return decode_tweet(data, TWEET_TYPES)
+
+
+def build_corpus():
+    valid = [json.dumps(t).encode('utf-8') for i in range(20) for t in make_thing_tweets(i)]
+    misquoted = [
+        b'{"Tweet Type": "Service", "Name": "CheckFlameStatus", "Thing ID": "MySmartThing01", '
+        b'"Entity ID": "FlameAlarm01", "Space ID": "MySmartSpace", "Vendor": "", '
+        b'"API": "CheckFlameStatus:[NULL]:("flameStatus",int, NULL)", "Type": "Report", '
+        b'"AppCategory": "Safety", "Description": "flame sensor", "Keywords": "flame,sensor,monitoring"}',
+        b'{"Tweet Type": "Service", "Name": "SetLevel", "Thing ID": "MySmartThing01", '
+        b'"Entity ID": "Dimmer01", "Space ID": "MySmartSpace", '
+        b'"API": "SetLevel:["level",int,"NULL"]:("ok",bool,"NULL")", "Type": "Action"}',
+    ]
+    malformed = [
+        b'\x00\x17\xfe\xff' * 64,
+        b'GET / HTTP/1.1\r\nHost: 232.1.1.1\r\n\r\n',
+        b'{"Tweet Type": "Identity_Thing", "Thing ID": "Broken"',
+        b'{"unexpected": "object without a type"}',
+        b'{"Tweet Type": "Discovery_Probe", "Probe ID": "abc", "Space ID": "*"}',
+        b'{"Tweet Type": "Identity_Thing", "Name": "' + b'x' * 9000 + b'"}',
+    ]
+    return valid, misquoted, malformed
+
+
+def run(decoder, corpus, rounds):
+    ok = failed = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for data in corpus:
+            try:
+                if decoder(data) is not None:
+                    ok += 1
+            except (TweetDecodeError, ValueError):
+                failed += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, ok, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tweet decoder micro-benchmark")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    valid, misquoted, malformed = build_corpus()
+    sets = [("valid", valid), ("misquoted API", misquoted), ("malformed", malformed),
+            ("mixed", valid + misquoted + malformed)]
+    for name, corpus in sets:
+        rounds = max(1, args.rounds * 100 // (len(corpus) * 10))
+        count = rounds * len(corpus)
+        print(f"{name} ({len(corpus)} datagrams x {rounds}):")
+        for label, decoder in (("legacy", legacy_decode), ("decoder", new_decode)):
+            elapsed, ok, failed = run(decoder, corpus, rounds)
+            print(f"  {label:8} {1e6 * elapsed / count:6.2f} us/datagram  decoded={ok} rejected={failed}")
+
+
+if __name__ == "__main__":
+    main()
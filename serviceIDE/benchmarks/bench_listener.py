@@ -0,0 +1,114 @@
+# benchmarks/bench_listener.py
+# Replays Atlas tweets through several mock_tweeter-style senders and reports how many
+# the TweetListener ingested. Run from the serviceIDE folder:
+#   python -m benchmarks.bench_listener --rate 5000 --senders 4 --duration 5
+import argparse
+import json
+import socket
+import threading
+import time
+
+from service_discover.server import TweetListener
+
+
+def make_thing_tweets(index, space_id="BenchSpace"):
+    """Builds the same announcement cycle sent by mock_tweeter for a numbered thing"""
+    thing_id = f"BenchThing{index}"
+    entity_id = f"TempSensor{index}"
+    return [
+        {
+            "Tweet Type": "Identity_Thing", "Thing ID": thing_id, "Space ID": space_id,
+            "Name": f"RaspberryPi{index}", "Model": "ZeroW", "Vendor": "RaspberryPiCo", "Owner": "TestLab",
+            "Description": "Benchmark unit", "OS": "Raspbian Lite"
+        },
+        {
+            "Tweet Type": "Identity_Language", "Thing ID": thing_id, "Space ID": space_id,
+            "Network Name": "BenchNet", "Communication Language": "Sockets", "IP": "0.0.0.0", "Port": "6668"
+        },
+        {
+            "Tweet Type": "Identity_Entity", "Thing ID": thing_id, "Space ID": space_id,
+            "Name": "TemperatureSensor", "ID": entity_id, "Type": "Sensor", "Owner": "", "Vendor": "",
+            "Description": "Temp sensor"
+        },
+        {
+            "Tweet Type": "Service", "Name": "GetTemperature", "Thing ID": thing_id, "Entity ID": entity_id,
+            "Space ID": space_id, "Vendor": "", "API": "GetTemperature:[NULL]:(temperature,float,NULL)",
+            "Type": "Report", "AppCategory": "Environment", "Description": "Reads temperature", "Keywords": "temperature"
+        },
+        {
+            "Tweet Type": "Relationship", "Thing ID": thing_id, "Space ID": space_id,
+            "Name": "TempControl", "Owner": "", "Category": "Assistive", "Type": "regulate",
+            "Description": "", "FS name": "GetTemperature", "SS name": "CalibrateSensor"
+        }
+    ]
+
+
+def sender(target, payloads, rate, duration, sent_counter, lock):
+    """Sends payloads round-robin at a fixed rate using deadline pacing"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    sent = 0
+    while True:
+        deadline = start + sent * interval
+        if deadline - start >= duration:
+            break
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sock.sendto(payloads[sent % len(payloads)], target)
+        sent += 1
+    sock.close()
+    with lock:
+        sent_counter[0] += sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TweetListener ingest benchmark")
+    parser.add_argument("--group", default="232.1.1.1")
+    parser.add_argument("--port", type=int, default=41235)
+    parser.add_argument("--rate", type=int, default=4000, help="total tweets per second")
+    parser.add_argument("--senders", type=int, default=4)
+    parser.add_argument("--things", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--rcvbuf", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--unicast", action="store_true", help="send to 127.0.0.1 instead of the multicast group")
+    args = parser.parse_args()
+
+    listener = TweetListener(multicast_group=args.group, port=args.port, rcvbuf_size=args.rcvbuf, verbose=False)
+    listener.start()
+
+    payloads = [json.dumps(t).encode("utf-8")
+                for i in range(args.things) for t in make_thing_tweets(i)]
+    target = ("127.0.0.1" if args.unicast else args.group, args.port)
+    sent_counter = [0]
+    lock = threading.Lock()
+    per_sender_rate = args.rate / args.senders
+    threads = [threading.Thread(target=sender, args=(target, payloads[i::args.senders], per_sender_rate,
+                                                      args.duration, sent_counter, lock))
+               for i in range(args.senders)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    # Give the listener time to drain what is still queued in the socket buffer
+    time.sleep(1.0)
+    listener.stop()
+
+    stats = listener.get_stats()
+    sent = sent_counter[0]
+    lost = sent - stats["received"]
+    print(f"sent={sent} received={stats['received']} processed={stats['processed']} "
+          f"lost={lost} ({100.0 * lost / max(sent, 1):.2f}%)")
+    print(f"kernel_drops={stats['kernel_drops']} dropped={stats['dropped']} truncated={stats['truncated']} "
+          f"overruns={stats['overruns']} batches={stats['batches']} rcvbuf={stats['rcvbuf_size']}")
+    print(f"ingest rate: {stats['processed'] / elapsed:.0f} tweets/s over {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
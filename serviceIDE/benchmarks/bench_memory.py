@@ -0,0 +1,99 @@
+# benchmarks/bench_memory.py
+# Reports the memory retained per service for a fleet of discovered services, comparing the
+# previous model (plain dataclass, own dict of inputs, one copy of every string per service)
+# with the current slotted one. Run from the serviceIDE folder:
+#   python -m benchmarks.bench_memory --services 50000
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from models.api_signature import parse_api_string
+from models.base_classes import Service
+
+APIS = [
+    "GetTemperature:[NULL]:(temperature,float,NULL)",
+    'SetLevel:["level",int,"NULL"]:("ok",bool,"NULL")',
+    'SetColor:["red",int,"NULL"|"green",int,"NULL"|"blue",int,"NULL"]:(NULL)',
+    "CheckFlameStatus:[NULL]:(flameStatus,int, NULL)",
+]
+
+
+@dataclass
+class LegacyService:
+    """Service as it was before slots and interning"""
+    name: str
+    thing_name: str
+    entity_id: str
+    space_id: str
+    endpoint: str
+    ip: Any
+    input_params: Dict[str, str] = field(default_factory=dict)
+    output_name: Optional[str] = None
+    output_type: Optional[str] = None
+    type: str = ""
+    app_category: str = ""
+    description: str = ""
+    keywords: str = ""
+    port: Optional[int] = None
+
+
+def service_tweets(count):
+    """Decoded Service tweets: like the listener output, every string is a fresh object"""
+    for i in range(count):
+        thing = i // 4
+        yield json.loads(json.dumps({
+            "Tweet Type": "Service", "Name": f"Service{i % 4}", "Thing ID": f"BenchThing{thing}",
+            "Entity ID": f"Sensor{thing}", "Space ID": "BenchSpace", "API": APIS[i % len(APIS)],
+            "Type": "Report" if i % 2 else "Action", "AppCategory": "Environment",
+            "Description": "Bench service", "Keywords": "temperature,monitoring",
+            "IP": f"10.0.{thing % 256}.{thing % 200}",
+        }))
+
+
+def build_legacy(tweet):
+    signature = parse_api_string(tweet["API"])
+    return LegacyService(tweet["Name"], tweet["Thing ID"], tweet["Entity ID"], tweet["Space ID"],
+                         signature.endpoint, tweet["IP"], dict(signature.input_params), signature.output_name,
+                         signature.output_type, tweet["Type"], tweet["AppCategory"], tweet["Description"],
+                         tweet["Keywords"])
+
+
+def build_current(tweet):
+    return Service.from_api_string(tweet["Name"], tweet["Thing ID"], tweet["Entity ID"], tweet["Space ID"],
+                                   tweet["API"], tweet["IP"], tweet["Type"], tweet["AppCategory"],
+                                   tweet["Description"], tweet["Keywords"])
+
+
+def measure(build, count):
+    """Bytes retained per service once the decoded tweets are gone"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    services = [build(tweet) for tweet in service_tweets(count)]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del services
+    return retained / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per service benchmark")
+    parser.add_argument("--services", type=int, default=20000)
+    args = parser.parse_args()
+
+    for api in APIS:
+        parse_api_string(api)  # keep the parse cache out of the measure
+    legacy = measure(build_legacy, args.services)
+    current = measure(build_current, args.services)
+    print(f"{args.services} services")
+    print(f"  before (dataclass, dict inputs, string copies): {legacy:7.0f} bytes/service")
+    print(f"  after  (slots, interned strings, shared inputs): {current:7.0f} bytes/service")
+    print(f"  saved: {100 * (1 - current / legacy):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
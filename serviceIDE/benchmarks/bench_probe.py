@@ -0,0 +1,92 @@
+# benchmarks/bench_probe.py
+# Measures the time-to-full-inventory after a discovery probe: N stand-in things answer the probe
+# with their announcement cycle and the DiscoveryService ingests it. Run from the serviceIDE folder:
+#   python -m benchmarks.bench_probe --things 50 --loss 0.2
+import argparse
+import json
+import random
+import socket
+import time
+
+from models.base_classes import IoTContext
+from service_discover.async_server import DiscoveryService
+from service_discover.probe import DiscoveryProbe, ProbeResponder
+from benchmarks.bench_listener import make_thing_tweets
+
+PASSIVE_INTERVAL = 120.0  # mock_tweeter TWEET_INTERVAL, the worst case without probes
+
+
+class LossyResponder(ProbeResponder):
+    """Loses a fraction of the probes, to exercise the retransmissions"""
+
+    def __init__(self, loss, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loss = loss
+
+    def handle(self, data):
+        if random.random() < self.loss:
+            return False
+        return super().handle(data)
+
+
+def make_announcer(sock, target, index):
+    payloads = [json.dumps(t).encode('utf-8') for t in make_thing_tweets(index)]
+
+    def announce():
+        for payload in payloads:
+            sock.sendto(payload, target)
+    return announce
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discovery probe benchmark")
+    parser.add_argument("--things", type=int, default=50)
+    parser.add_argument("--group", default="232.1.1.1")
+    parser.add_argument("--port", type=int, default=1299, help="use a port no real thing announces on")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of probes each thing misses")
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    target = (args.group, args.port)
+    context = IoTContext()
+    discovery = DiscoveryService([target], context=context)
+    discovery.start_in_background()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    responders = [LossyResponder(args.loss, make_announcer(sock, target, i), args.group, args.port,
+                                 poll_timeout=0.1) for i in range(args.things)]
+    for responder in responders:
+        responder.start()
+    time.sleep(0.5)  # let every responder join the group
+
+    probe = DiscoveryProbe(args.group, args.port, attempts=args.attempts)
+    start = time.perf_counter()
+    probe.start()
+    elapsed = None
+    while time.perf_counter() - start < args.timeout:
+        if len(context.get_services()) == args.things and len(context.get_relationships()) == args.things:
+            elapsed = time.perf_counter() - start
+            break
+        time.sleep(0.001)
+
+    if elapsed is None:
+        print(f"incomplete inventory after {args.timeout:.1f}s: things={len(context.get_things())}/{args.things}")
+    else:
+        print(f"full inventory of {args.things} things in {1e3 * elapsed:.1f} ms "
+              f"(passive discovery: up to {PASSIVE_INTERVAL:.0f}s)")
+    probe.stop(timeout=5.0)
+    totals = {key: sum(r.stats[key] for r in responders) for key in responders[0].stats}
+    print(f"probes sent={probe.stats['sent']} responder stats={totals}")
+    print(f"discovery stats={discovery.get_stats()}")
+
+    for responder in responders:
+        responder.stop()
+    discovery.shutdown()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -55,8 +55,9 @@ class GraphicalAppEditor(ctk.CTkToplevel):
         self.service_listbox.pack(side=tk.LEFT, fill=tk.BOTH)
         scrollbar.config(command=self.service_listbox.yview)
 
-        # Populate the service list
-        for svc in self.context.get_services():
+        # Populate the service list, kept as shown since the sweeper may evict services meanwhile
+        self.listed_services = self.context.get_services()
+        for svc in self.listed_services:
             self.service_listbox.insert(tk.END, svc.name)
 
         self.service_listbox.bind("<Double-Button-1>", self.add_service_node)
@@ -158,7 +159,7 @@ class GraphicalAppEditor(ctk.CTkToplevel):
         if not line_index:
             return
 
-        svc = self.context.get_services()[line_index[0]]
+        svc = self.listed_services[line_index[0]]
         service_instance = ServiceInstance.create_from_service(svc)
         # Calculate automatic position
         x = self.BASE_X
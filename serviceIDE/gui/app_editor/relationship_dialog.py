@@ -4,6 +4,7 @@ import tkinter as tk
 from models.base_classes import Relationship # Assuming Relationship is in models/model.py
 from models.relationship_instance import RelationshipInstance
 from models.service_instance import ServiceInstance  # Assuming ServiceInstance is in models/service_instance.py
+from models.condition import ConditionError, compile_condition
 
 class RelationshipDialog(ctk.CTkToplevel):
     def __init__(self, master, src_node, dst_node, relationship_creation_counter_ref, on_confirm):
@@ -72,11 +73,13 @@ class RelationshipDialog(ctk.CTkToplevel):
             messagebox.showerror("Error", "Enter a valid condition.", parent=self)
             return
 
-        if (rel_type == "condition" and condition and
-            not any(condition.startswith(op) for op in ["<", ">", "==", "<=", ">=", "!="])):
-            messagebox.showerror("Error",
-                               "The condition must start with one of <, >, ==, <=, >=, !=", parent=self)
-            return
+        if rel_type == "condition":
+            try:
+                compile_condition(condition)
+            except ConditionError as e:
+                messagebox.showerror("Error", f"{e}\n\nExamples: > 20.5, in [18, 22], == open, "
+                                              f">= 0 and not == 3", parent=self)
+                return
 
         # Increment the counter and get its value
         self.relationship_creation_counter_ref[0] += 1
@@ -1,18 +1,11 @@
-def configure_things_text_tags(text_widget):
+def configure_things_tree_tags(tree):
     # Titolo della thing
-    text_widget.tag_config("title", font=("Arial", 16, "bold"), foreground="#2a4d69")
-    # Indirizzo (address)
-    text_widget.tag_config("address", font=("Consolas", 14, "bold"), foreground="#4fc3f7")
-    # Descrizione (description)
-    text_widget.tag_config("description", font=("Consolas", 14, "italic"), foreground="#000000")
+    tree.tag_configure("title", font=("Arial", 15, "bold"), foreground="#2a4d69")
     # Entities
-    text_widget.tag_config("entity", font=("Consolas", 14, "bold"), foreground="#36db31")
+    tree.tag_configure("entity", font=("Consolas", 13, "bold"), foreground="#36db31")
     # Nessun servizio
-    text_widget.tag_config("warn", foreground="#d9534f")
+    tree.tag_configure("warn", foreground="#d9534f")
     #servizio
-    text_widget.tag_config("service", font=("Consolas", 14, "bold"), foreground="#e43731")
-
-    # Spaziatore
-    text_widget.tag_config("spacer", spacing1=5)
-    
-    
\ No newline at end of file
+    tree.tag_configure("service", font=("Consolas", 13, "bold"), foreground="#e43731")
+    # Caricato dalla cache, in attesa di un nuovo annuncio (configurato per ultimo: ha la precedenza)
+    tree.tag_configure("stale", foreground="#9a9a9a")
@@ -9,7 +9,10 @@ from models.base_classes import Service, Relationship
 from gui.app_editor.graphical_app_editor import GraphicalAppEditor
 from models.iot_app import IoTApp
 from service_discover.api_caller import invoke_iot_app
+from gui.tabs.trace_viewer import TraceViewer
+from gui.tabs.log_pipeline import LogPipeline
 import threading
+import queue
 
 def read_workdir_from_file():
     config_path = os.path.join(os.path.dirname(__file__), "workdir_path")
@@ -49,6 +52,7 @@ def create_apps_tab(master, context):
     prompt_text = tk.Text(prompt_frame, height=20, width=60, font=("Consolas", 14), bg="black", fg="lime", insertbackground="white")
     prompt_text.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
     prompt_text.config(state="disabled")
+    prompt_log = LogPipeline(prompt_text)  # run output, written by the execution thread
     prompt_frame.pack_forget()  # Hide the prompt at startup
 
     def on_finalize_app(app):
@@ -76,6 +80,7 @@ def create_apps_tab(master, context):
         display_app.append(app_to_display.name)
         edit_button.pack(side=tk.TOP, fill=tk.X, pady=5)
         run_stop_button.pack(side=tk.TOP, fill=tk.X, pady=5)
+        timeline_button.pack(side=tk.TOP, fill=tk.X, pady=5)
         save_button.pack(side=tk.TOP, fill=tk.X, pady=5)
 
     def elimnate_display():
@@ -84,6 +89,7 @@ def create_apps_tab(master, context):
         display_app[0] = None
         edit_button.pack_forget()
         run_stop_button.pack_forget()
+        timeline_button.pack_forget()
         save_button.pack_forget()
 
     def show_app_details_from_listbox(event):
@@ -115,16 +121,14 @@ def create_apps_tab(master, context):
             # Start the app
             if selected_app[0]:
                 prompt_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(40, 0))
-                prompt_text.config(state="normal")
-                prompt_text.delete("1.0", tk.END)
-                prompt_text.config(state="disabled")
+                prompt_log.clear()
                 stop_flag[0]["stop"] = False
 
                 def app_runner():
                     invoke_iot_app(
                         selected_app[0],
-                        write_fn=lambda text: write_to_prompt(prompt_text, text),
-                        input_fn=lambda msg: get_user_input(prompt_text, msg),
+                        write_fn=prompt_log.write,
+                        input_fn=lambda msg: get_user_input(prompt_text, msg, prompt_log),
                         stop_flag=stop_flag[0]
                     )
                     prompt_text.configure(state="disabled")
@@ -140,6 +144,10 @@ def create_apps_tab(master, context):
             is_running[0] = False
             run_stop_button.configure(text="▶️ Run App", fg_color="#1ab126", hover_color="#179922", text_color="#ffffff")
 
+    def show_timeline():
+        if selected_app[0]:
+            TraceViewer(master, selected_app[0].name)
+
     apps_listbox.bind("<<ListboxSelect>>", show_app_details_from_listbox)
 
     buttons_frame = tk.Frame(frame, bg="#f0f0f0")
@@ -151,58 +159,60 @@ def create_apps_tab(master, context):
     ctk.CTkButton(buttons_frame, text="✨ Start New App", command=start_new_app).pack(side=tk.TOP, fill=tk.X, pady=5)
     edit_button = ctk.CTkButton(buttons_frame, text="✏️ Edit App", fg_color="#5c1ea3", hover_color="#3e0b79", text_color="#ffffff", command=edit_selected_app)
     run_stop_button = ctk.CTkButton(buttons_frame, text="▶️ Run App", fg_color="#1ab126", hover_color="#179922", text_color="#ffffff", command=run_or_stop_app)    
+    timeline_button = ctk.CTkButton(buttons_frame, text="📊 Run Timeline", fg_color="#2a4d69", hover_color="#1b3347", text_color="#ffffff", command=show_timeline)
     save_button = ctk.CTkButton(buttons_frame, text="💾 Save App", command=lambda: save_selected_app(selected_app[0], workdir[0]))
 
     # Hidden by default
     edit_button.pack_forget()
     run_stop_button.pack_forget()
+    timeline_button.pack_forget()
     save_button.pack_forget()
     set_workdir_button.pack(side=tk.TOP, fill=tk.X, pady=5)
 
     return frame
 
 def write_to_prompt(prompt_widget, text):
-    """Helper function to write text to prompt widget and scroll to end"""
+    """Helper function to write text to prompt widget and scroll to end, Tk thread only"""
     prompt_widget.config(state="normal")
     prompt_widget.insert(tk.END, text)
     prompt_widget.see(tk.END)
-    prompt_widget.update()
     prompt_widget.config(state="normal")
     
-def get_user_input(prompt_widget, message):
-    # Enable the prompt for input
-    prompt_widget.config(state="disabled")
-    write_to_prompt(prompt_widget, f"$ {message}")
-
-    user_input = [None]
-    input_complete = [False]
+def get_user_input(prompt_widget, message, log=None):
+    """
+    Called from the execution thread: sets up the prompt on the Tk thread and
+    blocks on a queue until the user presses Return, without polling the widget.
+    The output still queued in `log` is written before the prompt.
+    """
+    answer = queue.Queue(maxsize=1)
+    prompt_start = f"$ {message}"
 
     def on_key_press(event):
         if event.keysym == 'Return':
             content = prompt_widget.get("1.0", tk.END)
             lines = content.strip().split('\n')
             last_line = lines[-1] if lines else ""
-            prompt_start = f"$ {message}"
             if last_line.startswith(prompt_start):
-                user_input[0] = last_line[len(prompt_start):].strip()
+                value = last_line[len(prompt_start):].strip()
             else:
-                user_input[0] = last_line.strip()
-            input_complete[0] = True
+                value = last_line.strip()
             write_to_prompt(prompt_widget, "\n")
+            prompt_widget.unbind("<KeyPress-Return>")
+            # Return to read-only after input
+            prompt_widget.config(state="disabled")
+            answer.put(value)
             return "break"
 
-    prompt_widget.bind("<KeyPress-Return>", on_key_press)
-    prompt_widget.focus_set()
-
-    while not input_complete[0]:
-        prompt_widget.update()
-        prompt_widget.after(50)
-
-    prompt_widget.unbind("<KeyPress-Return>")
-    # Return to read-only after input
-    prompt_widget.config(state="disabled")
+    def show_prompt():
+        if log is not None:
+            log.flush()
+        # Enable the prompt for input
+        write_to_prompt(prompt_widget, prompt_start)
+        prompt_widget.bind("<KeyPress-Return>", on_key_press)
+        prompt_widget.focus_set()
 
-    return user_input[0] if user_input[0] is not None else ""
+    prompt_widget.after(0, show_prompt)
+    return answer.get()
 
 def choose_workdir(workdir_ref):
     """Opens the file dialog to choose the working directory"""
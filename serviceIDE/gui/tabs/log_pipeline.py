@@ -0,0 +1,100 @@
+import time
+import tkinter as tk
+from collections import deque
+
+DEFAULT_MAX_LINES = 5000        # scrollback kept in the Text widget, older lines are dropped
+DEFAULT_MAX_PENDING = 10000     # messages waiting for the UI, the oldest are dropped beyond it
+DEFAULT_INTERVAL_MS = 50        # drain period while there is nothing to catch up
+DEFAULT_FRAME_BUDGET = 0.008    # seconds of Tk time a drain may use before yielding to the event loop
+
+
+class LogPipeline:
+    """
+    Log output for a Text widget written from any thread.
+    Producers only append to a deque (append and popleft are atomic, no lock is shared with the UI);
+    the Tk thread drains it every interval_ms, inserting consecutive messages as one block
+    and stopping when the frame budget is spent so the GUI stays responsive during floods.
+    The widget keeps the last max_lines lines, and scrolls down only if it was showing the end.
+    Must be created on the Tk thread.
+    """
+
+    def __init__(self, widget, max_lines=DEFAULT_MAX_LINES, max_pending=DEFAULT_MAX_PENDING,
+                 interval_ms=DEFAULT_INTERVAL_MS, frame_budget=DEFAULT_FRAME_BUDGET):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self.frame_budget = frame_budget
+        self.stats = {"written": 0, "dropped": 0, "batches": 0, "trimmed_lines": 0}
+        self._pending = deque(maxlen=max_pending)
+        self._lines = int(widget.index("end-1c").split(".")[0])
+        self._closed = False
+        widget.after(interval_ms, self._drain)
+
+    def write(self, text, tag=None):
+        """Queues text for the widget, safe from any thread"""
+        if len(self._pending) == self._pending.maxlen:
+            self.stats["dropped"] += 1
+        self._pending.append((text, tag))
+
+    def flush(self):
+        """Writes everything pending right away, Tk thread only"""
+        self._insert(budget=None)
+
+    def clear(self):
+        """Drops the pending messages and empties the widget, Tk thread only"""
+        self._pending.clear()
+        state = self.widget.cget("state")
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state=state)
+        self._lines = 1
+
+    def close(self):
+        self._closed = True
+
+    def _insert(self, budget):
+        if not self._pending:
+            return
+        widget = self.widget
+        deadline = time.perf_counter() + budget if budget is not None else None
+        at_end = widget.yview()[1] >= 0.999
+        state = widget.cget("state")
+        widget.config(state=tk.NORMAL)
+        block, block_tag, count = [], None, 0
+        while self._pending:
+            text, tag = self._pending.popleft()
+            if block and tag != block_tag:
+                widget.insert(tk.END, "".join(block), block_tag)
+                block = []
+            block.append(text)
+            block_tag = tag
+            self._lines += text.count("\n")
+            count += 1
+            if deadline is not None and count % 64 == 0 and time.perf_counter() > deadline:
+                break
+        if block:
+            widget.insert(tk.END, "".join(block), block_tag)
+        if self._lines > self.max_lines:
+            excess = self._lines - self.max_lines
+            widget.delete("1.0", f"{excess + 1}.0")
+            self._lines -= excess
+            self.stats["trimmed_lines"] += excess
+        widget.config(state=state)
+        if at_end:
+            widget.see(tk.END)
+        self.stats["written"] += count
+        self.stats["batches"] += 1
+
+    def _drain(self):
+        if self._closed:
+            return
+        try:
+            self._insert(self.frame_budget)
+            # Still behind: come back as soon as the event loop has handled the other events
+            self.widget.after(1 if self._pending else self.interval_ms, self._drain)
+        except tk.TclError:
+            self._closed = True  # the widget was destroyed
+
+    def get_stats(self):
+        """Returns a copy of the counters with the current backlog"""
+        return dict(self.stats, pending=len(self._pending), lines=self._lines)
@@ -1,42 +1,65 @@
 import tkinter as tk
-from tkinter import ttk
+from gui.tabs.tree_view import make_scrollable_tree, item_id
+from models.base_classes import RELATIONSHIP, ADDED, UPDATED, REMOVED
 
-def make_scrollable_text(parent):
-    text_frame = tk.Frame(parent, bg="#f9f9f9")
-    text_widget = tk.Text(text_frame, wrap="word", bg="white", fg="black", font=("Consolas", 14), relief=tk.FLAT)
-    scrollbar = ttk.Scrollbar(text_frame, command=text_widget.yview)
-    text_widget.config(yscrollcommand=scrollbar.set)
-
-    text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-    return text_frame, text_widget
+COLUMNS = [
+    ("name", "Relationship", 180),
+    ("category", "Category", 130),
+    ("type", "Type", 110),
+    ("description", "Description", 380),
+    ("src", "Source", 180),
+    ("dst", "Destination", 180),
+]
 
 
 def create_relationships_tab(master, context):
     frame = tk.Frame(master, bg="#f0f0f0")
-    text_frame, text = make_scrollable_text(frame)
-    text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    tree_frame, tree = make_scrollable_tree(frame, COLUMNS)
+    tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+    status = tk.Label(frame, bg="#f0f0f0", font=("Arial", 13), anchor="w")
+    status.pack(fill=tk.X, padx=10, pady=(0, 10))
+    tree.tag_configure("stale", foreground="#9a9a9a")
+    seen_version = [None]
+
+    def add_relationship(key):
+        rel = context.get_relationship(key)
+        iid = item_id(RELATIONSHIP, key)
+        if rel is None or tree.exists(iid):
+            return
+        tree.insert("", tk.END, iid=iid, values=(f"🔗 {rel.name}", rel.category, rel.type,
+                                                   rel.description, rel.src, rel.dst),
+                    tags=("stale",) if rel.stale else ())
+
+    def reload():
+        tree.delete(*tree.get_children())
+        for rel in context.get_relationships():
+            add_relationship((rel.thing_id, rel.name, rel.src, rel.dst))
 
     def update():
-        text.delete(1.0, tk.END)
-        relationships = context.get_relationships()
-        for rel in relationships:
-            text.insert(tk.END, f"🔗 {rel.name}\n", "title")
-            text.insert(tk.END, f"Category: {rel.category}\n")
-            text.insert(tk.END, f"Type: {rel.type}\n")
-            text.insert(tk.END, f"Description: {rel.description}\n")
-            text.insert(tk.END, f"Source: {rel.src}\n")
-            text.insert(tk.END, f"Destination: {rel.dst}\n")
-            text.insert(tk.END, "-" * 70 + "\n", "separator")
-        if not relationships:
-            text.insert(tk.END, "⚠️ No relationships found, scanning for Things....\n", "warn")
+        # Only the rows touched since the last refresh are re-rendered
+        if seen_version[0] != context.version:
+            version = context.version
+            changes = context.changes_since(seen_version[0]) if seen_version[0] is not None else None
+            if changes is None:
+                reload()
+            else:
+                for action, kind, key in changes:
+                    if kind != RELATIONSHIP:
+                        continue
+                    if action == ADDED:
+                        add_relationship(key)
+                    elif action == UPDATED and tree.exists(item_id(RELATIONSHIP, key)):
+                        rel = context.get_relationship(key)
+                        if rel is not None:
+                            tree.item(item_id(RELATIONSHIP, key), tags=("stale",) if rel.stale else ())
+                    elif action == REMOVED and tree.exists(item_id(RELATIONSHIP, key)):
+                        tree.delete(item_id(RELATIONSHIP, key))
+            seen_version[0] = version
+            if tree.get_children():
+                status.config(text="")
+            else:
+                status.config(text="⚠️ No relationships found, scanning for Things....", fg="#d9534f")
         frame.after(1000, update)
 
-    text.tag_config("title", font=("Arial", 14, "bold"), foreground="#334d5c")
-    text.tag_config("warn", foreground="#d9534f")
-    text.tag_config("separator", foreground="#cccccc")
-
     update()
     return frame
-
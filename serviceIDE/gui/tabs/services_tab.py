@@ -1,55 +1,142 @@
 import tkinter as tk
-from tkinter import ttk
+from gui.tabs.tree_view import make_scrollable_tree, item_id, SortedTree
+from models.base_classes import SERVICE, ADDED, UPDATED, REMOVED
+from service_discover.health import health, CLOSED, OPEN, HALF_OPEN
 
-def make_scrollable_text(parent):
-    text_frame = tk.Frame(parent, bg="#f9f9f9")
-    text_widget = tk.Text(text_frame, wrap="word", bg="white", fg="black", font=("Consolas", 14), relief=tk.FLAT)
-    scrollbar = ttk.Scrollbar(text_frame, command=text_widget.yview)
-    text_widget.config(yscrollcommand=scrollbar.set)
-
-    text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-    return text_frame, text_widget
+COLUMNS = [
+    ("service", "Service", 180),
+    ("thing", "Thing", 150),
+    ("health", "Health", 90),
+    ("entity", "Entity (ID)", 200),
+    ("type", "Type", 80),
+    ("category", "Category", 120),
+    ("endpoint", "Endpoint", 160),
+    ("inputs", "Inputs", 180),
+    ("output", "Output", 150),
+    ("description", "Description", 220),
+    ("keywords", "Keywords", 180),
+    ("space", "Space ID", 130),
+]
 
 
 def create_services_tab(master, context):
     frame = tk.Frame(master, bg="#f0f0f0")
-    text_frame, text = make_scrollable_text(frame)
-    text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    tree_frame, tree = make_scrollable_tree(frame, COLUMNS)
+    tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+    status = tk.Label(frame, bg="#f0f0f0", font=("Arial", 13), anchor="w")
+    status.pack(fill=tk.X, padx=10, pady=(0, 10))
+    tree.tag_configure("stale", foreground="#9a9a9a")
+    tree.tag_configure("down", foreground="#d9534f")
+    tree.tag_configure("probing", foreground="#f0ad4e")
+    rows = SortedTree(tree)
+    seen_version = [None]
+    seen_health = [None]
+    keys = {}  # row iid -> service key
+    stale = set()  # iids of the rows loaded from the discovery cache, not announced yet
+    count = [0]
 
-    def update():
-        text.delete(1.0, tk.END)
-        count = 0
-        for thing in sorted(context.get_things(), key=lambda x: x.name):
-            for entity in sorted(thing.entities, key=lambda e: e.name):
-                for service in sorted(entity.services, key=lambda s: s.name):
-                    count += 1
-                    text.insert(tk.END, f"🔧 Service #{count}: {service.name}\n", "title")
-                    text.insert(tk.END, f"Thing: {service.thing_name} | Entity: {entity.name} (ID: {service.entity_id})\n")
-                    text.insert(tk.END, f"Type: {service.type} | Category: {service.app_category}\n")
-                    inputs = ", ".join([f"{k}: {v}" for k, v in service.input_params.items()]) if service.input_params else "None"
-                    output = f"{service.output_name}: {service.output_type}" if service.output_name and service.output_type else "None"
-                    text.insert(tk.END, f"Endpoint: {service.endpoint} | Inputs: {inputs} | Output: {output}\n")                   
-                    text.insert(tk.END, f"Description: {service.description}\n")
-                    if service.keywords:
-                        if isinstance(service.keywords, str):
-                            keywords_str = service.keywords
-                        else:
-                            keywords_str = ', '.join(service.keywords)
-                        text.insert(tk.END, f"Keywords: {keywords_str}\n")
-                    text.insert(tk.END, f"Space ID: {service.space_id}\n")
-                    text.insert(tk.END, "-" * 80 + "\n", "separator")
-        if count == 0:
-            text.insert(tk.END, "⚠️ No services found, Scanning for Things...\n", "warn")
+    def row_tags(service):
+        state = health.state(service.thing_name)
+        tags = ("stale",) if service.stale else ()
+        if state == OPEN:
+            tags += ("down",)
+        elif state == HALF_OPEN:
+            tags += ("probing",)
+        return tags
+
+    def service_values(service, entity):
+        inputs = ", ".join([f"{k}: {v}" for k, v in service.input_params.items()]) if service.input_params else "None"
+        output = f"{service.output_name}: {service.output_type}" if service.output_name and service.output_type else "None"
+        if service.keywords and not isinstance(service.keywords, str):
+            keywords_str = ', '.join(service.keywords)
         else:
-            text.insert(tk.END, f"Total services: {count}\n", "info")
-        frame.after(1000, update)
+            keywords_str = service.keywords
+        return (service.name, service.thing_name, health.state(service.thing_name),
+                f"{entity.name} ({service.entity_id})", service.type, service.app_category, service.endpoint, inputs, output, service.description,
+                keywords_str, service.space_id)
+
+    def add_service(key):
+        service = context.get_service(*key)
+        entity = context.get_entity(*key[:2])
+        thing = context.get_thing(key[0])
+        iid = item_id(SERVICE, key)
+        if service is None or entity is None or thing is None or rows.exists(iid):
+            return
+        # Same ordering as before: thing name, entity name, service name
+        rows.insert("", iid, (thing.name, entity.name, service.name), values=service_values(service, entity),
+                    tags=row_tags(service))
+        keys[iid] = key
+        if service.stale:
+            stale.add(iid)
+        count[0] += 1
+
+    def remove_service(key):
+        iid = item_id(SERVICE, key)
+        if rows.exists(iid):
+            rows.remove(iid)
+            del keys[iid]
+            stale.discard(iid)
+            count[0] -= 1
 
-    text.tag_config("title", font=("Arial", 14, "bold"), foreground="#1c4966")
-    text.tag_config("warn", foreground="#d9534f")
-    text.tag_config("info", foreground="#5cb85c")
-    text.tag_config("separator", foreground="#aaaaaa")
+    def reload():
+        rows.clear()
+        keys.clear()
+        stale.clear()
+        count[0] = 0
+        for thing in context.get_things():
+            for entity in thing.entities:
+                for service in entity.services:
+                    add_service((thing.id, entity.entity_id, service.name, service.endpoint))
+
+    def update_status():
+        if count[0] == 0:
+            status.config(text="⚠️ No services found, Scanning for Things...", fg="#d9534f")
+        else:
+            suffix = f" ({len(stale)} from cache, waiting for announcements)" if stale else ""
+            down = sorted(thing for thing, state in health.states().items() if state != CLOSED)
+            if down:
+                suffix += f" - unreachable: {', '.join(down)}"
+            status.config(text=f"Total services: {count[0]}{suffix}", fg="#f0ad4e" if down else "#5cb85c")
+
+    def refresh_health():
+        # Breaker states change rarely, every row is checked only when one did
+        for iid, key in keys.items():
+            service = context.get_service(*key)
+            if service is not None:
+                tree.set(iid, "health", health.state(service.thing_name))
+                tree.item(iid, tags=row_tags(service))
+
+    def update():
+        # Only the rows touched since the last refresh are re-rendered
+        if seen_version[0] != context.version:
+            version = context.version
+            changes = context.changes_since(seen_version[0]) if seen_version[0] is not None else None
+            if changes is None:
+                reload()
+            else:
+                for action, kind, key in changes:
+                    if kind != SERVICE:
+                        continue
+                    if action == ADDED:
+                        add_service(key)
+                    elif action == UPDATED and rows.exists(item_id(SERVICE, key)):
+                        service = context.get_service(*key)
+                        if service is not None:
+                            iid = item_id(SERVICE, key)
+                            tree.item(iid, tags=row_tags(service))
+                            if service.stale:
+                                stale.add(iid)
+                            else:
+                                stale.discard(iid)
+                    elif action == REMOVED:
+                        remove_service(key)
+            seen_version[0] = version
+            update_status()
+        if seen_health[0] != health.version:
+            seen_health[0] = health.version
+            refresh_health()
+            update_status()
+        frame.after(1000, update)
 
     update()
     return frame
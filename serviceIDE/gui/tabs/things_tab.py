@@ -1,46 +1,127 @@
 import tkinter as tk
-from tkinter import ttk
-from gui.styles.thing_tab_style import configure_things_text_tags
+from gui.styles.thing_tab_style import configure_things_tree_tags
+from gui.tabs.tree_view import make_scrollable_tree, item_id, SortedTree
+from models.base_classes import THING, ENTITY, SERVICE, ADDED, UPDATED, REMOVED
 
-def make_scrollable_text(parent):
-    text_frame = tk.Frame(parent, bg="#f9f9f9")
-    text_widget = tk.Text(text_frame, wrap="word", bg="white", fg="black", font=("Consolas", 14), relief=tk.FLAT)
-    scrollbar = ttk.Scrollbar(text_frame, command=text_widget.yview)
-    text_widget.config(yscrollcommand=scrollbar.set)
-    
-    text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-    return text_frame, text_widget
+PLACEHOLDER = "placeholder"
 
 def create_things_tab(master, context):
     frame = tk.Frame(master, bg="#f0f0f0")
-    text_frame, text = make_scrollable_text(frame)
-    text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-    configure_things_text_tags(text)
+    tree_frame, tree = make_scrollable_tree(frame, [("details", "Details", 700)], show="tree headings")
+    tree.heading("#0", text="Thing / Entity / Service", anchor="w")
+    tree.column("#0", width=420)
+    tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    configure_things_tree_tags(tree)
+    rows = SortedTree(tree)
+    seen_version = [None]
 
-    def update():
-        text.delete(1.0, tk.END)
-        things = sorted(context.get_things(), key=lambda x: x.name)
+    def thing_details(thing):
+        port = f" | Port: {thing.port}" if thing.port else ""
+        return (f"Address: {thing.address}{port} | Description: {thing.description}",)
+
+    def entity_label(entity):
+        return f"{entity.name} ({len(entity.services)} services)"
+
+    def tags(kind, obj):
+        # Entries restored from the discovery cache are greyed out until re-announced
+        return (kind, "stale") if obj.stale else (kind,)
+
+    def thing_text(thing):
+        return f"📦 {thing.name} (cached)" if thing.stale else f"📦 {thing.name}"
+
+    def add_thing(thing_id):
+        thing = context.get_thing(thing_id)
+        iid = item_id(THING, thing_id)
+        if thing is None or rows.exists(iid):
+            return
+        if tree.exists(PLACEHOLDER):
+            tree.delete(PLACEHOLDER)
+        rows.insert("", iid, thing.name, text=thing_text(thing), values=thing_details(thing), tags=tags("title", thing), open=True)
+        for entity in thing.entities:
+            add_entity((thing_id, entity.entity_id))
+
+    def update_thing(thing_id):
+        thing = context.get_thing(thing_id)
+        iid = item_id(THING, thing_id)
+        if thing is not None and rows.exists(iid):
+            tree.item(iid, text=thing_text(thing), values=thing_details(thing), tags=tags("title", thing))
+
+    def update_entity(key):
+        entity = context.get_entity(*key)
+        iid = item_id(ENTITY, key)
+        if entity is not None and rows.exists(iid):
+            tree.item(iid, tags=tags("entity", entity))
+
+    def update_service(key):
+        service = context.get_service(*key)
+        iid = item_id(SERVICE, key)
+        if service is not None and rows.exists(iid):
+            tree.item(iid, tags=tags("service", service))
+
+    def add_entity(key):
+        entity = context.get_entity(*key)
+        parent = item_id(THING, key[0])
+        iid = item_id(ENTITY, key)
+        if entity is None or not rows.exists(parent) or rows.exists(iid):
+            return
+        rows.insert(parent, iid, entity.name, text=entity_label(entity), tags=tags("entity", entity), open=True)
+        for service in entity.services:
+            add_service((key[0], key[1], service.name, service.endpoint))
+
+    def add_service(key):
+        service = context.get_service(*key)
+        parent = item_id(ENTITY, key[:2])
+        iid = item_id(SERVICE, key)
+        if service is None or not rows.exists(parent) or rows.exists(iid):
+            return
+        rows.insert(parent, iid, service.name, text=f"• {service.name}", tags=tags("service", service))
+        tree.item(parent, text=entity_label(context.get_entity(*key[:2])))
+
+    def remove_row(kind):
+        def remove(key):
+            rows.remove(item_id(kind, key))
+            if kind == SERVICE:
+                entity = context.get_entity(*key[:2])
+                if entity is not None and rows.exists(item_id(ENTITY, key[:2])):
+                    tree.item(item_id(ENTITY, key[:2]), text=entity_label(entity))
+            elif kind == THING and not tree.get_children():
+                tree.insert("", tk.END, iid=PLACEHOLDER, text="Scanning for things...", tags=("warn",))
+        return remove
+
+    def reload():
+        rows.clear()
+        things = context.get_things()
         if not things:
-            text.insert(tk.END, "Scanning for things...\n", "warn")
-        else:
-            for thing in things:
-                text.insert(tk.END, f"📦 Thing: {thing.name}\n", "title")
-                text.insert(tk.END, f"Address: {thing.address}\n", "address")
-                text.insert(tk.END, f"Description: {thing.description}\n", "description")
-                text.insert(tk.END, "Entities:\n")
-                for entity in sorted(thing.entities, key=lambda e: e.name):
-                    text.insert(tk.END, f" - {entity.name} ({len(entity.services)} services)\n", "entity")
-                    if not entity.services:
-                        text.insert(tk.END, "    • No services found\n", "warn")
-                    else:
-                        for service in sorted(entity.services, key=lambda s: s.name):
-                            text.insert(tk.END, f"    • {service.name}\n", "service")
-                text.insert(tk.END, "\n", "spacer")
+            tree.insert("", tk.END, iid=PLACEHOLDER, text="Scanning for things...", tags=("warn",))
+        for thing in things:
+            add_thing(thing.id)
+
+    handlers = {
+        (ADDED, THING): add_thing,
+        (UPDATED, THING): update_thing,
+        (ADDED, ENTITY): add_entity,
+        (UPDATED, ENTITY): update_entity,
+        (ADDED, SERVICE): add_service,
+        (UPDATED, SERVICE): update_service,
+        (REMOVED, THING): remove_row(THING),
+        (REMOVED, ENTITY): remove_row(ENTITY),
+        (REMOVED, SERVICE): remove_row(SERVICE),
+    }
+
+    def update():
+        # Only the rows touched since the last refresh are re-rendered
+        if seen_version[0] != context.version:
+            version = context.version
+            changes = context.changes_since(seen_version[0]) if seen_version[0] is not None else None
+            if changes is None:
+                reload()
+            else:
+                for action, kind, key in changes:
+                    handler = handlers.get((action, kind))
+                    if handler:
+                        handler(key)
+            seen_version[0] = version
         frame.after(1000, update)
 
     update()
     return frame
-
-
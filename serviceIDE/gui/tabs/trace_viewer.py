@@ -0,0 +1,184 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+import customtkinter as ctk
+
+from service_discover import tracing
+from service_discover.tracing import trace_store, span_dicts
+
+LABEL_WIDTH = 220
+ROW_HEIGHT = 30
+BAR_HEIGHT = 18
+AXIS_HEIGHT = 30
+TIMELINE_WIDTH = 900  # pixels given to the whole run when the window opens
+
+COLORS = {
+    tracing.BUILD: "#b0b0b0",
+    tracing.CALL: "#3b7dd8",
+    tracing.CACHED: "#17a2b8",
+}
+SUCCESS_COLOR = "#dff0d8"
+FAILURE_COLOR = "#f2dede"
+CRITICAL_COLOR = "#f0ad4e"
+
+
+def _tick_step(total_ms, pixels):
+    """Round axis step giving roughly one label every 100 pixels"""
+    target = total_ms / max(pixels / 100, 1)
+    step = 1
+    while step < target:
+        for factor in (2, 5, 10):
+            if step * factor >= target:
+                return step * factor
+        step *= 10
+    return step
+
+
+class TraceViewer(ctk.CTkToplevel):
+    """
+    Timeline of the runs of an app: one row per service with its request build and call,
+    relationship decisions drawn as arrows between rows, critical path outlined.
+    """
+
+    def __init__(self, master, app_name, store=trace_store):
+        super().__init__(master)
+        self.title(f"Run timeline - {app_name}")
+        self.geometry("1200x500")
+        self.app_name = app_name
+        self.store = store
+        self.traces = []
+        self.scale = 1.0  # pixels per millisecond
+        self._setup_ui()
+        self.reload()
+
+    def _setup_ui(self):
+        top = tk.Frame(self, bg="#f0f0f0")
+        top.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+        tk.Label(top, text="Run:", bg="#f0f0f0", font=("Arial", 13)).pack(side=tk.LEFT)
+        self.run_var = tk.StringVar()
+        self.run_combo = ttk.Combobox(top, textvariable=self.run_var, state="readonly", width=50)
+        self.run_combo.pack(side=tk.LEFT, padx=5)
+        self.run_combo.bind("<<ComboboxSelected>>", lambda event: self.render())
+        ctk.CTkButton(top, text="⟳", width=30, command=self.reload).pack(side=tk.LEFT, padx=5)
+        ctk.CTkButton(top, text="+", width=30, command=lambda: self.zoom(1.5)).pack(side=tk.RIGHT, padx=2)
+        ctk.CTkButton(top, text="-", width=30, command=lambda: self.zoom(1 / 1.5)).pack(side=tk.RIGHT, padx=2)
+
+        body = tk.Frame(self)
+        body.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10)
+        self.canvas = tk.Canvas(body, bg="white", highlightthickness=0)
+        x_scroll = ttk.Scrollbar(body, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        y_scroll = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.details = tk.Label(self, bg="#f0f0f0", font=("Consolas", 12), anchor="w")
+        self.details.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+
+    def reload(self):
+        """Reads the stored runs of the app, newest first, and shows the newest one"""
+        self.traces = self.store.recent(self.app_name)
+        labels = []
+        for trace in self.traces:
+            run = next((s for s in span_dicts(trace) if s["kind"] == tracing.RUN), None)
+            duration = f"{run['duration']:.1f} ms" if run else "incomplete"
+            labels.append(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trace['started_at']))}  ({duration})")
+        self.run_combo["values"] = labels
+        if labels:
+            self.run_combo.current(0)
+        self.render(fit=True)
+
+    def selected_trace(self):
+        index = self.run_combo.current()
+        return self.traces[index] if 0 <= index < len(self.traces) else None
+
+    def zoom(self, factor):
+        self.scale *= factor
+        self.render()
+
+    def x(self, ms):
+        return LABEL_WIDTH + ms * self.scale
+
+    def render(self, fit=False):
+        canvas = self.canvas
+        canvas.delete("all")
+        trace = self.selected_trace()
+        if trace is None:
+            canvas.create_text(20, 20, anchor="nw", text="No recorded runs for this app yet", font=("Arial", 14))
+            return
+        spans = span_dicts(trace)
+        by_id = {span["id"]: span for span in spans}
+        run = next((s for s in spans if s["kind"] == tracing.RUN), None)
+        total = max([s["start"] + s["duration"] for s in spans] + [1.0])
+        if fit:
+            self.scale = TIMELINE_WIDTH / total
+        critical = set(((run or {}).get("attrs") or {}).get("critical_path", []))
+
+        rows = [s for s in spans if s["kind"] in (tracing.SERVICE, tracing.SKIPPED)]
+        row_of = {span["id"]: index for index, span in enumerate(rows)}
+        height = AXIS_HEIGHT + ROW_HEIGHT * len(rows) + 10
+
+        # Time axis
+        step = _tick_step(total, total * self.scale)
+        tick = 0
+        while tick <= total:
+            x = self.x(tick)
+            canvas.create_line(x, AXIS_HEIGHT - 5, x, height, fill="#eeeeee")
+            canvas.create_text(x, AXIS_HEIGHT - 8, anchor="s", text=f"{tick:g} ms", font=("Arial", 10), fill="#666666")
+            tick += step
+
+        for index, span in enumerate(rows):
+            top = AXIS_HEIGHT + index * ROW_HEIGHT
+            middle = top + ROW_HEIGHT / 2
+            canvas.create_text(10, middle, anchor="w", text=span["name"], font=("Consolas", 12))
+            if span["kind"] == tracing.SKIPPED:
+                canvas.create_text(self.x(span["start"]) + 4, middle, anchor="w", text="skipped",
+                                   font=("Arial", 11, "italic"), fill="#9a9a9a")
+                continue
+            attrs = span["attrs"] or {}
+            x0, x1 = self.x(span["start"]), max(self.x(span["start"] + span["duration"]), self.x(span["start"]) + 2)
+            outline = CRITICAL_COLOR if span["id"] in critical else "#888888"
+            item = canvas.create_rectangle(x0, middle - BAR_HEIGHT / 2, x1, middle + BAR_HEIGHT / 2,
+                                           fill=SUCCESS_COLOR if attrs.get("success") else FAILURE_COLOR,
+                                           outline=outline, width=3 if span["id"] in critical else 1)
+            self._describe(item, span)
+
+        # Phases inside the service bars, relationship decisions between the rows
+        for span in spans:
+            parent_row = row_of.get(span["parent"])
+            if parent_row is None:
+                continue
+            middle = AXIS_HEIGHT + parent_row * ROW_HEIGHT + ROW_HEIGHT / 2
+            if span["kind"] in COLORS:
+                x0 = self.x(span["start"])
+                x1 = max(self.x(span["start"] + span["duration"]), x0 + 1)
+                item = canvas.create_rectangle(x0, middle - BAR_HEIGHT / 4, x1, middle + BAR_HEIGHT / 4,
+                                               fill=COLORS[span["kind"]], outline="")
+                self._describe(item, span)
+            elif span["kind"] == tracing.EDGE:
+                attrs = span["attrs"] or {}
+                dst_row = row_of.get(attrs.get("dst"))
+                if dst_row is None:
+                    continue
+                x = self.x(span["start"])
+                dst_middle = AXIS_HEIGHT + dst_row * ROW_HEIGHT + ROW_HEIGHT / 2
+                item = canvas.create_line(x, middle, x, dst_middle, arrow=tk.LAST,
+                                          fill="#333333" if attrs.get("fired") else "#bbbbbb",
+                                          dash=() if attrs.get("fired") else (3, 3))
+                self._describe(item, span)
+
+        width = self.x(total) + 40
+        canvas.config(scrollregion=(0, 0, width, height))
+        summary = f"{len(rows)} services, {run['duration']:.1f} ms" if run else f"{len(rows)} services"
+        critical_names = " → ".join(by_id[i]["name"] for i in sorted(critical, key=lambda i: by_id[i]["start"])
+                                    if i in by_id)
+        self.details.config(text=f"{summary}   critical path: {critical_names or '-'}")
+
+    def _describe(self, item, span):
+        """Shows the span details in the bottom bar while the mouse is over it"""
+        attrs = ", ".join(f"{k}={v}" for k, v in (span["attrs"] or {}).items() if k != "dst")
+        text = f"[{span['kind']}] {span['name']}  start {span['start']:.1f} ms  duration {span['duration']:.1f} ms"
+        if attrs:
+            text += f"  ({attrs})"
+        self.canvas.tag_bind(item, "<Enter>", lambda event: self.details.config(text=text))
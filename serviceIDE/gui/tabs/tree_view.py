@@ -0,0 +1,71 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+
+def make_scrollable_tree(parent, columns, show="headings", style="Context.Treeview"):
+    """
+    Creates a Treeview with a vertical scrollbar.
+    columns is a list of (column id, heading, width). Treeview only draws the visible rows,
+    so thousands of rows stay cheap to scroll.
+    """
+    ttk_style = ttk.Style()
+    ttk_style.configure(style, font=("Consolas", 13), rowheight=26, background="white", fieldbackground="white")
+    ttk_style.configure(f"{style}.Heading", font=("Arial", 13, "bold"))
+
+    tree_frame = tk.Frame(parent, bg="#f9f9f9")
+    tree = ttk.Treeview(tree_frame, columns=[c[0] for c in columns], show=show, style=style)
+    for column_id, heading, width in columns:
+        tree.heading(column_id, text=heading, anchor="w")
+        tree.column(column_id, width=width, anchor="w", stretch=True)
+    scrollbar = ttk.Scrollbar(tree_frame, command=tree.yview)
+    tree.config(yscrollcommand=scrollbar.set)
+
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    return tree_frame, tree
+
+
+def item_id(kind, key):
+    """Stable Treeview item id for a context object"""
+    if isinstance(key, tuple):
+        key = "\x1f".join(str(part) for part in key)
+    return f"{kind}:{key}"
+
+
+class SortedTree:
+    """Inserts rows directly at their sorted position among their siblings"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._children = {}  # parent iid -> sorted [(sort_key, iid)]
+
+    def insert(self, parent, iid, sort_key, **options):
+        siblings = self._children.setdefault(parent, [])
+        entry = (sort_key, iid)
+        index = bisect.bisect(siblings, entry)
+        siblings.insert(index, entry)
+        self.tree.insert(parent, index, iid=iid, **options)
+
+    def remove(self, iid):
+        """Deletes a row and its descendants"""
+        if not self.tree.exists(iid):
+            return
+        siblings = self._children.get(self.tree.parent(iid), [])
+        for index, (_, child) in enumerate(siblings):
+            if child == iid:
+                del siblings[index]
+                break
+        pending = [iid]
+        while pending:
+            for _, child in self._children.pop(pending.pop(), []):
+                pending.append(child)
+        self.tree.delete(iid)
+
+    def exists(self, iid):
+        return self.tree.exists(iid)
+
+    def clear(self):
+        self._children.clear()
+        self.tree.delete(*self.tree.get_children())
@@ -0,0 +1,125 @@
+# headless.py
+# Runs saved .iot apps once or on schedules without the Tk GUI, e.g.:
+#   python headless.py --run flame_alarm.iot --bindings inputs.json
+#   python headless.py --every flame_alarm.iot 5 --cron report.iot "*/15 * * * *" --max-concurrent 8
+#   python headless.py --every dashboard.iot 2 --cache-ttl 10
+#   python headless.py --run door.iot --retries 4 --retry-budget 10 --safe-service SetLevel
+#   python headless.py --every dashboard.iot 5 --metrics-port 9464   (scrape http://127.0.0.1:9464/metrics)
+# Per-thing limits for the outbound calls can be given as JSON:
+#   {"MySmartThing01": {"max_concurrent": 2, "rate": 5.0, "burst": 2, "queue_size": 16}}
+# A bindings file maps a service instance id or display name to its input values:
+#   {"SetLevel": {"level": 3}}
+import argparse
+import json
+import os
+import sys
+
+from models.iot_app import IoTApp
+from service_discover.api_caller import invoke_iot_app, MissingInputError
+from service_discover.scheduler import AppScheduler, OVERRUN_SKIP, OVERRUN_COALESCE
+from service_discover.response_cache import ResponseCache
+from service_discover.admission import admission
+from service_discover.retry import retry_policy
+from service_discover.metrics import metrics, MetricsServer
+
+
+def load_app(path):
+    with open(path, "r") as f:
+        return IoTApp.from_dict(json.load(f))
+
+
+def load_bindings(path):
+    if not path:
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write(text):
+    print(text, end="", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run IoT apps once or periodically without the GUI")
+    parser.add_argument("--run", metavar="APP_FILE", help="run the app once and exit")
+    parser.add_argument("--bindings", help="JSON file with the input values of the services")
+    parser.add_argument("--every", nargs=2, action="append", default=[], metavar=("APP_FILE", "SECONDS"),
+                        help="run the app at a fixed rate")
+    parser.add_argument("--cron", nargs=2, action="append", default=[], metavar=("APP_FILE", "EXPRESSION"),
+                        help="run the app on a cron schedule (minute hour day month weekday)")
+    parser.add_argument("--dir", help="schedule every .iot app found in this folder at --interval")
+    parser.add_argument("--interval", type=float, default=60.0)
+    parser.add_argument("--max-concurrent", type=int, default=4, help="maximum number of apps running at once")
+    parser.add_argument("--overrun", choices=[OVERRUN_SKIP, OVERRUN_COALESCE], default=OVERRUN_SKIP,
+                        help="what to do with ticks that arrive while the app is still running")
+    parser.add_argument("--cache-ttl", type=float, default=0.0, metavar="SECONDS",
+                        help="reuse the responses of Report services for this long (0: no cache)")
+    parser.add_argument("--thing-limits", metavar="FILE", help="JSON file with per-thing call limits")
+    parser.add_argument("--adaptive-limits", action="store_true",
+                        help="adjust the concurrency of each thing to its observed latency")
+    parser.add_argument("--retries", type=int, default=retry_policy.attempts, metavar="ATTEMPTS",
+                        help="attempts for Report calls that get no response (1: no retry)")
+    parser.add_argument("--retry-budget", type=float, default=retry_policy.budget, metavar="SECONDS",
+                        help="no retry is started this long after the start of a run")
+    parser.add_argument("--safe-service", action="append", default=[], metavar="SERVICE",
+                        help="also retry this non-Report service, it must be safe to repeat")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve call and run metrics on http://127.0.0.1:PORT/metrics (and /metrics.json)")
+    parser.add_argument("--metrics-json", metavar="FILE", help="write the metrics to this JSON file on exit")
+    args = parser.parse_args(argv)
+    try:
+        return run(parser, args)
+    finally:
+        if args.metrics_json:
+            metrics.dump_json(args.metrics_json)
+
+
+def run(parser, args):
+    bindings = load_bindings(args.bindings)
+    if args.thing_limits:
+        with open(args.thing_limits, "r") as f:
+            for thing, limits in json.load(f).items():
+                admission.configure(thing, **limits)
+    admission.adaptive = args.adaptive_limits
+    retry_policy.attempts = args.retries
+    retry_policy.budget = args.retry_budget
+    for service_name in args.safe_service:
+        retry_policy.mark_safe(service_name)
+    cache = ResponseCache(ttls={"Report": args.cache_ttl}) if args.cache_ttl > 0 else None
+    if args.metrics_port is not None:
+        MetricsServer(metrics, port=args.metrics_port).start()
+    elif args.metrics_json:
+        metrics.enabled = True
+
+    if args.run:
+        try:
+            summary = invoke_iot_app(load_app(args.run), write, bindings=bindings, cache=cache)
+        except MissingInputError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 2
+        if summary is None:
+            return 1
+        return 0 if all(success for success, _ in summary["results"].values()) else 1
+
+    scheduler = AppScheduler(write_fn=write, max_concurrent=args.max_concurrent, cache=cache)
+
+    for path, seconds in args.every:
+        scheduler.add_app(load_app(path), interval=float(seconds), overrun=args.overrun, bindings=bindings)
+    for path, expression in args.cron:
+        scheduler.add_app(load_app(path), cron=expression, overrun=args.overrun, bindings=bindings)
+    if args.dir:
+        for filename in sorted(os.listdir(args.dir)):
+            if filename.endswith(".iot"):
+                scheduler.add_app(load_app(os.path.join(args.dir, filename)),
+                                  interval=args.interval, overrun=args.overrun, bindings=bindings)
+
+    if not scheduler.jobs():
+        parser.error("no apps to schedule")
+    for job in scheduler.jobs():
+        print(f"[SCHEDULER] {job.name}: {job.schedule}")
+    scheduler.run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,47 @@
 # main.py
-import threading
-import queue
 from gui.main_window import launch_gui
-from service_discover.server import TweetListener, tweet_queue, address_queue
+from service_discover.async_server import DiscoveryService
 from service_discover.server import context
-from service_discover.processor import process_tweet
+from service_discover.sweeper import TTLSweeper
+from service_discover.discovery_cache import DiscoveryCache
+from service_discover.probe import DiscoveryProbe
+from service_discover.metrics import metrics, MetricsServer
+
+# (multicast group, port) pairs watched by the discovery service, one per smart space
+DISCOVERY_ENDPOINTS = [('232.1.1.1', 1235)]
+# Port of the local metrics endpoint (/metrics, /metrics.json), None keeps metrics disabled
+METRICS_PORT = None
 
 if __name__ == "__main__":
-    tweet_queue = queue.Queue()
     #context = IoTContext()
 
-    # Start listener in background thread
-    listener = TweetListener(multicast_group='232.1.1.1', port=1235)
-    listener_thread = threading.Thread(target=listener.run, daemon=True)
-    listener_thread.start()
-
-
-
-    #TODO ===== > AGGIUSTARE LOGICA DI AGGIORNAMENTO DEL CONTESTO, DEVE FARLO processor.py PER FORZA 
+    # Start the discovery event loop in background
+    discovery = DiscoveryService(DISCOVERY_ENDPOINTS, context=context)
+    discovery.start_in_background()
+    # Ask the things to announce themselves now rather than at their next cycle
+    for group, port in DISCOVERY_ENDPOINTS:
+        DiscoveryProbe(group, port).start()
+    # Evict the things that stopped announcing themselves
+    sweeper = TTLSweeper(context)
+    sweeper.start()
+    # Restore the things known from the previous run in background, then save them periodically
+    cache = DiscoveryCache(context)
+    cache.start()
+    metrics_server = MetricsServer(metrics, port=METRICS_PORT) if METRICS_PORT else None
+    if metrics_server is not None:
+        metrics_server.start()
+
+
+
+    #TODO ===== > AGGIUSTARE LOGICA DI AGGIORNAMENTO DEL CONTESTO, DEVE FARLO processor.py PER FORZA
     #TODO ===== > FARE TEST CON IL RASPBERRY
 
 
 
     # Launch GUI
     launch_gui(context)
-
+    sweeper.stop()
+    discovery.shutdown()
+    cache.stop()
+    if metrics_server is not None:
+        metrics_server.stop()
@@ -3,6 +3,8 @@ import json
 import time
 import random
 
+from service_discover.probe import ProbeResponder
+
 MULTICAST_GROUP = '232.1.1.1'
 PORT = 1235
 TWEET_INTERVAL = 120  # seconds
@@ -99,6 +101,9 @@ def generate_other_device_tweets():
         send_tweet(tweet)
 
 def main_loop():
+    # Answer the discovery probes of the IDE right away instead of waiting for the next cycle
+    responder = ProbeResponder(send_atlas_tweets, MULTICAST_GROUP, PORT, space_id="MySmartSpace")
+    responder.start()
     while True:
         send_atlas_tweets()
         generate_other_device_tweets()
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+import re
+
+# "CheckFlameStatus:[NULL]:(flameStatus,int,NULL)"
+API_PATTERN = re.compile(r'^(\w+):\[(.*?)\]:\((.*?)\)$')
+API_CACHE_SIZE = 4096
+
+
+class ApiSignature(NamedTuple):
+    """Immutable result of parsing an Atlas API string"""
+    endpoint: str
+    input_params: Tuple[Tuple[str, str], ...]  # (param_name, param_type) in declaration order
+    output_name: Optional[str]
+    output_type: Optional[str]
+
+    def input_names(self):
+        return [name for name, _ in self.input_params]
+
+    def input_types(self):
+        return [type_ for _, type_ in self.input_params]
+
+
+@lru_cache(maxsize=API_CACHE_SIZE)
+def parse_api_string(api_string: str) -> ApiSignature:
+    """
+    Parses an API string into an ApiSignature.
+    Results are cached by raw string, so a signature re-announced by many devices is parsed once.
+    """
+    match = API_PATTERN.match(api_string.strip())
+    if not match:
+        raise ValueError(f"Invalid API format: {api_string}")
+
+    endpoint, input_str, output_str = match.groups()
+
+    # Parse input parameters
+    input_params = []
+    if input_str.strip() and input_str.upper() != "NULL":
+        for param in input_str.split('|'):
+            parts = param.strip().strip('"').split(',')
+            if len(parts) >= 2:
+                input_params.append((parts[0].strip().strip('"'), parts[1].strip()))
+
+    # Parse output
+    output_name = None
+    output_type = None
+    if output_str.strip() and output_str.upper() != "NULL":
+        output_parts = output_str.strip().strip('"').split(',')
+        if len(output_parts) >= 2:
+            output_name = output_parts[0].strip().strip('"')
+            output_type = output_parts[1].strip()
+
+    return ApiSignature(endpoint, tuple(input_params), output_name, output_type)
@@ -1,10 +1,31 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field, fields
+from collections import deque, OrderedDict
+import functools
+import sys
+import threading
+import time
+from types import MappingProxyType
+from collections.abc import Sequence
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 import socket
 import uuid
-import re
+from models.api_signature import parse_api_string
 
-@dataclass
+# The model classes are slotted and intern their repeated strings (space ids, thing names, categories...):
+# with tens of thousands of services most of them are copies of a few hundred distinct values.
+
+def _intern_strings(obj, names):
+    for name in names:
+        value = getattr(obj, name)
+        if type(value) is str:
+            setattr(obj, name, sys.intern(value))
+
+@functools.lru_cache(maxsize=4096)
+def shared_params(items: Tuple[Tuple[str, str], ...]) -> Mapping[str, str]:
+    """Read-only param_name -> type map, one instance shared by all the services with the same inputs"""
+    return MappingProxyType(dict(items))
+
+@dataclass(slots=True)
 class Service:
     """Represents a base service from the IoT system"""
     name: str
@@ -13,56 +34,42 @@ class Service:
     space_id: str
     endpoint: str  # Extracted from the API - e.g., "CheckFlameStatus"
     ip: Any
-    input_params: Dict[str, str] = field(default_factory=dict)  # param_name -> type
+    input_params: Mapping[str, str] = field(default_factory=dict)  # param_name -> type, read-only
     output_name: Optional[str] = None
     output_type: Optional[str] = None
     type: str = ""
     app_category: str = ""
     description: str = ""
     keywords: str = ""
+    port: Optional[int] = None  # Announced in the Identity_Language tweet of the thing
+    last_seen: float = 0.0  # time.monotonic() of the latest announcement
+    stale: bool = False  # Restored from the discovery cache and not re-announced yet
+
+    _INTERNED = ("thing_name", "entity_id", "space_id", "endpoint", "ip", "output_type", "type",
+                 "app_category", "keywords")
+    _RUNTIME = ("last_seen", "stale")
+
+    def __post_init__(self):
+        _intern_strings(self, Service._INTERNED)
+        if type(self.input_params) is not MappingProxyType:
+            self.input_params = shared_params(tuple(self.input_params.items()))
 
     @classmethod
     def from_api_string(cls, name, thing_name, entity_id, space_id, api_string, ip,
                        type_="", app_category="", description="", keywords=""):
         """Creates a Service by parsing the original API string"""
-        # Parse: "CheckFlameStatus:[NULL]:(flameStatus,int,NULL)"
-        match = re.match(r'^(\w+):\[(.*?)\]:\((.*?)\)$', api_string.strip())
-        if not match:
-            raise ValueError(f"Invalid API format: {api_string}")
-
-        endpoint = match.group(1)
-        input_str = match.group(2)
-        output_str = match.group(3)
-
-        # Parse input parameters
-        input_params = {}
-        if input_str.strip() and input_str.upper() != "NULL":
-            for param in input_str.split('|'):
-                parts = param.strip().strip('"').split(',')
-                if len(parts) >= 2:
-                    param_name = parts[0].strip().strip('"')
-                    param_type = parts[1].strip()
-                    input_params[param_name] = param_type
-
-        # Parse output
-        output_name = None
-        output_type = None
-        if output_str.strip() and output_str.upper() != "NULL":
-            output_parts = output_str.strip().strip('"').split(',')
-            if len(output_parts) >= 2:
-                output_name = output_parts[0].strip()
-                output_type = output_parts[1].strip()
+        signature = parse_api_string(api_string)
 
         return cls(
             name=name,
             thing_name=thing_name,
             entity_id=entity_id,
             space_id=space_id,
-            endpoint=endpoint,
+            endpoint=signature.endpoint,
             ip = ip,
-            input_params=input_params,
-            output_name=output_name,
-            output_type=output_type,
+            input_params=shared_params(signature.input_params),
+            output_name=signature.output_name,
+            output_type=signature.output_type,
             type=type_,
             app_category=app_category,
             description=description,
@@ -87,8 +94,14 @@ class Service:
             output_part = f'"{self.output_name}",{self.output_type},"NULL"'
 
         return f"{self.endpoint}:[{input_part}]:({output_part})"
-    
-@dataclass
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable fields, without the discovery state"""
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name not in Service._RUNTIME}
+        data["input_params"] = dict(self.input_params)
+        return data
+
+@dataclass(slots=True)
 class Entity:
     thing_name: str
     space_id: str
@@ -99,8 +112,13 @@ class Entity:
     vendor: str
     description: str
     services: List[Service] = field(default_factory=list)
+    last_seen: float = 0.0
+    stale: bool = False
+
+    def __post_init__(self):
+        _intern_strings(self, ("thing_name", "space_id", "name", "type", "owner", "vendor", "description"))
 
-@dataclass
+@dataclass(slots=True)
 class Thing:
     id: str
     address: str
@@ -111,8 +129,16 @@ class Thing:
     vendor: str
     description: str
     entities: List[Entity] = field(default_factory=list)
+    port: Optional[int] = None
+    language: str = ""
+    network_name: str = ""
+    last_seen: float = 0.0
+    stale: bool = False
 
-@dataclass
+    def __post_init__(self):
+        _intern_strings(self, ("space_id", "model", "owner", "vendor", "language", "network_name"))
+
+@dataclass(slots=True)
 class Relationship:
     name: str
     category: str
@@ -124,13 +150,132 @@ class Relationship:
     space_id: Optional[str] = None
     owner: Optional[str] = None
     condition: Optional[str] = None
+    stale: bool = False
+
+    def __post_init__(self):
+        _intern_strings(self, ("name", "category", "type", "src", "dst", "space_id", "owner"))
+
+# Kinds of objects reported by IoTContext.changes_since
+THING = "thing"
+ENTITY = "entity"
+SERVICE = "service"
+RELATIONSHIP = "relationship"
+ADDED = "added"
+UPDATED = "updated"
+REMOVED = "removed"
+
+CHANGELOG_SIZE = 10000
+SNAPSHOT_CHUNK_SIZE = 64
+
+class ChunkedSequence(Sequence):
+    """
+    Immutable sequence stored as tuples of at most SNAPSHOT_CHUNK_SIZE items.
+    extend() copies only the last chunk and the chunk index, every other chunk is shared
+    with the sequence it was derived from.
+    """
+    __slots__ = ("_chunks", "_len")
+
+    def __init__(self, items=()):
+        items = tuple(items)
+        self._chunks = tuple(items[i:i + SNAPSHOT_CHUNK_SIZE] for i in range(0, len(items), SNAPSHOT_CHUNK_SIZE))
+        self._len = len(items)
+
+    def extend(self, items) -> "ChunkedSequence":
+        if not items:
+            return self
+        chunks = list(self._chunks)
+        for item in items:
+            if chunks and len(chunks[-1]) < SNAPSHOT_CHUNK_SIZE:
+                chunks[-1] = chunks[-1] + (item,)
+            else:
+                chunks.append((item,))
+        extended = ChunkedSequence()
+        extended._chunks = tuple(chunks)
+        extended._len = self._len + len(items)
+        return extended
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ChunkedSequence index out of range")
+        return self._chunks[index // SNAPSHOT_CHUNK_SIZE][index % SNAPSHOT_CHUNK_SIZE]
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __repr__(self):
+        return f"ChunkedSequence({list(self)!r})"
+
+_EMPTY = ChunkedSequence()
+
+@dataclass(frozen=True, slots=True)
+class ContextSnapshot:
+    """Immutable view of the context at a given version, safe to iterate from any thread"""
+    version: int
+    things: Sequence = _EMPTY
+    entities: Sequence = _EMPTY
+    services: Sequence = _EMPTY
+    relationships: Sequence = _EMPTY
+
+def _serialized(method):
+    """
+    Runs a mutating method of IoTContext under the writer lock and publishes the resulting snapshot
+    before releasing it, eviction listeners are called after it
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            result = method(self, *args, **kwargs)
+            if self._snapshot.version != self.version:
+                self._publish()
+            evicted = self._evicted
+            if evicted:
+                self._evicted = []
+        if evicted:
+            self._notify_evicted(evicted)
+        return result
+    return wrapper
 
 class IoTContext:
-    def __init__(self):
+    """
+    Registry of the discovered things.
+    Writers are serialized by a lock and never modify a list in place: Thing.entities and
+    Entity.services are replaced by new lists (copy-on-write), so readers can iterate them safely.
+    Readers use snapshot(), an immutable view tagged with its version, which they get without any lock:
+    every mutation publishes a new one derived from the previous one, sharing all that did not change.
+    changes_since() is the exception: it copies the new changelog entries under the writer lock.
+    Every announcement refreshes the last_seen of the objects it mentions and moves them to the end of
+    a time-ordered index, so evict_stale() only looks at the objects that actually expired.
+    """
+    def __init__(self, max_things: Optional[int] = None):
         self.things: Dict[str, Thing] = {}
         self.relationships: List[Relationship] = []
         self.local_ip = self._get_local_ip()
-        
+        # Indexes used to make re-announcements O(1) no-ops
+        self._entity_index: Dict[Tuple[str, str], Entity] = {}  # (thing_id, entity_id)
+        self._service_index: Dict[Tuple[str, str, str, str], Service] = {}  # (thing_id, entity_id, service_name, endpoint)
+        self._relationship_index: Dict[Tuple[str, str, str, str], Relationship] = {}  # (thing_id, name, src, dst)
+        self._thing_relationships: Dict[str, List[Tuple[str, str, str, str]]] = {}
+        self._relationships_stale = False
+        # Change notification: version grows at every mutation, the changelog keeps the latest ones
+        self.version = 0
+        self._changes = deque(maxlen=CHANGELOG_SIZE)  # (version, action, kind, key)
+        self._lock = threading.RLock()
+        self._snapshot = ContextSnapshot(version=0)
+        # Liveness: least recently announced first. Relationships live and die with their thing
+        self.max_things = max_things
+        self._seen_things: "OrderedDict[str, Thing]" = OrderedDict()
+        self._seen_members: "OrderedDict[Tuple[str, Any], Any]" = OrderedDict()  # (ENTITY or SERVICE, key)
+        self._eviction_listeners: List[Any] = []
+        self._evicted: List[Tuple[str, Any, Any]] = []  # (kind, key, object) waiting for the listeners
+
     @staticmethod
     def _get_local_ip():
         """Retrieves the local IP address"""
@@ -143,10 +288,96 @@ class IoTContext:
         except:
             return "127.0.0.1"
 
+    def _record(self, action: str, kind: str, key: Any):
+        self.version += 1
+        self._changes.append((self.version, action, kind, key))
+
+    @staticmethod
+    def _touch(index: OrderedDict, key: Any, obj: Any, now: float):
+        obj.last_seen = now
+        if key in index:
+            index.move_to_end(key)
+        else:
+            index[key] = obj
+
+    def _confirm(self, kind: str, key: Any, obj: Any):
+        # An object restored from the cache has been announced again
+        obj.stale = False
+        self._record(UPDATED, kind, key)
+
+    def _touch_thing(self, thing_id: str, now: float):
+        thing = self.things.get(thing_id)
+        if thing is not None:
+            self._touch(self._seen_things, thing_id, thing, now)
+
+    def _touch_entity(self, key: Tuple[str, str], entity: Entity, now: float):
+        self._touch(self._seen_members, (ENTITY, key), entity, now)
+        self._touch_thing(key[0], now)
+
+    def changes_since(self, version: int) -> Optional[List[Tuple[str, str, Any]]]:
+        """
+        Returns the (action, kind, key) changes made after `version`, oldest first.
+        Returns None when the changelog no longer reaches back that far: the caller must reload everything.
+        """
+        # The writer lock keeps the listener from appending to the changelog while it is walked
+        with self._lock:
+            if version == self.version:
+                return []
+            # Newest first, so the cost is proportional to the number of changes returned
+            changes = []
+            for v, action, kind, key in reversed(self._changes):
+                if v <= version:
+                    break
+                changes.append((action, kind, key))
+            else:
+                if not self._changes or self._changes[0][0] > version + 1:
+                    return None
+        changes.reverse()
+        return changes
+
+    def snapshot(self) -> ContextSnapshot:
+        """Returns the current immutable view, without locking or copying"""
+        return self._snapshot
+
+    def _publish(self):
+        """
+        Derives the snapshot of the current version from the previous one, writer lock held.
+        Added objects are appended to the shared sequences (index order is arrival order);
+        a kind is rebuilt from its index only when one of its objects was removed.
+        """
+        previous = self._snapshot
+        changes = self.changes_since(previous.version)
+        sources = {
+            THING: (self.things, previous.things),
+            ENTITY: (self._entity_index, previous.entities),
+            SERVICE: (self._service_index, previous.services),
+            RELATIONSHIP: (self._relationship_index, previous.relationships),
+        }
+        rebuild = set(sources) if changes is None else {kind for action, kind, _ in changes if action == REMOVED}
+        added = {kind: [] for kind in sources}
+        for action, kind, key in changes or ():
+            if action == ADDED and kind not in rebuild:
+                added[kind].append(sources[kind][0][key])
+        views = {}
+        for kind, (index, view) in sources.items():
+            views[kind] = ChunkedSequence(index.values()) if kind in rebuild else view.extend(added[kind])
+        self._snapshot = ContextSnapshot(
+            version=self.version,
+            things=views[THING],
+            entities=views[ENTITY],
+            services=views[SERVICE],
+            relationships=views[RELATIONSHIP],
+        )
+
+    @_serialized
     def add_thing(self, thing_id: str, address: str, name: str, space_id: str, 
                   model: str, owner: str, vendor: str, description: str):
         """Adds a thing only if it does not already exist"""
         if thing_id not in self.things:
+            if self.max_things is not None:
+                while self._seen_things and len(self.things) >= self.max_things:
+                    self._remove_thing(next(iter(self._seen_things)))
+                self._sync_relationships()
             self.things[thing_id] = Thing(
                 name=name, 
                 address=address,
@@ -157,61 +388,65 @@ class IoTContext:
                 vendor=vendor, 
                 description=description
             )
+            self._record(ADDED, THING, thing_id)
+        elif self.things[thing_id].stale:
+            self._confirm(THING, thing_id, self.things[thing_id])
+        self._touch_thing(thing_id, time.monotonic())
 
+    @_serialized
     def add_service_to_entity(self, thing_id: str, service_name: str, entity_id: str, 
                              space_id: str, api: str, type_: str, app_category: str, 
                              description: str, keywords: str, ip: Any):
         """Adds a service to an entity using the new Service format"""
-        if thing_id in self.things:
-            entity_found = None
-            for entity in self.things[thing_id].entities:
-                if entity.entity_id == entity_id:
-                    entity_found = entity
-                    break
-            
-            if entity_found:
-                # Checks if the service already exists
-                service_exists = any(
-                    service.name == service_name and 
-                    service.entity_id == entity_id and 
-                    service.thing_name == self.things[thing_id].id and
-                    service.endpoint == Service.from_api_string(
-                        name=service_name,
-                        thing_name=self.things[thing_id].id,
-                        entity_id=entity_id,
-                        space_id=space_id,
-                        api_string=api,
-                        ip=ip
-                    ).endpoint
-                    for service in entity_found.services
-                )
-                
-                if not service_exists:
-                    try:
-                        service = Service.from_api_string(
-                            name=service_name,
-                            thing_name=self.things[thing_id].id,
-                            entity_id=entity_id,
-                            space_id=space_id,
-                            api_string=api,
-                            ip= ip,
-                            type_=type_,
-                            app_category=app_category,
-                            description=description,
-                            keywords=keywords
-
-                        )
-                        entity_found.services.append(service)
-                    except ValueError as e:
-                        print(f"[Context] Error parsing API string '{api}': {e}")
+        entity_found = self._entity_index.get((thing_id, entity_id))
+        if entity_found is None:
+            return
+
+        try:
+            # The parse is cached, so re-announced services are skipped before building a Service
+            key = (thing_id, entity_id, service_name, parse_api_string(api).endpoint)
+            service = self._service_index.get(key)
+            if service is not None:
+                if service.stale:
+                    self._confirm(SERVICE, key, service)
+                now = time.monotonic()
+                self._touch(self._seen_members, (SERVICE, key), service, now)
+                self._touch_entity(key[:2], entity_found, now)
+                return
+            service = Service.from_api_string(
+                name=service_name,
+                thing_name=self.things[thing_id].id,
+                entity_id=entity_id,
+                space_id=space_id,
+                api_string=api,
+                ip= ip,
+                type_=type_,
+                app_category=app_category,
+                description=description,
+                keywords=keywords
+
+            )
+        except ValueError as e:
+            print(f"[Context] Error parsing API string '{api}': {e}")
+            return
+
+        service.port = self.things[thing_id].port
+        self._service_index[key] = service
+        entity_found.services = entity_found.services + [service]
+        self._record(ADDED, SERVICE, key)
+        now = time.monotonic()
+        self._touch(self._seen_members, (SERVICE, key), service, now)
+        self._touch_entity(key[:2], entity_found, now)
 
+    @_serialized
     def add_entity_to_thing(self, thing_id: str, entity_name: str, entity_id: str, 
                            space_id: str, type_: str, vendor: str, description: str, owner: str):
         """Adds an entity to a thing only if it does not already exist"""
         if thing_id in self.things:
-            entity_exists = any(entity.entity_id == entity_id for entity in self.things[thing_id].entities)
-            
-            if not entity_exists:
+            key = (thing_id, entity_id)
+            entity = self._entity_index.get(key)
+
+            if entity is None:
                 entity = Entity(
                     name=entity_name,
                     thing_name=self.things[thing_id].name,
@@ -222,20 +457,50 @@ class IoTContext:
                     owner=owner,
                     description=description,
                 )
-                self.things[thing_id].entities.append(entity)
+                self._entity_index[key] = entity
+                thing = self.things[thing_id]
+                thing.entities = thing.entities + [entity]
+                self._record(ADDED, ENTITY, key)
+            elif entity.stale:
+                self._confirm(ENTITY, key, entity)
+            self._touch_entity(key, entity, time.monotonic())
+
+    @_serialized
+    def set_thing_language(self, thing_id: str, language: str, network_name: str, port: Any):
+        """Stores the communication parameters announced by the Identity_Language tweet"""
+        thing = self.things.get(thing_id)
+        if thing is None:
+            return
+        self._touch(self._seen_things, thing_id, thing, time.monotonic())
+        if thing.stale:
+            self._confirm(THING, thing_id, thing)
+        try:
+            port = int(port) if port not in (None, "") else None
+        except (TypeError, ValueError):
+            print(f"[Context] Invalid port '{port}' announced by {thing_id}")
+            port = None
+        if (thing.language, thing.network_name, thing.port) == (language, network_name, port):
+            return
+        thing.language = language
+        thing.network_name = network_name
+        if thing.port != port:
+            thing.port = port
+            for entity in thing.entities:
+                for service in entity.services:
+                    service.port = port
+        self._record(UPDATED, THING, thing_id)
 
+    @_serialized
     def add_relationship(self, thing_id: str, space_id: str, name: str, owner: str, 
                         category: str, type_: str, description: str, fs_name: str, ss_name: str):
         """Adds a legacy relationship"""
-        relationship_exists = any(
-            rel.thing_id == thing_id and 
-            rel.name == name and 
-            rel.src == fs_name and 
-            rel.dst == ss_name
-            for rel in self.relationships
-        )
-        
-        if not relationship_exists:
+        key = (thing_id, name, fs_name, ss_name)
+        self._touch_thing(thing_id, time.monotonic())
+        known = self._relationship_index.get(key)
+        if known is not None and known.stale:
+            self._confirm(RELATIONSHIP, key, known)
+
+        if known is None:
             rel = Relationship(
                 type=type_,
                 src=fs_name,
@@ -248,28 +513,169 @@ class IoTContext:
                 category=category,
                 description=description
             )
+            self._relationship_index[key] = rel
+            self._thing_relationships.setdefault(thing_id, []).append(key)
             self.relationships.append(rel)
+            self._record(ADDED, RELATIONSHIP, key)
+
+    def add_eviction_listener(self, callback):
+        """Registers callback(kind, key, obj), called for every object evicted from the registry"""
+        self._eviction_listeners.append(callback)
+
+    def _notify_evicted(self, evicted):
+        for kind, key, obj in evicted:
+            for callback in self._eviction_listeners:
+                try:
+                    callback(kind, key, obj)
+                except Exception as e:
+                    print(f"[Context] Eviction listener failed on {kind} {key}: {e}")
+
+    def _remove_service(self, key: Tuple[str, str, str, str]):
+        service = self._service_index.pop(key, None)
+        if service is None:
+            return
+        self._seen_members.pop((SERVICE, key), None)
+        entity = self._entity_index.get(key[:2])
+        if entity is not None:
+            entity.services = [s for s in entity.services if s is not service]
+        self._record(REMOVED, SERVICE, key)
+        self._evicted.append((SERVICE, key, service))
+
+    def _remove_entity(self, key: Tuple[str, str]):
+        entity = self._entity_index.pop(key, None)
+        if entity is None:
+            return
+        self._seen_members.pop((ENTITY, key), None)
+        for service in entity.services:
+            self._remove_service((key[0], key[1], service.name, service.endpoint))
+        thing = self.things.get(key[0])
+        if thing is not None:
+            thing.entities = [e for e in thing.entities if e is not entity]
+        self._record(REMOVED, ENTITY, key)
+        self._evicted.append((ENTITY, key, entity))
+
+    def _remove_thing(self, thing_id: str):
+        thing = self.things.get(thing_id)
+        if thing is None:
+            return
+        for entity in thing.entities:
+            self._remove_entity((thing_id, entity.entity_id))
+        for key in self._thing_relationships.pop(thing_id, ()):
+            rel = self._relationship_index.pop(key)
+            self._record(REMOVED, RELATIONSHIP, key)
+            self._evicted.append((RELATIONSHIP, key, rel))
+            self._relationships_stale = True
+        del self.things[thing_id]
+        self._seen_things.pop(thing_id, None)
+        self._record(REMOVED, THING, thing_id)
+        self._evicted.append((THING, thing_id, thing))
+
+    def _sync_relationships(self):
+        # The relationship list is rebuilt once per eviction pass instead of once per removed thing
+        if self._relationships_stale:
+            self.relationships = list(self._relationship_index.values())
+            self._relationships_stale = False
+
+    @_serialized
+    def evict_stale(self, ttl: float, now: Optional[float] = None) -> int:
+        """
+        Removes the things, entities and services not announced in the last `ttl` seconds,
+        children first. Returns the number of evicted objects.
+        """
+        cutoff = (time.monotonic() if now is None else now) - ttl
+        evicted = len(self._evicted)
+        while self._seen_things:
+            thing_id, thing = next(iter(self._seen_things.items()))
+            if thing.last_seen >= cutoff:
+                break
+            self._remove_thing(thing_id)
+        while self._seen_members:
+            (kind, key), obj = next(iter(self._seen_members.items()))
+            if obj.last_seen >= cutoff:
+                break
+            if kind == ENTITY:
+                self._remove_entity(key)
+            else:
+                self._remove_service(key)
+        self._sync_relationships()
+        return len(self._evicted) - evicted
+
+    @_serialized
+    def add_cached(self, things: List[Thing], relationships: List[Relationship]) -> int:
+        """
+        Merges things restored from the discovery cache, with their entities and services, marked as stale.
+        Things already announced in this session are skipped. Returns the number of restored things.
+        """
+        now = time.monotonic()
+        restored = 0
+        for thing in things:
+            if thing.id in self.things:
+                continue
+            if self.max_things is not None and len(self.things) >= self.max_things:
+                break
+            thing.stale = True
+            self.things[thing.id] = thing
+            self._record(ADDED, THING, thing.id)
+            self._touch(self._seen_things, thing.id, thing, now)
+            for entity in thing.entities:
+                key = (thing.id, entity.entity_id)
+                entity.stale = True
+                self._entity_index[key] = entity
+                self._record(ADDED, ENTITY, key)
+                self._touch(self._seen_members, (ENTITY, key), entity, now)
+                for service in entity.services:
+                    service_key = (thing.id, entity.entity_id, service.name, service.endpoint)
+                    service.stale = True
+                    self._service_index[service_key] = service
+                    self._record(ADDED, SERVICE, service_key)
+                    self._touch(self._seen_members, (SERVICE, service_key), service, now)
+            restored += 1
+        for rel in relationships:
+            key = (rel.thing_id, rel.name, rel.src, rel.dst)
+            thing = self.things.get(rel.thing_id)
+            if thing is None or not thing.stale or key in self._relationship_index:
+                continue
+            rel.stale = True
+            self._relationship_index[key] = rel
+            self._thing_relationships.setdefault(rel.thing_id, []).append(key)
+            self.relationships.append(rel)
+            self._record(ADDED, RELATIONSHIP, key)
+        return restored
+
+    @_serialized
+    def remove_thing(self, thing_id: str):
+        """Removes a thing with its entities, services and relationships"""
+        self._remove_thing(thing_id)
+        self._sync_relationships()
+
+    def get_entity(self, thing_id: str, entity_id: str) -> Optional[Entity]:
+        """Returns the entity with the given id, if known"""
+        return self._entity_index.get((thing_id, entity_id))
+
+    def get_service(self, thing_id: str, entity_id: str, service_name: str, endpoint: str) -> Optional[Service]:
+        """Returns the service with the given key, if known"""
+        return self._service_index.get((thing_id, entity_id, service_name, endpoint))
+
+    def get_thing(self, thing_id: str) -> Optional[Thing]:
+        """Returns the thing with the given id, if known"""
+        return self.things.get(thing_id)
+
+    def get_relationship(self, key: Tuple[str, str, str, str]) -> Optional[Relationship]:
+        """Returns the relationship with the given (thing_id, name, src, dst) key, if known"""
+        return self._relationship_index.get(key)
 
     def get_things(self):
         """Returns all things"""
-        return list(self.things.values())
+        return self.snapshot().things
 
     def get_entities(self):
         """Returns all entities"""
-        entities = []
-        for thing in self.get_things():
-            for e in thing.entities:
-                entities.append(e)
-        return entities
+        return self.snapshot().entities
 
     def get_services(self):
         """Returns all services"""
-        all_services = []
-        for entity in self.get_entities():
-            for s in entity.services:
-                all_services.append(s)
-        return all_services
+        return self.snapshot().services
 
     def get_relationships(self):
         """Returns all relationships"""
-        return self.relationships
+        return self.snapshot().relationships
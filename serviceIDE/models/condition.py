@@ -0,0 +1,198 @@
+import functools
+import operator
+import re
+from typing import Any, Callable
+
+# Conditions of "condition" relationships are tested against the output of the source service:
+#   > 20.5                      comparison with a number (negative and float values allowed)
+#   == "open"   != closed       string equality, quotes are optional for single words
+#   in [18, 22.5]               inclusive range
+#   >= 0 and not (== 3 or in [10, 20])
+# They are compiled once into a Condition, evaluating it does not parse anything.
+
+COMPARISONS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?![\w.])
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op>>=|<=|==|!=|>|<)
+      | (?P<punct>[()\[\],])
+      | (?P<word>[A-Za-z_][\w.-]*)
+    )""", re.VERBOSE)
+
+_KEYWORDS = {"and", "or", "not", "in"}
+
+
+class ConditionError(ValueError):
+    """Syntax error in a relationship condition"""
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    return float(str(value).strip())
+
+
+class Condition:
+    """A compiled condition, call it with the source output: condition(value) -> bool"""
+    __slots__ = ("source", "_test")
+
+    def __init__(self, source: str, test: Callable[[Any], bool]):
+        self.source = source
+        self._test = test
+
+    def __call__(self, value) -> bool:
+        return self._test(value)
+
+    def __repr__(self):
+        return f"Condition({self.source!r})"
+
+
+def _number_test(op, bound):
+    def test(value):
+        try:
+            return op(_to_number(value), bound)
+        except (TypeError, ValueError):
+            return False
+    return test
+
+
+def _string_test(op, expected):
+    def test(value):
+        return op(str(value).strip(), expected)
+    return test
+
+
+def _range_test(low, high):
+    def test(value):
+        try:
+            return low <= _to_number(value) <= high
+        except (TypeError, ValueError):
+            return False
+    return test
+
+
+class _Parser:
+    """Recursive descent parser: or_expr := and_expr ('or' and_expr)*, and_expr := unary ('and' unary)*"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                raise ConditionError(f"Unexpected character at position {pos} in condition '{self.text}'")
+            kind = match.lastgroup
+            value = match.group(kind)
+            start = match.start(kind)
+            if kind == "word" and value.lower() in _KEYWORDS:
+                kind, value = "keyword", value.lower()
+            self.tokens.append((kind, value, start))
+            pos = match.end()
+        self.index = 0
+
+    def error(self, message):
+        if self.index < len(self.tokens):
+            message += f" at position {self.tokens[self.index][2]}"
+        return ConditionError(f"{message} in condition '{self.text}'")
+
+    def peek(self, kind=None, value=None):
+        if self.index >= len(self.tokens):
+            return None
+        token = self.tokens[self.index]
+        if (kind is not None and token[0] != kind) or (value is not None and token[1] != value):
+            return None
+        return token
+
+    def take(self, kind=None, value=None):
+        token = self.peek(kind, value)
+        if token is not None:
+            self.index += 1
+        return token
+
+    def expect(self, kind, value=None, what=None):
+        token = self.take(kind, value)
+        if token is None:
+            raise self.error(f"Expected {what or value or kind}")
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ConditionError("Empty condition")
+        test = self.or_expr()
+        if self.index != len(self.tokens):
+            raise self.error(f"Unexpected '{self.tokens[self.index][1]}'")
+        return test
+
+    def or_expr(self):
+        tests = [self.and_expr()]
+        while self.take("keyword", "or"):
+            tests.append(self.and_expr())
+        if len(tests) == 1:
+            return tests[0]
+        return lambda value: any(test(value) for test in tests)
+
+    def and_expr(self):
+        tests = [self.unary()]
+        while self.take("keyword", "and"):
+            tests.append(self.unary())
+        if len(tests) == 1:
+            return tests[0]
+        return lambda value: all(test(value) for test in tests)
+
+    def unary(self):
+        if self.take("keyword", "not"):
+            test = self.unary()
+            return lambda value: not test(value)
+        if self.take("punct", "("):
+            test = self.or_expr()
+            self.expect("punct", ")", "')'")
+            return test
+        return self.comparison()
+
+    def number(self):
+        return float(self.expect("number", what="a number")[1])
+
+    def comparison(self):
+        if self.take("keyword", "in"):
+            self.expect("punct", "[", "'['")
+            low = self.number()
+            self.expect("punct", ",", "','")
+            high = self.number()
+            self.expect("punct", "]", "']'")
+            if low > high:
+                raise ConditionError(f"Empty range [{low:g}, {high:g}] in condition '{self.text}'")
+            return _range_test(low, high)
+
+        op_token = self.expect("op", what="a comparison operator (<, >, ==, <=, >=, !=) or 'in'")
+        op = COMPARISONS[op_token[1]]
+        operand = self.take("number")
+        if operand is not None:
+            return _number_test(op, float(operand[1]))
+        operand = self.take("string") or self.take("word")
+        if operand is None:
+            raise self.error(f"Expected a value after '{op_token[1]}'")
+        if op not in (operator.eq, operator.ne):
+            raise ConditionError(f"'{op_token[1]}' needs a number, got '{operand[1]}' in condition '{self.text}'")
+        text = operand[1][1:-1] if operand[0] == "string" else operand[1]
+        return _string_test(op, text)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_condition(text: str) -> Condition:
+    """Compiles a condition, raises ConditionError if it is not valid"""
+    if not isinstance(text, str):
+        raise ConditionError(f"Condition must be a string, got {type(text).__name__}")
+    return Condition(text.strip(), _Parser(text).parse())
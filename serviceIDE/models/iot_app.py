@@ -22,8 +22,8 @@ class IoTApp:
         # Remove associated relationships
         self.relationship_instances = [
             rel for rel in self.relationship_instances
-            if rel.src_service_instance.id != service_instance_id and 
-               rel.dst_service_instance.id != service_instance_id
+            if rel.src.id != service_instance_id and
+               rel.dst.id != service_instance_id
         ]
         
         # Remove the service instance
@@ -78,10 +78,12 @@ class IoTApp:
         
         # Verify that relationships have valid ServiceInstances
         for rel in self.relationship_instances:
-            if rel.src_service_instance not in self.service_instances:
+            if rel.src not in self.service_instances:
                 errors.append(f"Relationship '{rel.get_display_name()}' has invalid source service")
-            if rel.dst_service_instance not in self.service_instances:
+            if rel.dst not in self.service_instances:
                 errors.append(f"Relationship '{rel.get_display_name()}' has invalid destination service")
+            if rel.condition_error:
+                errors.append(f"Relationship '{rel.get_display_name()}' has an invalid condition: {rel.condition_error}")
         
         return errors
 
@@ -3,6 +3,7 @@ from typing import Dict, List, Optional, Any
 import socket
 import uuid
 from models.service_instance import ServiceInstance
+from models.condition import Condition, ConditionError, compile_condition
 
 @dataclass
 class RelationshipInstance:
@@ -15,6 +16,9 @@ class RelationshipInstance:
     name: Optional[str] = None
     category: Optional[str] = None
     description: Optional[str] = None
+    # Set by compile_condition: the compiled condition, or the syntax error reported by IoTApp.validate_app
+    compiled_condition: Optional[Condition] = field(default=None, init=False, repr=False, compare=False)
+    condition_error: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not self.id:
@@ -23,6 +27,20 @@ class RelationshipInstance:
             self.name = f"{self.src.get_display_name()}_to_{self.dst.get_display_name()}_{self.type}"
         if not self.category:
             self.category = self._get_default_category()
+        self.compile_condition()
+
+    def compile_condition(self):
+        """Compiles the condition once, call it again after changing the condition"""
+        self.compiled_condition = None
+        self.condition_error = None
+        if self.is_conditional():
+            try:
+                self.compiled_condition = compile_condition(self.condition or "")
+            except ConditionError as e:
+                self.condition_error = str(e)
+
+    def is_conditional(self) -> bool:
+        return self.type.lower() in ("condition", "conditional")
 
     def _get_default_category(self) -> str:
         """Determines the default category based on the type"""
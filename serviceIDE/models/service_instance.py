@@ -68,7 +68,7 @@ class ServiceInstance:
         """Serializes into a dictionary"""
         return {
             "id": self.id,
-            "service": self.service.__dict__,
+            "service": self.service.to_dict(),
             "input_values": self.input_values,
             "custom_name": self.custom_name
         }
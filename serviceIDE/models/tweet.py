@@ -1,29 +1,96 @@
 from dataclasses import dataclass
+from typing import Any, ClassVar, Optional
 
-@dataclass
-class ServiceTweet:
-    name: str
+# Typed tweets produced by processor.process_tweet, one class per "Tweet Type".
+# Slotted: thousands of them can sit in tweet_queue without a __dict__ each.
+
+@dataclass(slots=True)
+class Tweet:
+    address: Any  # (ip, port) the datagram came from
     thing_id: str
+    space_id: str
+
+    TWEET_TYPE: ClassVar[str] = ""
+
+@dataclass(slots=True)
+class IdentityTweet(Tweet):
+    name: str
+    model: str = ""
+    owner: str = ""
+    vendor: str = ""
+    description: str = ""
+    os: str = ""
+
+    TWEET_TYPE: ClassVar[str] = "Identity_Thing"
+
+    @classmethod
+    def from_dict(cls, data: dict, address: Any):
+        return cls(address, data["Thing ID"], data["Space ID"], data["Name"], data.get("Model", ""),
+                   data.get("Owner", ""), data.get("Vendor", ""), data.get("Description", ""), data.get("OS", ""))
+
+@dataclass(slots=True)
+class LanguageTweet(Tweet):
+    language: str = ""
+    network_name: str = ""
+    ip: str = ""
+    port: Optional[str] = None
+
+    TWEET_TYPE: ClassVar[str] = "Identity_Language"
+
+    @classmethod
+    def from_dict(cls, data: dict, address: Any):
+        return cls(address, data["Thing ID"], data.get("Space ID", ""), data.get("Communication Language", ""),
+                   data.get("Network Name", ""), data.get("IP", ""), data.get("Port"))
+
+@dataclass(slots=True)
+class EntityTweet(Tweet):
     entity_id: str
-    api: str
-    description: str
-    keywords: str
+    name: str
+    type: str = ""
+    owner: str = ""
+    vendor: str = ""
+    description: str = ""
 
-@dataclass
-class RelationshipTweet:
-    thing_id: str
+    TWEET_TYPE: ClassVar[str] = "Identity_Entity"
+
+    @classmethod
+    def from_dict(cls, data: dict, address: Any):
+        return cls(address, data["Thing ID"], data["Space ID"], data["ID"], data["Name"], data.get("Type", ""),
+                   data.get("Owner", ""), data.get("Vendor", ""), data.get("Description", ""))
+
+@dataclass(slots=True)
+class ServiceTweet(Tweet):
     name: str
-    description: str
-    source_service: str
-    target_service: str
+    entity_id: str
+    api: str
+    type: str = ""
+    app_category: str = ""
+    description: str = ""
+    keywords: str = ""
+    vendor: str = ""
 
-@dataclass
-class IdentityTweet:
-    thing_id: str
-    space_id: str
+    TWEET_TYPE: ClassVar[str] = "Service"
+
+    @classmethod
+    def from_dict(cls, data: dict, address: Any):
+        return cls(address, data["Thing ID"], data["Space ID"], data["Name"], data["Entity ID"], data["API"],
+                   data.get("Type", ""), data.get("AppCategory", ""), data.get("Description", ""),
+                   data.get("Keywords", ""), data.get("Vendor", ""))
+
+@dataclass(slots=True)
+class RelationshipTweet(Tweet):
     name: str
-    id: str
-    model: str
-    owner: str
-    vendor: str
-    decription: str
+    owner: str = ""
+    category: str = ""
+    type: str = ""
+    description: str = ""
+    source_service: str = ""
+    target_service: str = ""
+
+    TWEET_TYPE: ClassVar[str] = "Relationship"
+
+    @classmethod
+    def from_dict(cls, data: dict, address: Any):
+        return cls(address, data["Thing ID"], data["Space ID"], data["Name"], data.get("Owner", ""),
+                   data.get("Category", ""), data.get("Type", ""), data.get("Description", ""),
+                   data.get("FS name", ""), data.get("SS name", ""))
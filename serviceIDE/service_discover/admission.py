@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from service_discover.metrics import metrics
+
+# Atlas things run on Raspberry Pis and serve one request at a time
+DEFAULT_MAX_CONCURRENT = 1
+DEFAULT_RATE = 10.0  # requests per second
+DEFAULT_BURST = 5
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_MAX_WAIT = 30.0  # seconds a call may wait for admission
+# Adaptive mode: the concurrency limit of a thing grows while its latency stays under the target
+DEFAULT_TARGET_LATENCY = 0.5
+MAX_ADAPTIVE_CONCURRENT = 8
+
+
+class AdmissionRejected(Exception):
+    """The call was not admitted: the queue of the thing is full or the wait timed out"""
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average and bursts of `burst` calls"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def delay(self):
+        """Takes a token and returns 0, or returns how long to wait before one is available"""
+        if self.rate is None or self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ThingLimiter:
+    """
+    Admission for the calls to one thing: callers queue in FIFO order (at most queue_size of them),
+    the head is admitted when a concurrency slot is free and the token bucket allows it.
+    """
+
+    def __init__(self, thing, max_concurrent=DEFAULT_MAX_CONCURRENT, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 queue_size=DEFAULT_QUEUE_SIZE, adaptive=False, target_latency=DEFAULT_TARGET_LATENCY):
+        self.thing = thing
+        self.limit = max_concurrent
+        self.bucket = TokenBucket(rate, burst)
+        self.queue_size = queue_size
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.latency = None  # exponentially weighted moving average, seconds
+        self.active = 0
+        self._waiting = deque()
+        self._cond = threading.Condition()
+        self.stats = {"admitted": 0, "rejected": 0, "timeouts": 0, "max_queue_depth": 0,
+                      "total_wait": 0.0, "max_wait": 0.0}
+
+    def reconfigure(self, max_concurrent=DEFAULT_MAX_CONCURRENT, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                    queue_size=DEFAULT_QUEUE_SIZE, adaptive=False, target_latency=DEFAULT_TARGET_LATENCY):
+        """Applies new limits in place; calls in progress keep their slot, queued ones see the new limits at once"""
+        with self._cond:
+            self.limit = max_concurrent
+            self.bucket.delay()  # settle the tokens earned at the old rate
+            self.bucket.rate = rate
+            self.bucket.burst = burst
+            self.bucket.tokens = min(self.bucket.tokens, float(burst))
+            self.queue_size = queue_size
+            self.adaptive = adaptive
+            self.target_latency = target_latency
+            metrics.set("admission_limit", self.limit, thing=self.thing)
+            self._cond.notify_all()
+
+    def acquire(self, timeout=DEFAULT_MAX_WAIT):
+        """Blocks until the call is admitted, returns the time spent waiting"""
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        ticket = object()
+        with self._cond:
+            if len(self._waiting) >= self.queue_size:
+                self.stats["rejected"] += 1
+                metrics.inc("admission_rejected_total", thing=self.thing, reason="queue_full")
+                raise AdmissionRejected(f"{len(self._waiting)} calls already queued for {self.thing}")
+            self._waiting.append(ticket)
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiting))
+            metrics.set("admission_queue_depth", len(self._waiting), thing=self.thing)
+            try:
+                while True:
+                    wait = None
+                    if self._waiting[0] is ticket and self.active < self.limit:
+                        wait = self.bucket.delay()
+                        if wait == 0:
+                            break
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        metrics.inc("admission_rejected_total", thing=self.thing, reason="timeout")
+                        raise AdmissionRejected(f"no slot for {self.thing} after {timeout:.1f}s")
+                    if wait is not None and (remaining is None or wait < remaining):
+                        remaining = wait
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                metrics.set("admission_queue_depth", len(self._waiting), thing=self.thing)
+                self._cond.notify_all()
+            self.active += 1
+            waited = time.monotonic() - start
+            self.stats["admitted"] += 1
+            self.stats["total_wait"] += waited
+            self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+            metrics.inc("admission_admitted_total", thing=self.thing)
+            metrics.observe("admission_wait_seconds", waited, thing=self.thing)
+            metrics.set("admission_active", self.active, thing=self.thing)
+            return waited
+
+    def release(self, latency=None):
+        with self._cond:
+            self.active -= 1
+            if latency is not None:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                if self.adaptive:
+                    self._adapt()
+            metrics.set("admission_active", self.active, thing=self.thing)
+            metrics.set("admission_limit", self.limit, thing=self.thing)
+            self._cond.notify_all()
+
+    def _adapt(self):
+        # Additive increase while the thing keeps up, multiplicative decrease when it slows down
+        if self.latency > self.target_latency:
+            self.limit = max(1, self.limit // 2)
+        elif self.latency < self.target_latency / 2 and self.active + 1 >= self.limit:
+            self.limit = min(MAX_ADAPTIVE_CONCURRENT, self.limit + 1)
+
+    def get_stats(self):
+        with self._cond:
+            admitted = self.stats["admitted"]
+            return dict(self.stats, queue_depth=len(self._waiting), active=self.active, limit=self.limit,
+                        avg_wait=self.stats["total_wait"] / admitted if admitted else 0.0,
+                        latency=self.latency)
+
+
+class Admission:
+    """Outcome of an admitted call, reported back to its limiter on release"""
+
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        self.failed = True
+
+
+class AdmissionController:
+    """
+    Per-thing admission around outbound service calls. Limits come from `limits`
+    ({thing id: {"max_concurrent": 2, "rate": 5.0, "burst": 2, "queue_size": 16}}), from configure(),
+    or the defaults; with adaptive=True the concurrency limit follows the observed latency.
+    """
+
+    def __init__(self, limits=None, adaptive=False, target_latency=DEFAULT_TARGET_LATENCY, max_wait=DEFAULT_MAX_WAIT):
+        self.limits = dict(limits or {})
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.max_wait = max_wait
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _options(self, thing):
+        options = dict(adaptive=self.adaptive, target_latency=self.target_latency)
+        options.update(self.limits.get(thing, {}))
+        return options
+
+    def limiter(self, thing):
+        with self._lock:
+            limiter = self._limiters.get(thing)
+            if limiter is None:
+                limiter = self._limiters[thing] = ThingLimiter(thing, **self._options(thing))
+            return limiter
+
+    def configure(self, thing, **limits):
+        """Sets the limits of a thing, applied at once to its limiter if it already has one"""
+        with self._lock:
+            self.limits[thing] = limits
+            limiter = self._limiters.get(thing)
+            if limiter is not None:
+                limiter.reconfigure(**self._options(thing))
+
+    @contextmanager
+    def admit(self, thing):
+        """
+        Holds an admission slot of the thing for the duration of the block.
+        The block gets an Admission and calls its fail() when the call got no response,
+        an exception raised in the block counts as a failure too.
+        """
+        limiter = self.limiter(thing)
+        limiter.acquire(self.max_wait)
+        start = time.monotonic()
+        call = Admission()
+        try:
+            yield call
+        except BaseException:
+            call.fail()
+            raise
+        finally:
+            # A failed call says nothing about the service time of the thing
+            limiter.release(None if call.failed else time.monotonic() - start)
+
+    def get_stats(self):
+        """Statistics per thing: queue depth, waits, active calls and current limit"""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.thing: limiter.get_stats() for limiter in limiters}
+
+
+admission = AdmissionController()
@@ -1,12 +1,51 @@
 import socket
-import operator
-import re
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from service_discover.dag_executor import ExecutionGraph, critical_path
+from service_discover.transport import transport, DEFAULT_ATLAS_PORT
+from service_discover.single_flight import single_flight, COALESCED_TYPES
+from service_discover.admission import admission, AdmissionRejected
+from service_discover.health import health, CircuitOpenError
+from service_discover.retry import retry_policy
+from service_discover.metrics import metrics
+from service_discover import tracing
+from service_discover.tracing import Trace, trace_store
+from models.condition import ConditionError, compile_condition
 
-def build_request(service_instance, write_fn, input_fn, src_result_map=None):
+DEFAULT_MAX_WORKERS = 8  # Concurrent service calls per app run
+
+class MissingInputError(ValueError):
+    """Raised in non-interactive runs when a service input cannot be resolved"""
+
+
+def coerce_input(value, param_type, write_fn=None):
+    """
+    Converts a raw user or bindings value into its request representation.
+    Raises ValueError if the value does not match the type.
+    """
+    value = str(value)
+    if value.lower() == "null":
+        return "null"
+    elif param_type == "int":
+        return str(int(value))
+    elif param_type == "float":
+        return str(float(value))
+    elif param_type == "bool":
+        return "true" if value.lower() in ["true", "1", "yes"] else "false"
+    elif param_type == "str":
+        return f'"{value}"'
+    if write_fn:
+        write_fn(f"Type '{param_type}' not supported, treated as string.\n")
+    return f'"{value}"'
+
+
+def build_request(service_instance, write_fn, input_fn=None, src_result_map=None):
     """
     Builds the request for the service, using already configured input_values
     and, if necessary, inserting the output of the src service as input.
+    Without input_fn the run is non-interactive and a missing input raises MissingInputError.
     """
     service = service_instance.service
     input_params = getattr(service, "input_params", {})
@@ -21,26 +60,15 @@ def build_request(service_instance, write_fn, input_fn, src_result_map=None):
     # Ask the user only for missing inputs
     for param, param_type in input_params.items():
         if param not in input_values or input_values[param] == "":
+            if input_fn is None:
+                raise MissingInputError(f"Service '{service_instance.get_display_name()}' has no value for '{param}'")
             while True:
                 value = input_fn(f"Enter the value for '{param}' ({param_type}): ")
                 if not value:
                     write_fn("Input canceled or empty. Try again.\n")
                     continue
                 try:
-                    if value.lower() == "null":
-                        value = "null"
-                    elif param_type == "int":
-                        value = str(int(value))
-                    elif param_type == "float":
-                        value = str(float(value))
-                    elif param_type == "bool":
-                        value = "true" if value.lower() in ["true", "1", "yes"] else "false"
-                    elif param_type == "str":
-                        value = f'"{value}"'
-                    else:
-                        write_fn(f"Type '{param_type}' not supported, treated as string.\n")
-                        value = f'"{value}"'
-                    input_values[param] = value
+                    input_values[param] = coerce_input(value, param_type, write_fn)
                     break
                 except ValueError:
                     write_fn(f"Invalid value for type {param_type}. Try again.\n")
@@ -56,161 +84,374 @@ def build_request(service_instance, write_fn, input_fn, src_result_map=None):
     }
     return request
 
+def resolve_inputs(app, bindings=None):
+    """
+    Resolves every input of the app up front for a non-interactive run.
+    bindings maps a service instance id or display name to {param: raw value}.
+    Returns (values, missing): values maps instance id -> {param: request value} to merge
+    into the configured inputs, missing lists "Service 'x' has no value for 'p'" errors.
+    Inputs named like the output of a service feeding the instance are filled at run time.
+    """
+    bindings = bindings or {}
+    upstream_outputs = {}
+    for rel in app.relationship_instances:
+        if rel.src.service.output_name:
+            upstream_outputs.setdefault(rel.dst.id, set()).add(rel.src.service.output_name)
+
+    values = {}
+    missing = []
+    for si in app.service_instances:
+        bound = dict(bindings.get(si.id, {}))
+        bound.update(bindings.get(si.get_display_name(), {}))
+        resolved = {}
+        for param, param_type in si.service.input_params.items():
+            if param in bound:
+                try:
+                    resolved[param] = coerce_input(bound[param], param_type)
+                except ValueError:
+                    missing.append(f"Service '{si.get_display_name()}' has an invalid {param_type} value for '{param}': {bound[param]}")
+            elif si.input_values.get(param, "") == "" and param not in upstream_outputs.get(si.id, ()):
+                missing.append(f"Service '{si.get_display_name()}' has no value for '{param}'")
+        if resolved:
+            values[si.id] = resolved
+    return values, missing
+
 def evaluate_condition(response, condition: str) -> bool:
     """
     Evaluates a condition based on the response value.
+    The compiled condition is cached, an invalid condition evaluates to False.
     """
-    ops = {
-        ">": operator.gt,
-        "<": operator.lt,
-        "==": operator.eq,
-        "!=": operator.ne,
-        ">=": operator.ge,
-        "<=": operator.le
-    }
-    pattern = r"(>=|<=|==|!=|>|<)\s*(\d+)"
-    match = re.match(pattern, condition.strip())
-    if not match:
-        return False
-    op_str, value = match.groups()
-    value = int(value)
     try:
-        return ops[op_str](response, value)
-    except Exception:
+        return compile_condition(condition)(response)
+    except ConditionError:
         return False
 
 def call_api(service_instance, req, write_fn):
     """
     Calls the API for the given service instance.
+    The timeout follows the latency observed on the thing, the outcome feeds its health.
     """
     service = service_instance.service
     write_fn(f"[API] Calling service: {service.name} with API: {json.dumps(req)}\n")
     IP = service.ip
-    PORT = 6668  # Hardcoded in Atlas
+    PORT = getattr(service, "port", None) or DEFAULT_ATLAS_PORT
+    thing_health = health.thing(service.thing_name)
+    timeout = thing_health.timeout()
+    timings = {} if metrics.enabled else None
+    start = time.monotonic()
+    outcome = "error"
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(10.0)
-            s.connect((IP, PORT))
-            s.sendall(json.dumps(req).encode('utf-8'))
-            response = s.recv(4096).decode('utf-8').strip()
-            write_fn(f"[API RESPONSE] {response}\n")
-            return response
+        response = transport.request(IP, PORT, json.dumps(req).encode('utf-8'), timeout=timeout,
+                                     timings=timings).strip()
+        thing_health.record_success(time.monotonic() - start)
+        outcome = "ok"
+        write_fn(f"[API RESPONSE] {response}\n")
+        return response
     except socket.timeout:
-        write_fn(f"[ERROR] Timeout calling {service.name}\n")
+        thing_health.record_failure()
+        outcome = "timeout"
+        write_fn(f"[ERROR] Timeout calling {service.name} after {timeout:.1f}s\n")
         return None
     except Exception as e:
+        thing_health.record_failure()
         write_fn(f"[ERROR] Calling {service.name}: {e}\n")
         return None
+    finally:
+        if timings is not None:
+            _record_call(service, outcome, time.monotonic() - start, timings)
+
+def _record_call(service, outcome, duration, timings):
+    labels = {"thing": service.thing_name, "service": service.name}
+    metrics.inc("calls_total", outcome=outcome, **labels)
+    metrics.observe("call_seconds", duration, **labels)
+    for phase, seconds in timings.items():
+        metrics.observe(f"call_{phase}_seconds", seconds, **labels)
+
+def _admitted_call(service_instance, req, write_fn):
+    """
+    call_api once the per-thing admission controller lets the call through.
+    Calls to a thing whose circuit breaker is open fail at once instead of waiting for the timeout.
+    """
+    service = service_instance.service
+    thing_health = health.thing(service.thing_name)
+    try:
+        thing_health.before_call()
+    except CircuitOpenError as e:
+        write_fn(f"[BREAKER] {service.name} not sent: {e}\n")
+        return None
+    try:
+        with admission.admit(service.thing_name) as call:
+            res = call_api(service_instance, req, write_fn)
+            if res is None:
+                call.fail()
+            return res
+    except AdmissionRejected as e:
+        thing_health.cancel()
+        write_fn(f"[ADMISSION] {service.name} not sent: {e}\n")
+        return None
+
+def call_service(service_instance, req, write_fn, coalesce=True):
+    """
+    Calls the service through call_api, within the concurrency and rate limits of its thing.
+    Identical Report calls already in flight, from this run or from other apps, are not sent
+    again: the caller waits and shares their response.
+    """
+    service = service_instance.service
+    if not coalesce or (service.type or "").lower() not in COALESCED_TYPES:
+        return _admitted_call(service_instance, req, write_fn)
+    key = (service.thing_name, service.entity_id, service.name, req.get("Service Inputs", "()"))
+    res, shared = single_flight.do(key, lambda: _admitted_call(service_instance, req, write_fn))
+    if shared:
+        write_fn(f"[COALESCED] {service.name}: shared the response of an identical call in flight\n")
+    return res
+
+def _parse_response(res, service_name, write_fn):
+    """Returns (success, service result) from the raw response of a call"""
+    try:
+        res_json = json.loads(res) if res else {}
+        status = res_json.get("Status", "").lower() == "successful"
+        service_result = res_json.get("Service Result", None)
+    except Exception as e:
+        write_fn(f"[ERROR] Parsing response for {service_name}: {e}\n")
+        status = False
+        service_result = None
+    return status, service_result
+
+def _auto_inputs(rel, src_output, dst_instance):
+    """
+    Prepares the map for auto-input: if a destination input has the same name as the source output, insert it
+    """
+    auto_inputs = {}
+    if src_output is None:
+        return auto_inputs
+    dst_input_params = getattr(dst_instance.service, "input_params", {})
+    for param in dst_input_params:
+        # If the current input value is exactly the name of the src output, replace it
+        current_val = dst_instance.input_values.get(param, "")
+        if current_val == "" and param == rel.src.service.output_name:
+            auto_inputs[param] = src_output  # Unset input named like the src output
+            continue
+        if current_val == "" or current_val == str(src_output):
+            continue  # Do not replace if already set or empty
+        # If the input value is exactly the name of the src output, replace it
+        if current_val == rel.src.service.output_name:  # rel.src_output_name must be defined in the model
+            auto_inputs[param] = src_output
+    return auto_inputs
+
+def _edge_fires(rel, res_map, write_fn) -> bool:
+    """Decides whether the relationship lets its destination run, given the source result"""
+    src_instance = rel.src
+    dst_instance = rel.dst
+    rel_type = rel.type.lower()
+    src_result = res_map.get(src_instance.id)
+
+    if rel_type == "ordered":
+        write_fn(f"[ORDERED] Executing destination service: {dst_instance.get_display_name()}\n")
+        return True
+    elif rel_type == "on-success":
+        if src_result and src_result[0]:
+            write_fn(f"[ON-SUCCESS] Source {src_instance.get_display_name()} successful. Executing destination: {dst_instance.get_display_name()}\n")
+            return True
+        write_fn(f"[ON-SUCCESS] Source {src_instance.id} failed. Skipping destination: {dst_instance.get_display_name()}\n")
+        return False
+    elif rel_type == "condition" or rel_type == "conditional":
+        condition = getattr(rel, "compiled_condition", None)
+        if condition is None:
+            error = getattr(rel, "condition_error", None) or f"missing condition on {rel.name}"
+            write_fn(f"[CONDITIONAL] Invalid condition: {error}. Skipping destination: {dst_instance.get_display_name()}\n")
+            return False
+        if src_result and src_result[0]:
+            if condition(src_result[1]):
+                write_fn(f"[CONDITIONAL] Condition '{rel.condition}' satisfied. Executing destination: {dst_instance.get_display_name()}\n")
+                return True
+            write_fn(f"[CONDITIONAL] Condition '{rel.condition}' not satisfied. Skipping destination: {dst_instance.get_display_name()}\n")
+            return False
+        write_fn(f"[CONDITIONAL] Source {src_instance.get_display_name()} failed. Skipping destination: {dst_instance.get_display_name()}\n")
+        return False
+    write_fn(f"[WARNING] Unknown relation type: {rel.type}\n")
+    return False
 
-def invoke_iot_app(app, write_fn, input_fn, stop_flag=None):
+def invoke_iot_app(app, write_fn, input_fn=None, stop_flag=None, max_workers=DEFAULT_MAX_WORKERS, bindings=None,
+                   cache=None, retry=None, traces=None):
     """
     Invokes the IoT application by executing its services and relationships.
+    With input_fn=None the run is non-interactive: inputs come from the app, from
+    bindings or from upstream outputs, and MissingInputError is raised before any
+    call if one of them cannot be resolved.
+    Services run as soon as every source feeding them has completed, independent
+    branches run concurrently. A destination runs once if at least one incoming
+    relationship lets it run, otherwise it is skipped and its own destinations
+    are resolved in turn.
+    cache is an optional ResponseCache: Report services answered from it are not called.
+    Calls that get no response are retried by `retry` (the shared retry_policy by default)
+    within the retry budget of the run.
+    The run is recorded as a Trace (a span per service, request build, call and relationship decision)
+    saved to `traces` (the shared trace_store by default).
+    Returns a summary with the results, per-service timings, the critical path and the trace.
     """
-    write_fn(f"[APP] Invoking IoT App: {app.name}\n")
-    service_map = {s.id: s for s in app.service_instances}
+    # Callbacks may drive a GUI: keep their calls serialized across worker threads
+    write_lock = threading.Lock()
+    input_lock = threading.Lock()
+
+    def locked_write(text):
+        with write_lock:
+            write_fn(text)
+
+    def locked_input(msg):
+        with input_lock:
+            return input_fn(msg)
+
+    locked_write(f"[APP] Invoking IoT App: {app.name}\n")
+    bound_values = {}
+    if input_fn is None:
+        bound_values, missing = resolve_inputs(app, bindings)
+        if missing:
+            for error in missing:
+                locked_write(f"[ERROR] {error}\n")
+            raise MissingInputError(f"App '{app.name}' has {len(missing)} unresolved input(s)")
+    try:
+        graph = ExecutionGraph(app)
+    except ValueError as e:
+        locked_write(f"[ERROR] {e}\n")
+        return None
+    for rel in graph.invalid:
+        locked_write(f"[WARNING] Missing service(s): {rel.src.get_display_name()} or {rel.dst.get_display_name()}\n")
+
+    service_map = graph.nodes
     res_map = {}  # id_service_instance: [success, result]
     output_map = {}  # id_service_instance: result (for auto-input)
+    timings = {}  # id_service_instance: (start, end)
+    pending = {node_id: len(rels) for node_id, rels in graph.incoming.items()}
+    fired = {node_id: False for node_id in service_map}
+    auto_inputs = {node_id: dict(bound_values.get(node_id, {})) for node_id in service_map}
+    stopped = [False]
 
-    for rel in app.relationship_instances:
-        if stop_flag and stop_flag.get("stop"):
-            write_fn("[STOP] Execution interrupted by user.\n")
-            break
-        src_instance = rel.src
-        dst_instance = rel.dst
-        rel_type = rel.type.lower()
-        # write_fn(f"[DEBUG] rel.src: {src_instance} ({type(src_instance)}), rel.dst: {dst_instance} ({type(dst_instance)})\n")
-
-        src_service = service_map.get(src_instance.id)
-        dst_service = service_map.get(dst_instance.id)
-
-        if not src_service or not dst_service:
-            write_fn(f"[WARNING] Missing service(s): {src_instance.get_display_name()} or {dst_instance.get_display_name()}\n")
-            continue
+    def is_stopped():
+        if not stopped[0] and stop_flag and stop_flag.get("stop"):
+            stopped[0] = True
+            locked_write("[STOP] Execution interrupted by user.\n")
+        return stopped[0]
 
-        # Execute the source service only if not already executed
-        if len(res_map) == 0:
-            write_fn("[FIRST CALL] Executing source service\n")
-            req = build_request(src_service, write_fn, input_fn)
-            res = call_api(src_service, req, write_fn)
-            if stop_flag and stop_flag.get("stop"):
-                write_fn("[STOP] Execution interrupted by user.\n")
-                break
-            try:
-                res_json = json.loads(res) if res else {}
-                status = res_json.get("Status", "").lower() == "successful"
-                service_result = res_json.get("Service Result", None)
-            except Exception as e:
-                write_fn(f"[ERROR] Parsing response for {src_service.service.name}: {e}\n")
-                status = False
-                service_result = None
-            res_map[src_instance.id] = [status, service_result]
-            output_map[src_instance.id] = service_result
-            write_fn(f"[RESULT] {src_service.service.name}: Success={status}, Result={service_result}\n")
-
-        should_execute_dst = False
-
-        # Determine whether to execute the destination service
-        if rel_type == "ordered":
-            write_fn(f"[ORDERED] Executing destination service: {dst_instance.get_display_name()}\n")
-            should_execute_dst = True
-        elif rel_type == "on-success":
-            src_result = res_map.get(src_instance.id)
-            if src_result and src_result[0]:
-                write_fn(f"[ON-SUCCESS] Source {src_instance.get_display_name()} successful. Executing destination: {dst_instance.get_display_name()}\n")
-                should_execute_dst = True
-            else:
-                write_fn(f"[ON-SUCCESS] Source {src_instance.id} failed. Skipping destination: {dst_instance.get_display_name()}\n")
-        elif rel_type == "condition" or rel_type == "conditional":
-            src_result = res_map.get(src_instance.id)
-            if src_result and src_result[0] and hasattr(rel, 'condition'):
-                try:
-                    response_value = int(src_result[1])
-                except (ValueError, TypeError):
-                    response_value = src_result[1]
-                condition_result = evaluate_condition(response_value, rel.condition)
-                if condition_result:
-                    write_fn(f"[CONDITIONAL] Condition '{rel.condition}' satisfied. Executing destination: {dst_instance.get_display_name()}\n")
-                    should_execute_dst = True
-                else:
-                    write_fn(f"[CONDITIONAL] Condition '{rel.condition}' not satisfied. Skipping destination: {dst_instance.get_display_name()}\n")
-            else:
-                write_fn(f"[CONDITIONAL] Source {src_instance.get_display_name()} failed. Skipping destination: {dst_instance.get_display_name()}\n")
+    def execute(node_id):
+        instance = service_map[node_id]
+        service = instance.service
+        start = time.perf_counter()
+        req = build_request(instance, locked_write, locked_input if input_fn else None,
+                            src_result_map=auto_inputs[node_id])
+        built = time.perf_counter()
+        trace.add(tracing.BUILD, "build_request", start, built, parent=span_ids[node_id])
+        if metrics.enabled:
+            metrics.observe("build_request_seconds", built - start, service=service.name)
+        res = cache.get(service, req) if cache is not None else None
+        if res is not None:
+            locked_write(f"[CACHE] {service.name}: cached response {res}\n")
+            status, service_result = _parse_response(res, service.name, locked_write)
+            trace.add(tracing.CACHED, service.name, built, time.perf_counter(), parent=span_ids[node_id])
         else:
-            write_fn(f"[WARNING] Unknown relation type: {rel.type}\n")
-
-        if should_execute_dst:
-            # Prepare the map for auto-input: if a destination input has the same name as the source output, insert it
-            auto_inputs = {}
-            src_output = output_map.get(src_instance.id)
-            dst_input_params = getattr(dst_service.service, "input_params", {})
-            if src_output is not None:
-                for param in dst_input_params:
-                    # If the current input value is exactly the name of the src output, replace it
-                    current_val = dst_service.input_values.get(param, "")
-                    if current_val == "" or current_val == str(src_output):
-                        continue  # Do not replace if already set or empty
-                    # If the input value is exactly the name of the src output, replace it
-                    if current_val == rel.src.service.output_name:  # rel.src_output_name must be defined in the model
-                        auto_inputs[param] = src_output
-            req = build_request(dst_service, write_fn, input_fn, src_result_map=auto_inputs)
-            res = call_api(dst_service, req, write_fn)
-            if stop_flag and stop_flag.get("stop"):
-                write_fn("[STOP] Execution interrupted by user.\n")
-                break
-            try:
-                res_json = json.loads(res) if res else {}
-                status = res_json.get("Status", "").lower() == "successful"
-                service_result = res_json.get("Service Result", None)
-            except Exception as e:
-                write_fn(f"[ERROR] Parsing response for {dst_service.service.name}: {e}\n")
-                status = False
-                service_result = None
-            res_map[dst_instance.id] = [status, service_result]
-            output_map[dst_instance.id] = service_result
-            write_fn(f"[RESULT] {dst_service.service.name}: Success={status}, Result={service_result}\n")
-
-    write_fn(f"[PROMPT] EXECUTION COMPLETED\n")
-    write_fn("\n[SERVICE RESULTS SUMMARY]\n")
+            res = policy.call(service, lambda: call_service(instance, req, locked_write), locked_write,
+                              deadline, is_stopped)
+            trace.add(tracing.CALL, service.name, built, time.perf_counter(), parent=span_ids[node_id],
+                      thing=service.thing_name, responded=res is not None)
+            status, service_result = _parse_response(res, service.name, locked_write)
+            if status and cache is not None:
+                cache.put(service, req, res)
+        return status, service_result, start, time.perf_counter()
+
+    run_start = time.perf_counter()
+    policy = retry if retry is not None else retry_policy
+    deadline = policy.deadline()
+    trace = Trace(app.name, origin=run_start)
+    run_span = trace.new_id()
+    span_ids = {node_id: trace.new_id() for node_id in service_map}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+
+        def submit(node_id):
+            if is_stopped():
+                return
+            futures[pool.submit(execute, node_id)] = node_id
+
+        def resolve(node_id):
+            """Marks the node as settled and releases the destinations that were waiting for it"""
+            ready = [node_id]
+            while ready:
+                current = ready.pop()
+                for rel in graph.outgoing[current]:
+                    dst_id = rel.dst.id
+                    fires = not is_stopped() and _edge_fires(rel, res_map, locked_write)
+                    trace.add(tracing.EDGE, f"{rel.src.get_display_name()} → {rel.dst.get_display_name()}",
+                              time.perf_counter(), parent=span_ids[current], type=rel.type, fired=fires,
+                              dst=span_ids[dst_id])
+                    if fires:
+                        fired[dst_id] = True
+                        auto_inputs[dst_id].update(_auto_inputs(rel, output_map.get(current), service_map[dst_id]))
+                    pending[dst_id] -= 1
+                    if pending[dst_id] == 0:
+                        if fired[dst_id]:
+                            submit(dst_id)
+                        else:
+                            trace.add(tracing.SKIPPED, service_map[dst_id].get_display_name(), time.perf_counter(),
+                                      parent=run_span, span_id=span_ids[dst_id])
+                            ready.append(dst_id)
+
+        for node_id in graph.roots():
+            locked_write(f"[START] Executing source service: {service_map[node_id].get_display_name()}\n")
+            submit(node_id)
+
+        while futures:
+            done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                node_id = futures.pop(future)
+                instance = service_map[node_id]
+                try:
+                    status, service_result, start, end = future.result()
+                    timings[node_id] = (start, end)
+                    trace.add(tracing.SERVICE, instance.get_display_name(), start, end, parent=run_span,
+                              span_id=span_ids[node_id], success=status, result=_short(service_result))
+                except Exception as e:
+                    locked_write(f"[ERROR] Executing {instance.service.name}: {e}\n")
+                    status, service_result = False, None
+                    trace.add(tracing.SERVICE, instance.get_display_name(), time.perf_counter(), parent=run_span,
+                              span_id=span_ids[node_id], success=False, error=str(e))
+                res_map[node_id] = [status, service_result]
+                output_map[node_id] = service_result
+                locked_write(f"[RESULT] {instance.service.name}: Success={status}, Result={service_result}\n")
+                if is_stopped():
+                    continue
+                resolve(node_id)
+
+    run_duration = time.perf_counter() - run_start
+    if metrics.enabled:
+        outcome = "stopped" if stopped[0] else "ok" if all(v[0] for v in res_map.values()) else "failed"
+        metrics.observe("app_run_seconds", run_duration, app=app.name)
+        metrics.inc("app_runs_total", app=app.name, outcome=outcome)
+    path, path_duration = critical_path(graph, timings)
+    trace.add(tracing.RUN, app.name, run_start, run_start + run_duration, span_id=run_span,
+              stopped=stopped[0], critical_path=[span_ids[n] for n in path])
+    (traces if traces is not None else trace_store).save(trace)
+
+    locked_write(f"[PROMPT] EXECUTION COMPLETED\n")
+    locked_write("\n[SERVICE RESULTS SUMMARY]\n")
     for k, v in res_map.items():
         service_name = service_map[k].service.name if k in service_map else k
-        write_fn(f"{service_name}: Success={v[0]}, Result={v[1]}\n")
\ No newline at end of file
+        locked_write(f"{service_name}: Success={v[0]}, Result={v[1]}\n")
+    if path:
+        path_names = " → ".join(service_map[n].get_display_name() for n in path)
+        locked_write(f"[TIMING] Run completed in {run_duration * 1000:.1f} ms, "
+                     f"critical path {path_duration * 1000:.1f} ms: {path_names}\n")
+
+    return {
+        "results": res_map,
+        "timings": timings,
+        "critical_path": path,
+        "critical_path_duration": path_duration,
+        "duration": run_duration,
+        "trace": trace.to_dict(),
+    }
+
+def _short(value, limit=80):
+    """Service result as kept in a trace span"""
+    if value is None:
+        return None
+    text = str(value)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
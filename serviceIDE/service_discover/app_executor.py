@@ -1,13 +1,17 @@
 # gui/tabs/app_executor.py
 import tkinter as tk
 from tkinter import ttk, messagebox, Toplevel
-import re
 import json
 import threading
 import queue
 import time
 from datetime import datetime
 from service_discover.api_caller import invoke_iot_app
+from models.api_signature import parse_api_string
+from gui.tabs.log_pipeline import LogPipeline
+
+# Put on user_input_queue when the terminal window goes away, so a pending prompt returns
+TERMINAL_CLOSED = object()
 
 
 class AppExecutor:
@@ -16,9 +20,10 @@ class AppExecutor:
         self.terminal_window = None
         self.terminal_text = None
         self.terminal_input = None
-        self.terminal_queue = queue.Queue()
+        self.terminal_log = None
         self.user_input_queue = queue.Queue()
         self.waiting_for_input = False
+        self.terminal_closed = True
 
     def create_terminal_window(self):
         """Create a separate terminal window"""
@@ -30,6 +35,8 @@ class AppExecutor:
         self.terminal_window.title("App Execution Terminal")
         self.terminal_window.geometry("800x600")
         self.terminal_window.configure(bg="black")
+        self.terminal_window.bind("<Destroy>", self.on_terminal_destroyed)
+        self.terminal_closed = False
         
         # Terminal text area
         terminal_frame = tk.Frame(self.terminal_window, bg="black")
@@ -42,6 +49,7 @@ class AppExecutor:
         self.terminal_text.config(yscrollcommand=terminal_scroll.set)
         self.terminal_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         terminal_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.terminal_log = LogPipeline(self.terminal_text)
         
         # Input frame
         input_frame = tk.Frame(self.terminal_window, bg="black")
@@ -63,61 +71,56 @@ class AppExecutor:
         clear_button.pack(side=tk.RIGHT, padx=(10, 0))
 
     def write_to_terminal(self, message, color="green"):
-        """Thread-safe function to write to terminal"""
-        if not self.terminal_text:
+        """Thread-safe function to write to terminal: the line is queued and drained in batches by the Tk thread"""
+        if not self.terminal_log:
             return
             
         timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        def write():
-            self.terminal_text.config(state=tk.NORMAL)
-            if color == "red":
-                self.terminal_text.insert(tk.END, f"[{timestamp}] ❌ {message}\n")
-            elif color == "yellow":
-                self.terminal_text.insert(tk.END, f"[{timestamp}] ⚠️  {message}\n")
-            elif color == "blue":
-                self.terminal_text.insert(tk.END, f"[{timestamp}] ℹ️  {message}\n")
-            else:
-                self.terminal_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.terminal_text.config(state=tk.DISABLED)
-            self.terminal_text.see(tk.END)
-        
-        # Schedule the write operation on the main thread
-        self.terminal_window.after(0, write)
+        if color == "red":
+            self.terminal_log.write(f"[{timestamp}] ❌ {message}\n")
+        elif color == "yellow":
+            self.terminal_log.write(f"[{timestamp}] ⚠️  {message}\n")
+        elif color == "blue":
+            self.terminal_log.write(f"[{timestamp}] ℹ️  {message}\n")
+        else:
+            self.terminal_log.write(f"[{timestamp}] {message}\n")
 
     def clear_terminal(self):
         """Clear terminal content"""
-        if self.terminal_text:
-            self.terminal_text.config(state=tk.NORMAL)
-            self.terminal_text.delete(1.0, tk.END)
-            self.terminal_text.config(state=tk.DISABLED)
+        if self.terminal_log:
+            self.terminal_log.clear()
+
+    def on_terminal_destroyed(self, event):
+        """Releases a prompt waiting for input when the terminal window is closed (Tk thread)"""
+        # The binding of the toplevel also fires for each of its children
+        if event.widget is self.terminal_window:
+            self.terminal_closed = True
+            self.user_input_queue.put(TERMINAL_CLOSED)
 
     def get_user_input_from_terminal(self, prompt):
-        """Get user input through terminal interface"""
+        """Get user input through terminal interface, called from the execution thread"""
+        if self.terminal_closed:
+            return ""
         self.write_to_terminal(prompt, "yellow")
         self.waiting_for_input = True
-        
-        if self.terminal_input:
-            self.terminal_input.focus_set()
-        
-        # Wait for user input
-        while self.waiting_for_input:
-            try:
-                result = self.user_input_queue.get_nowait()
-                self.waiting_for_input = False
-                return result
-            except queue.Empty:
-                time.sleep(0.1)
-                if self.terminal_window and self.terminal_window.winfo_exists():
-                    self.terminal_window.update()
-                else:
-                    break
-        
-        return ""
+        entry = self.terminal_input
+        if entry:
+            # Widgets are only touched from the Tk thread, the window may be gone by the time this runs
+            self.terminal_window.after(0, lambda: entry.winfo_exists() and entry.focus_set())
+
+        # Blocks until the user answers or the window is closed, the Tk main loop keeps running meanwhile.
+        # Lines typed ahead of the prompt are already queued and answer it at once
+        while True:
+            result = self.user_input_queue.get()
+            # A close notification left by a previous terminal window is skipped
+            if result is not TERMINAL_CLOSED or self.terminal_closed:
+                break
+        self.waiting_for_input = False
+        return "" if result is TERMINAL_CLOSED else result
 
     def handle_terminal_input(self, event):
-        """Handle terminal input submission"""
-        if self.waiting_for_input and self.terminal_input:
+        """Handle terminal input submission, lines entered before a prompt are kept for it"""
+        if self.terminal_input:
             user_input = self.terminal_input.get()
             self.terminal_input.delete(0, tk.END)
             self.write_to_terminal(f"> {user_input}")
@@ -126,37 +129,15 @@ class AppExecutor:
 
     def parse_api_string(self, api_str, input_names, input_types):
         """Parse API string and extract components"""
-        # Regex to find the main parts
-        match = re.match(r'^(\w+):\[(.*?)\]:\((.*?)\)$', api_str.strip())
-        if not match:
-            raise ValueError("Invalid format")
-
-        endpoint = match.group(1)
-        input_str = match.group(2)
-        output_str = match.group(3)
+        signature = parse_api_string(api_str)
 
         # Clear input lists
         input_names.clear()
         input_types.clear()
+        input_names.extend(signature.input_names())
+        input_types.extend(signature.input_types())
 
-        # Parsing input
-        if input_str.strip():  # Check if input string is not empty
-            for param in input_str.split('|'):
-                parts = param.strip().strip('"').split(',')
-                if len(parts) >= 2:
-                    input_names.append(parts[0].strip().strip('"'))
-                    input_types.append(parts[1].strip())
-
-        # Parsing output
-        output_parts = output_str.strip().strip('"').split(',')
-        if len(output_parts) >= 2:
-            output_name = output_parts[0].strip()
-            output_type = output_parts[1].strip()
-            output = (output_name, output_type)
-        else:
-            output = (None, None)
-
-        return endpoint, output
+        return signature.endpoint, (signature.output_name, signature.output_type)
 
     def build_call(self, thing_id, space_id, service_name, service_inputs):
         """Build the service call string"""
@@ -0,0 +1,179 @@
+import asyncio
+import threading
+
+from service_discover.processor import process_tweet, TWEET_TYPES
+from service_discover.server import (create_multicast_socket, join_multicast_group,
+                                     DEFAULT_RCVBUF_SIZE, publish_tweet)
+from service_discover.tweet_decoder import decode_tweet, TweetDecodeError
+from service_discover.metrics import metrics
+from service_discover.server import context as default_context
+
+
+class DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Receives tweets for one socket and forwards them to the owning DiscoveryService"""
+
+    def __init__(self, service, port):
+        self.service = service
+        self.port = port
+
+    def datagram_received(self, data, addr):
+        self.service.submit(data, addr)
+
+    def error_received(self, exc):
+        print(f"[Discovery] Socket error on port {self.port}: {exc}")
+
+
+class DiscoveryService:
+    """
+    Listens on several multicast groups and ports from a single event loop.
+    Datagrams are parsed in the protocol callbacks and handed to process_tweet
+    through an asyncio.Queue consumed by one task.
+    """
+
+    def __init__(self, endpoints=(('232.1.1.1', 1235),), context=None, queue_size=4096,
+                 rcvbuf_size=DEFAULT_RCVBUF_SIZE, verbose=False):
+        self.endpoints = list(endpoints)
+        self.context = context if context is not None else default_context
+        self.queue_size = queue_size
+        self.rcvbuf_size = rcvbuf_size
+        self.verbose = verbose
+
+        self.stats = {"received": 0, "processed": 0, "dropped": 0, "queue_full": 0, "ignored": 0, "rejected": {}}
+        self._queue = None
+        self._transports = []
+        self._consumer = None
+        self._loop = None
+        self._stopped = None
+        self._thread = None
+
+    def submit(self, data, addr):
+        """Decodes a datagram and enqueues it, dropping it if the queue is full"""
+        self.stats["received"] += 1
+        metrics.inc("tweets_received_total")
+        try:
+            tweet_data = decode_tweet(data, TWEET_TYPES)
+        except TweetDecodeError as e:
+            self.stats["dropped"] += 1
+            self.stats["rejected"][e.reason] = self.stats["rejected"].get(e.reason, 0) + 1
+            metrics.inc("tweets_dropped_total", reason=e.reason)
+            if self.verbose:
+                print(f"[Discovery] Rejected datagram from {addr}: {e}")
+            return
+        if tweet_data is None:
+            self.stats["ignored"] += 1
+            return
+        if self.verbose:
+            print(f"[Discovery] Received {tweet_data['Tweet Type']} tweet from {addr}")
+        try:
+            self._queue.put_nowait((tweet_data, addr))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            self.stats["queue_full"] += 1
+            metrics.inc("tweets_dropped_total", reason="queue_full")
+
+    async def _consume(self):
+        while True:
+            tweet_data, addr = await self._queue.get()
+            try:
+                tweet_obj = process_tweet(tweet_data, addr, context=self.context)
+                self.stats["processed"] += 1
+                metrics.inc("tweets_processed_total")
+                if tweet_obj is not None:
+                    publish_tweet(tweet_obj)
+            except Exception as e:
+                self.stats["dropped"] += 1
+                metrics.inc("tweets_dropped_total", reason="error")
+                print(f"[Discovery] Error while processing tweet: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def start(self):
+        """Opens one socket per port, joins every group configured for it and starts the consumer"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopped = asyncio.Event()
+
+        groups_by_port = {}
+        for group, port in self.endpoints:
+            groups_by_port.setdefault(port, []).append(group)
+
+        for port, groups in groups_by_port.items():
+            sock = create_multicast_socket(groups[0], port, self.rcvbuf_size)
+            for group in groups[1:]:
+                join_multicast_group(sock, group)
+            transport, _ = await self._loop.create_datagram_endpoint(
+                lambda port=port: DiscoveryProtocol(self, port), sock=sock)
+            self._transports.append(transport)
+            print(f"[Discovery] Listening on port {port} for groups {', '.join(groups)}")
+
+        self._consumer = self._loop.create_task(self._consume())
+
+    async def stop(self, drain_timeout=2.0):
+        """Closes the sockets, processes the tweets already queued and stops the consumer"""
+        for transport in self._transports:
+            transport.close()
+        self._transports = []
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"[Discovery] {self._queue.qsize()} tweets discarded at shutdown")
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.stop()
+
+    def start_in_background(self):
+        """Runs the service on a dedicated event loop thread, returns once the sockets are open"""
+        started = threading.Event()
+        errors = []
+
+        async def main():
+            try:
+                await self.start()
+            except Exception as e:
+                errors.append(e)
+                raise
+            finally:
+                started.set()
+            try:
+                await self._stopped.wait()
+            finally:
+                await self.stop()
+
+        def run():
+            try:
+                asyncio.run(main())
+            except Exception as e:
+                if not errors:
+                    print(f"[Discovery] Event loop terminated: {e}")
+
+        self._thread = threading.Thread(target=run, name="DiscoveryService", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self._thread
+
+    def shutdown(self, timeout=5.0):
+        """Thread-safe stop for a service started with start_in_background"""
+        if self._loop is not None and self._stopped is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_stats(self):
+        """Returns a copy of the ingest counters"""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return dict(self.stats, rejected=dict(self.stats["rejected"]), queued=queued)
@@ -0,0 +1,67 @@
+from typing import Dict, List, Tuple
+
+
+class ExecutionGraph:
+    """
+    Dependency graph of an IoTApp: one node per ServiceInstance,
+    one edge per RelationshipInstance (src -> dst).
+    """
+
+    def __init__(self, app):
+        self.nodes = {si.id: si for si in app.service_instances}
+        self.incoming: Dict[str, List] = {node_id: [] for node_id in self.nodes}
+        self.outgoing: Dict[str, List] = {node_id: [] for node_id in self.nodes}
+        self.invalid = []  # relationships pointing to instances that are not in the app
+
+        for rel in app.relationship_instances:
+            if rel.src.id not in self.nodes or rel.dst.id not in self.nodes:
+                self.invalid.append(rel)
+                continue
+            self.outgoing[rel.src.id].append(rel)
+            self.incoming[rel.dst.id].append(rel)
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm, raises ValueError if the relationships form a cycle"""
+        remaining = {node_id: len(rels) for node_id, rels in self.incoming.items()}
+        ready = [node_id for node_id, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            node_id = ready.pop()
+            order.append(node_id)
+            for rel in self.outgoing[node_id]:
+                remaining[rel.dst.id] -= 1
+                if remaining[rel.dst.id] == 0:
+                    ready.append(rel.dst.id)
+        if len(order) != len(self.nodes):
+            cyclic = [self.nodes[n].get_display_name() for n, count in remaining.items() if count > 0]
+            raise ValueError(f"Relationships form a cycle between: {', '.join(cyclic)}")
+        return order
+
+    def roots(self) -> List[str]:
+        """Nodes without incoming relationships, they can start immediately"""
+        return [node_id for node_id in self.order if not self.incoming[node_id]]
+
+    def predecessors(self, node_id) -> List[str]:
+        return [rel.src.id for rel in self.incoming[node_id]]
+
+
+def critical_path(graph: ExecutionGraph, timings: Dict[str, Tuple[float, float]]) -> Tuple[List[str], float]:
+    """
+    Returns the chain of executed nodes that determined the end of the run and its length in seconds.
+    timings maps node id -> (start, end); walking back from the node that finished last,
+    each step follows the executed predecessor that finished last, i.e. the one the node waited for.
+    """
+    if not timings:
+        return [], 0.0
+    node_id = max(timings, key=lambda n: timings[n][1])
+    path = [node_id]
+    while True:
+        preds = [p for p in graph.predecessors(node_id) if p in timings]
+        if not preds:
+            break
+        node_id = max(preds, key=lambda n: timings[n][1])
+        path.append(node_id)
+    path.reverse()
+    return path, timings[path[-1]][1] - timings[path[0]][0]
@@ -0,0 +1,152 @@
+import gzip
+import json
+import os
+import threading
+import time
+
+from models.base_classes import Thing, Entity, Service, Relationship
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".serviceIDE", "discovery_cache.json.gz")
+DEFAULT_SAVE_INTERVAL = 300.0
+
+# Fields stored for each object, nested lists and runtime state (last_seen, stale) are left out
+THING_FIELDS = ("id", "name", "space_id", "model", "owner", "vendor", "description", "port", "language", "network_name")
+ENTITY_FIELDS = ("thing_name", "space_id", "name", "entity_id", "type", "owner", "vendor", "description")
+SERVICE_FIELDS = ("name", "thing_name", "entity_id", "space_id", "ip", "type", "app_category", "description",
+                  "keywords", "port")
+RELATIONSHIP_FIELDS = ("name", "category", "type", "description", "src", "dst", "thing_id", "space_id", "owner",
+                       "condition")
+
+
+def _pick(obj, fields):
+    return [getattr(obj, name) for name in fields]
+
+
+def _encode_address(address):
+    # Announced things have an (ip, port) tuple, things added by hand may have a plain IP string
+    if isinstance(address, str):
+        return address
+    return list(address or ())
+
+
+def _decode_address(address):
+    return address if isinstance(address, str) else tuple(address)
+
+
+def encode_snapshot(snapshot):
+    """Converts a ContextSnapshot into a JSON-serializable dict, services are stored as their API string"""
+    things = []
+    for thing in snapshot.things:
+        entities = []
+        for entity in thing.entities:
+            services = [_pick(s, SERVICE_FIELDS) + [s.to_api_string()] for s in entity.services]
+            entities.append(_pick(entity, ENTITY_FIELDS) + [services])
+        things.append(_pick(thing, THING_FIELDS) + [_encode_address(thing.address), entities])
+    return {
+        "format": CACHE_FORMAT,
+        "saved_at": time.time(),
+        "things": things,
+        "relationships": [_pick(rel, RELATIONSHIP_FIELDS) for rel in snapshot.relationships],
+    }
+
+
+def decode_state(state):
+    """Rebuilds the Thing (with entities and services) and Relationship objects of an encoded snapshot"""
+    if state.get("format") != CACHE_FORMAT:
+        raise ValueError(f"unsupported cache format {state.get('format')}")
+    things = []
+    for record in state["things"]:
+        *thing_values, address, entity_records = record
+        thing = Thing(address=_decode_address(address), **dict(zip(THING_FIELDS, thing_values)))
+        entities = []
+        for entity_record in entity_records:
+            *entity_values, service_records = entity_record
+            entity = Entity(**dict(zip(ENTITY_FIELDS, entity_values)))
+            services = []
+            for service_record in service_records:
+                *service_values, api = service_record
+                values = dict(zip(SERVICE_FIELDS, service_values))
+                port = values.pop("port")
+                service = Service.from_api_string(api_string=api, type_=values.pop("type"), **values)
+                service.port = port
+                services.append(service)
+            entity.services = services
+            entities.append(entity)
+        thing.entities = entities
+        things.append(thing)
+    relationships = [Relationship(**dict(zip(RELATIONSHIP_FIELDS, r))) for r in state["relationships"]]
+    return things, relationships
+
+
+class DiscoveryCache:
+    """
+    Saves the discovered registry to a gzipped JSON file on shutdown and every `interval` seconds,
+    and restores it at startup so the IDE shows the known things before they announce themselves again.
+    Restored objects are marked stale until they are re-announced, and are evicted by the TTL sweeper otherwise.
+    """
+
+    def __init__(self, context, path=DEFAULT_CACHE_PATH, interval=DEFAULT_SAVE_INTERVAL):
+        self.context = context
+        self.path = path
+        self.interval = interval
+        self._saved_version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def save(self):
+        """Writes the current snapshot, skipped when nothing changed since the last save"""
+        snapshot = self.context.snapshot()
+        if snapshot.version == self._saved_version:
+            return False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(encode_snapshot(snapshot), f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._saved_version = snapshot.version
+        return True
+
+    def load(self):
+        """Restores the cached things into the context as stale entries, returns how many were restored"""
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                things, relationships = decode_state(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[Cache] Ignoring unreadable discovery cache {self.path}: {e}")
+            return 0
+        restored = self.context.add_cached(things, relationships)
+        print(f"[Cache] Restored {restored} things from {self.path}")
+        return restored
+
+    def _run(self):
+        self.load()
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except OSError as e:
+                print(f"[Cache] Error while saving the discovery cache: {e}")
+
+    def start(self):
+        """Loads the cache in background, then saves it periodically"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="DiscoveryCache", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5.0):
+        """Stops the periodic saves and writes a last snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.save()
+        except OSError as e:
+            print(f"[Cache] Error while saving the discovery cache: {e}")
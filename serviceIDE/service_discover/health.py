@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from collections import deque
+
+from service_discover.transport import DEFAULT_TIMEOUT
+
+# Circuit breaker states of a thing
+CLOSED = "closed"        # calls go through
+OPEN = "open"            # the thing is considered down, calls fail fast
+HALF_OPEN = "half-open"  # one probe call is let through to check whether the thing is back
+
+DEFAULT_FAILURE_THRESHOLD = 3  # consecutive failed calls that open the breaker
+DEFAULT_RESET_TIMEOUT = 15.0   # seconds the breaker stays open before a probe
+LATENCY_WINDOW = 64            # latest successful calls used for the percentiles
+MIN_SAMPLES = 8                # below this the default timeout is used
+MIN_TIMEOUT = 1.0
+TIMEOUT_FACTOR = 3.0           # timeout = p99 latency * factor, within [MIN_TIMEOUT, DEFAULT_TIMEOUT]
+
+
+class CircuitOpenError(Exception):
+    """The breaker of the thing is open: the call is not sent"""
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    # Rank ceil(fraction * n), rounded first so that float noise (0.07 * 100 = 7.000000000000001) cannot add one
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    index = min(len(sorted_values) - 1, max(0, rank - 1))
+    return sorted_values[index]
+
+
+class ThingHealth:
+    """Rolling latency and circuit breaker of one thing"""
+
+    def __init__(self, thing, monitor, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT, clock=time.monotonic):
+        self.thing = thing
+        self.monitor = monitor
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.opened_at = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.monitor._state_changed()
+
+    def before_call(self):
+        """Raises CircuitOpenError if the call must not be sent"""
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError(f"{self.thing} is down, retry in "
+                                           f"{self.reset_timeout - (self.clock() - self.opened_at):.0f}s")
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError(f"{self.thing} is being probed")
+                self._probe_in_flight = True
+            self.stats["calls"] += 1
+
+    def cancel(self):
+        """The call admitted by before_call was not sent after all"""
+        with self._lock:
+            self._probe_in_flight = False
+            self.stats["calls"] -= 1
+
+    def record_success(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+            self.stats["successes"] += 1
+            self.failures = 0
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats["opened"] += 1
+                self.opened_at = self.clock()
+                self._set_state(OPEN)
+
+    def percentiles(self):
+        with self._lock:
+            values = sorted(self.latencies)
+        return {"p50": percentile(values, 0.5), "p90": percentile(values, 0.9), "p99": percentile(values, 0.99)}
+
+    def timeout(self):
+        """Call timeout derived from the p99 latency, the default one until enough calls were observed"""
+        with self._lock:
+            if len(self.latencies) < MIN_SAMPLES:
+                return DEFAULT_TIMEOUT
+            values = sorted(self.latencies)
+        return min(DEFAULT_TIMEOUT, max(MIN_TIMEOUT, percentile(values, 0.99) * TIMEOUT_FACTOR))
+
+    def get_stats(self):
+        stats = dict(self.stats, state=self.state, consecutive_failures=self.failures, timeout=self.timeout())
+        stats.update(self.percentiles())
+        return stats
+
+
+class HealthMonitor:
+    """Health of every thing called by the IDE, shared by all app runs"""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.version = 0  # grows at every breaker state change, polled by the GUI
+        self._things = {}
+        self._lock = threading.Lock()
+
+    def _state_changed(self):
+        self.version += 1
+
+    def thing(self, thing_id):
+        with self._lock:
+            health = self._things.get(thing_id)
+            if health is None:
+                health = self._things[thing_id] = ThingHealth(thing_id, self, self.failure_threshold,
+                                                              self.reset_timeout)
+            return health
+
+    def state(self, thing_id):
+        """Breaker state of a thing, CLOSED for things never called"""
+        health = self._things.get(thing_id)
+        return health.state if health is not None else CLOSED
+
+    def states(self):
+        with self._lock:
+            return {thing_id: health.state for thing_id, health in self._things.items()}
+
+    def get_stats(self):
+        with self._lock:
+            things = list(self._things.values())
+        return {health.thing: health.get_stats() for health in things}
+
+
+health = HealthMonitor()
@@ -0,0 +1,234 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_METRICS_PORT = 9464
+PREFIX = "serviceide_"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], the last bound is +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile, None without observations"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and latency histograms labelled by service, app, reason...
+    Disabled by default: every recording method returns at once, and the callers skip
+    the timing work itself by checking `metrics.enabled` first.
+    """
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.started = time.time()
+        self._counters = {}  # (name, labels) -> value
+        self._gauges = {}  # (name, labels) -> last value set
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Sets a gauge, a value that goes up and down (queue depths...)"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observes the duration of the block in the histogram `name`"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+        self.started = time.time()
+
+    def render_prometheus(self):
+        """Text exposition format, served at /metrics"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            lines = []
+            described = set()
+
+            def header(name, kind):
+                if name not in described:
+                    described.add(name)
+                    if name in self._help:
+                        lines.append(f"# HELP {PREFIX}{name} {self._help[name]}")
+                    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+            for (name, labels), value in counters:
+                header(name, "counter")
+                lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+            for (name, labels), value in gauges:
+                header(name, "gauge")
+                lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+            for (name, labels), histogram in histograms:
+                header(name, "histogram")
+                for bound, total in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{PREFIX}{name}_bucket{_label_text(labels + (('le', le),))} {total}")
+                lines.append(f"{PREFIX}{name}_sum{_label_text(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_count{_label_text(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        """JSON friendly dump: counters with their average rate, histograms with count, mean and quantiles"""
+        uptime = max(time.time() - self.started, 1e-9)
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value, "per_second": value / uptime}
+                        for (name, labels), value in sorted(self._counters.items())]
+            gauges = [{"name": name, "labels": dict(labels), "value": value}
+                      for (name, labels), value in sorted(self._gauges.items())]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                           "mean": h.sum / h.count if h.count else None,
+                           "p50": h.quantile(0.5), "p90": h.quantile(0.9), "p99": h.quantile(0.99)}
+                          for (name, labels), h in sorted(self._histograms.items(), key=lambda item: item[0])]
+        return {"uptime": uptime, "counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+
+class MetricsServer:
+    """Serves the registry on localhost: /metrics (Prometheus) and /metrics.json"""
+
+    def __init__(self, registry, host="127.0.0.1", port=DEFAULT_METRICS_PORT):
+        self.registry = registry
+        self.address = (host, port)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry.render_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.to_dict(), default=str).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes are not worth a line each
+
+        registry.enabled = True
+        self._server = ThreadingHTTPServer(self.address, Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        print(f"[Metrics] Serving http://{self.address[0]}:{self._server.server_port}/metrics")
+        return self._thread
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+metrics = MetricsRegistry()
+metrics.describe("call_connect_seconds", "Time to get a connection to the thing, per service")
+metrics.describe("call_send_seconds", "Time to send the request, per service")
+metrics.describe("call_receive_seconds", "Time waiting for and reading the response, per service")
+metrics.describe("call_seconds", "Duration of a service call, per service")
+metrics.describe("calls_total", "Service calls by outcome")
+metrics.describe("calls_coalesced_total", "Calls that shared the response of an identical call in flight")
+metrics.describe("build_request_seconds", "Time to build the request of a service, inputs included")
+metrics.describe("app_run_seconds", "Duration of an app run, per app")
+metrics.describe("app_runs_total", "App runs by outcome")
+metrics.describe("tweets_received_total", "Discovery datagrams received")
+metrics.describe("tweets_processed_total", "Tweets applied to the context")
+metrics.describe("tweets_dropped_total", "Tweets dropped, by reason")
+metrics.describe("admission_admitted_total", "Calls let through by the admission controller, per thing")
+metrics.describe("admission_rejected_total", "Calls refused by the admission controller, per thing and reason")
+metrics.describe("admission_wait_seconds", "Time a call waited for admission, per thing")
+metrics.describe("admission_queue_depth", "Calls waiting for admission, per thing")
+metrics.describe("admission_active", "Calls in progress, per thing")
+metrics.describe("admission_limit", "Concurrency limit, per thing")
@@ -0,0 +1,152 @@
+import json
+import random
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from service_discover.retry import backoff_delays
+from service_discover.server import create_multicast_socket
+
+# Tweet sent by the IDE to ask the things of the smart space to announce themselves right away
+PROBE_TWEET_TYPE = "Discovery_Probe"
+ANY_SPACE = "*"
+
+
+def make_probe(probe_id, space_id=ANY_SPACE):
+    return {"Tweet Type": PROBE_TWEET_TYPE, "Probe ID": probe_id, "Space ID": space_id}
+
+
+class DiscoveryProbe:
+    """
+    Multicasts a "who is there" probe a few times with jittered exponential backoff.
+    Every retransmission carries the same probe id, so a thing that already answered stays quiet
+    and the retransmissions only reach the things that lost the previous probes.
+    Answers are ordinary announcements, received by the discovery listener.
+    """
+
+    def __init__(self, multicast_group='232.1.1.1', port=1235, attempts=3, base_interval=0.25,
+                 max_interval=2.0, jitter=0.5, space_id=ANY_SPACE):
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        self.target = (multicast_group, port)
+        self.attempts = attempts
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.space_id = space_id
+        self.stats = {"rounds": 0, "sent": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        """Sends one probe round, returns its probe id"""
+        probe_id = uuid.uuid4().hex[:12]
+        message = json.dumps(make_probe(probe_id, self.space_id)).encode('utf-8')
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        try:
+            self.stats["rounds"] += 1
+            sock.sendto(message, self.target)
+            self.stats["sent"] += 1
+            for delay in backoff_delays(self.attempts, self.base_interval, self.max_interval, self.jitter):
+                if self._stop.wait(delay):
+                    break
+                sock.sendto(message, self.target)
+                self.stats["sent"] += 1
+        except OSError as e:
+            print(f"[Probe] Error while sending probe {probe_id}: {e}")
+        finally:
+            sock.close()
+        return probe_id
+
+    def start(self):
+        """Sends a probe round in background"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="DiscoveryProbe", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class ProbeResponder(threading.Thread):
+    """
+    Answers discovery probes on behalf of a thing by calling `announce`.
+    A probe id is answered once, and answers closer than min_interval are suppressed:
+    the announcement is multicast, so a recent one already reached every IDE.
+    Each answer waits a random delay up to max_delay, so many things do not answer at the same instant.
+    """
+
+    def __init__(self, announce, multicast_group='232.1.1.1', port=1235, space_id=None,
+                 max_delay=0.05, min_interval=0.5, remembered=256, poll_timeout=0.5):
+        super().__init__(daemon=True, name="ProbeResponder")
+        self.announce = announce
+        self.multicast_group = multicast_group
+        self.port = port
+        self.space_id = space_id
+        self.max_delay = max_delay
+        self.min_interval = min_interval
+        self.remembered = remembered
+        self.poll_timeout = poll_timeout
+        self.stats = {"probes": 0, "answered": 0, "duplicates": 0, "suppressed": 0}
+        self._seen = OrderedDict()  # probe ids already answered, oldest first
+        self._last_answer = None
+        self._stop = threading.Event()
+
+    def handle(self, data):
+        """Answers a datagram if it is a new probe for this space, returns True when it did"""
+        try:
+            tweet = json.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            return False
+        if not isinstance(tweet, dict) or tweet.get("Tweet Type") != PROBE_TWEET_TYPE:
+            return False
+        space_id = tweet.get("Space ID", ANY_SPACE)
+        if self.space_id is not None and space_id not in (ANY_SPACE, self.space_id):
+            return False
+
+        self.stats["probes"] += 1
+        probe_id = tweet.get("Probe ID")
+        if probe_id in self._seen:
+            self.stats["duplicates"] += 1
+            return False
+        self._seen[probe_id] = None
+        if len(self._seen) > self.remembered:
+            self._seen.popitem(last=False)
+
+        now = time.monotonic()
+        if self._last_answer is not None and now - self._last_answer < self.min_interval:
+            self.stats["suppressed"] += 1
+            return False
+        if self.max_delay:
+            time.sleep(random.uniform(0, self.max_delay))
+        self.announce()
+        self._last_answer = time.monotonic()
+        self.stats["answered"] += 1
+        return True
+
+    def run(self):
+        sock = create_multicast_socket(self.multicast_group, self.port, rcvbuf_size=0)
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([sock], [], [], self.poll_timeout)
+                if not readable:
+                    continue
+                try:
+                    data, _ = sock.recvfrom(8192)
+                except BlockingIOError:
+                    continue
+                self.handle(data)
+        finally:
+            sock.close()
+
+    def stop(self):
+        self._stop.set()
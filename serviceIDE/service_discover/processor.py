@@ -1,62 +1,129 @@
-import json
+from typing import Callable, Dict, List, Optional, Tuple
+
 from models.base_classes import IoTContext
+from models.tweet import Tweet, IdentityTweet, LanguageTweet, EntityTweet, ServiceTweet, RelationshipTweet
 
-def process_tweet(tweet_data: dict, addr, context: IoTContext):
-    try:
-        tweet_type = tweet_data.get("Tweet Type")
-
-        if tweet_type == "Identity_Thing":
-            context.add_thing(
-                thing_id=tweet_data["Thing ID"],
-                address=addr,
-                name=tweet_data["Name"],
-                space_id=tweet_data["Space ID"],
-                model=tweet_data.get("Model", ""),
-                owner=tweet_data.get("Owner", ""),
-                vendor=tweet_data.get("Vendor", ""),
-                description=tweet_data.get("Description", "")
-            )
-            
-        elif tweet_type == "Identity_Entity":
-            context.add_entity_to_thing(
-                thing_id=tweet_data["Thing ID"],
-                entity_name=tweet_data["Name"],
-                entity_id=tweet_data["ID"],
-                space_id=tweet_data["Space ID"],
-                type_=tweet_data.get("Type", ""),
-                vendor=tweet_data.get("Vendor", ""),
-                description=tweet_data.get("Description", ""),
-                owner=tweet_data.get("Owner", "")
-            )
-
-        elif tweet_type == "Service":
-            context.add_service_to_entity(
-                thing_id=tweet_data["Thing ID"],
-                service_name=tweet_data["Name"],
-                entity_id=tweet_data["Entity ID"],
-                space_id=tweet_data["Space ID"],
-                api=tweet_data["API"],
-                ip=addr[0],
-                type_=tweet_data.get("Type", ""),
-                app_category=tweet_data.get("AppCategory", ""),
-                description=tweet_data.get("Description", ""),
-                keywords=tweet_data.get("Keywords", "")
-            )
-
-        elif tweet_type == "Relationship":
-            context.add_relationship(
-                thing_id=tweet_data["Thing ID"],
-                space_id=tweet_data["Space ID"],
-                name=tweet_data["Name"],
-                owner=tweet_data.get("Owner", ""),
-                category=tweet_data.get("Category", ""),
-                type_=tweet_data.get("Type", ""),
-                description=tweet_data.get("Description", ""),
-                fs_name=tweet_data.get("FS name", ""),
-                ss_name=tweet_data.get("SS name", "")
-            )
-
-    except Exception as e:
-        print(f"[Processor] Error processing tweet: {e}")
+TweetHandler = Callable[[Tweet, IoTContext], None]
+
+# "Tweet Type" -> (tweet class, handlers called in registration order)
+_registry: Dict[str, Tuple[type, List[TweetHandler]]] = {}
+# Types with a registered class, shared with the decoders so that other types are dropped before parsing
+TWEET_TYPES = set()
+
+
+def register_tweet_type(tweet_class):
+    """Maps tweet_class.TWEET_TYPE to tweet_class, usable as a class decorator"""
+    handlers = _registry[tweet_class.TWEET_TYPE][1] if tweet_class.TWEET_TYPE in _registry else []
+    _registry[tweet_class.TWEET_TYPE] = (tweet_class, handlers)
+    TWEET_TYPES.add(tweet_class.TWEET_TYPE)
+    return tweet_class
+
+
+def register_handler(tweet_type: str, handler: Optional[TweetHandler] = None):
+    """
+    Adds handler(tweet, context) for a registered tweet type, usable as a decorator:
+        @register_handler("Service")
+        def log_service(tweet, context): ...
+    """
+    def add(func):
+        if tweet_type not in _registry:
+            raise KeyError(f"Unknown tweet type '{tweet_type}'")
+        _registry[tweet_type][1].append(func)
+        return func
+    return add(handler) if handler is not None else add
+
+
+def unregister_handler(tweet_type: str, handler: TweetHandler):
+    _registry[tweet_type][1].remove(handler)
+
+
+for _tweet_class in (IdentityTweet, LanguageTweet, EntityTweet, ServiceTweet, RelationshipTweet):
+    register_tweet_type(_tweet_class)
 
 
+@register_handler(IdentityTweet.TWEET_TYPE)
+def handle_identity_thing(tweet: IdentityTweet, context: IoTContext):
+    context.add_thing(
+        thing_id=tweet.thing_id,
+        address=tweet.address,
+        name=tweet.name,
+        space_id=tweet.space_id,
+        model=tweet.model,
+        owner=tweet.owner,
+        vendor=tweet.vendor,
+        description=tweet.description
+    )
+
+
+@register_handler(LanguageTweet.TWEET_TYPE)
+def handle_identity_language(tweet: LanguageTweet, context: IoTContext):
+    context.set_thing_language(
+        thing_id=tweet.thing_id,
+        language=tweet.language,
+        network_name=tweet.network_name,
+        port=tweet.port
+    )
+
+
+@register_handler(EntityTweet.TWEET_TYPE)
+def handle_identity_entity(tweet: EntityTweet, context: IoTContext):
+    context.add_entity_to_thing(
+        thing_id=tweet.thing_id,
+        entity_name=tweet.name,
+        entity_id=tweet.entity_id,
+        space_id=tweet.space_id,
+        type_=tweet.type,
+        vendor=tweet.vendor,
+        description=tweet.description,
+        owner=tweet.owner
+    )
+
+
+@register_handler(ServiceTweet.TWEET_TYPE)
+def handle_service(tweet: ServiceTweet, context: IoTContext):
+    context.add_service_to_entity(
+        thing_id=tweet.thing_id,
+        service_name=tweet.name,
+        entity_id=tweet.entity_id,
+        space_id=tweet.space_id,
+        api=tweet.api,
+        ip=tweet.address[0],
+        type_=tweet.type,
+        app_category=tweet.app_category,
+        description=tweet.description,
+        keywords=tweet.keywords
+    )
+
+
+@register_handler(RelationshipTweet.TWEET_TYPE)
+def handle_relationship(tweet: RelationshipTweet, context: IoTContext):
+    context.add_relationship(
+        thing_id=tweet.thing_id,
+        space_id=tweet.space_id,
+        name=tweet.name,
+        owner=tweet.owner,
+        category=tweet.category,
+        type_=tweet.type,
+        description=tweet.description,
+        fs_name=tweet.source_service,
+        ss_name=tweet.target_service
+    )
+
+
+def process_tweet(tweet_data: dict, addr, context: IoTContext) -> Optional[Tweet]:
+    """Builds the typed tweet for tweet_data, runs the handlers of its type and returns it (None if not handled)"""
+    entry = _registry.get(tweet_data.get("Tweet Type"))
+    if entry is None:
+        return None
+    tweet_class, handlers = entry
+    try:
+        tweet = tweet_class.from_dict(tweet_data, addr)
+    except KeyError as e:
+        print(f"[Processor] {tweet_class.TWEET_TYPE} tweet without field {e}")
+        return None
+    for handler in handlers:
+        try:
+            handler(tweet, context)
+        except Exception as e:
+            print(f"[Processor] Error processing tweet: {e}")
+    return tweet
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Only services of these types may be cached: a Report reads a value, an Action changes the world
+CACHEABLE_TYPES = frozenset({"report"})
+DEFAULT_TTLS = {"report": 5.0}  # seconds, by Service.type
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ResponseCache:
+    """
+    Opt-in cache of successful service responses, keyed by (thing, entity, service, inputs).
+    The TTL comes from the service type (DEFAULT_TTLS) unless set for a single service with set_ttl.
+    Services that are not of a cacheable type are never stored, whatever the TTL.
+    The least recently used entry is evicted beyond max_entries. Safe to share between app runs.
+    """
+
+    def __init__(self, ttls=None, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttls = {k.lower(): v for k, v in (DEFAULT_TTLS if ttls is None else ttls).items()}
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stores": 0}
+        self._service_ttls = {}  # (thing, service name) -> ttl
+        self._entries = OrderedDict()  # key -> (expires_at, response), least recently used first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(service, request):
+        return service.thing_name, service.entity_id, service.name, request.get("Service Inputs", "()")
+
+    def set_ttl(self, thing_name, service_name, ttl):
+        """Overrides the TTL of one service, 0 disables caching for it"""
+        self._service_ttls[(thing_name, service_name)] = ttl
+
+    def ttl_for(self, service):
+        service_type = (service.type or "").lower()
+        if service_type not in CACHEABLE_TYPES:
+            return 0
+        ttl = self._service_ttls.get((service.thing_name, service.name))
+        return ttl if ttl is not None else self.ttls.get(service_type, 0)
+
+    def get(self, service, request):
+        """Returns the cached response of the call, None on a miss"""
+        if self.ttl_for(service) <= 0:
+            return None
+        key = self.key(service, request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, response = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return response
+
+    def put(self, service, request, response):
+        """Stores a successful response, ignored for services that are not cacheable"""
+        ttl = self.ttl_for(service)
+        if ttl <= 0 or response is None:
+            return
+        key = self.key(service, request)
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, response)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, thing_name=None, service_name=None):
+        """Drops the entries of a service, of a thing, or all of them"""
+        with self._lock:
+            if thing_name is None and service_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries
+                        if (thing_name is None or k[0] == thing_name) and (service_name is None or k[2] == service_name)]:
+                del self._entries[key]
+
+    def get_stats(self):
+        """Returns a copy of the counters with the hit ratio and the current size"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats, size=len(self._entries),
+                        hit_ratio=self.stats["hits"] / lookups if lookups else 0.0)
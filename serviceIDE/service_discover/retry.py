@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+
+from service_discover.health import health, OPEN
+
+# Repeating a Report reads the value again, repeating an Action (ActivateBuzzer, ...) repeats its effect
+RETRYABLE_TYPES = frozenset({"report"})
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.2
+DEFAULT_MAX_DELAY = 2.0
+DEFAULT_JITTER = 0.5
+DEFAULT_BUDGET = 20.0  # seconds from the start of a run after which no retry is started
+
+
+def backoff_delays(attempts, base_interval, max_interval, jitter, rng=random):
+    """
+    Waits between `attempts` tries: the interval doubles up to max_interval and each wait is
+    spread by +-jitter (a fraction), so several senders that failed together do not retry in step.
+    """
+    interval = base_interval
+    for _ in range(attempts - 1):
+        yield interval * rng.uniform(1.0 - jitter, 1.0 + jitter)
+        interval = min(interval * 2, max_interval)
+
+
+class RetryPolicy:
+    """
+    Retries service calls that got no response (timeout, connection error), never the ones the thing
+    answered with a failure. Only services of a retryable type are retried, unless marked safe
+    with mark_safe. Retries of an app run stop once its deadline, budget seconds after its start, is past.
+    """
+
+    def __init__(self, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 jitter=DEFAULT_JITTER, budget=DEFAULT_BUDGET, retryable_types=RETRYABLE_TYPES):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.budget = budget
+        self.retryable_types = frozenset(t.lower() for t in retryable_types)
+        self.stats = {"retries": 0, "recovered": 0, "gave_up": 0, "out_of_budget": 0}
+        self._safe = set()  # (thing name or None, service name)
+        self._lock = threading.Lock()
+
+    def mark_safe(self, service_name, thing_name=None):
+        """Allows retrying a service that is not of a retryable type, on one thing or on all of them"""
+        self._safe.add((thing_name, service_name))
+
+    def is_retryable(self, service):
+        if (service.type or "").lower() in self.retryable_types:
+            return True
+        return (service.thing_name, service.name) in self._safe or (None, service.name) in self._safe
+
+    def deadline(self, start=None):
+        """Deadline of the retries of a run started at `start` (now by default)"""
+        return (time.monotonic() if start is None else start) + self.budget
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def call(self, service, fn, write_fn, deadline=None, should_stop=None):
+        """Runs fn() and retries it while it returns None, returns its last result"""
+        res = fn()
+        if res is not None or self.attempts <= 1 or not self.is_retryable(service):
+            return res
+        for attempt, delay in enumerate(backoff_delays(self.attempts, self.base_delay, self.max_delay, self.jitter), 2):
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                self._count("out_of_budget")
+                write_fn(f"[RETRY] {service.name}: run deadline reached, not retried\n")
+                return None
+            if health.state(service.thing_name) == OPEN:
+                break  # the breaker would reject the call anyway
+            if should_stop is not None and should_stop():
+                return None
+            write_fn(f"[RETRY] {service.name}: no response, attempt {attempt}/{self.attempts} in {delay:.2f}s\n")
+            time.sleep(delay)
+            self._count("retries")
+            res = fn()
+            if res is not None:
+                self._count("recovered")
+                return res
+        self._count("gave_up")
+        return None
+
+    def get_stats(self):
+        """Returns a copy of the counters"""
+        with self._lock:
+            return dict(self.stats)
+
+
+retry_policy = RetryPolicy()
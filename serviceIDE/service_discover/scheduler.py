@@ -0,0 +1,256 @@
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from service_discover.api_caller import invoke_iot_app
+
+OVERRUN_SKIP = "skip"  # drop the ticks that were missed while the app was still running
+OVERRUN_COALESCE = "coalesce"  # run once as soon as the previous run ends, then realign
+
+
+class FixedRate:
+    """Fires every `interval` seconds, aligned on the first deadline (no drift)"""
+
+    def __init__(self, interval: float):
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = interval
+
+    def first(self, now: float) -> float:
+        return now
+
+    def next_after(self, deadline: float, now: float) -> float:
+        """First deadline of the series strictly after `now`"""
+        missed = int((now - deadline) // self.interval) + 1
+        return deadline + max(missed, 1) * self.interval
+
+    def __repr__(self):
+        return f"every {self.interval}s"
+
+
+class CronSchedule:
+    """
+    Minimal cron expression: "minute hour day-of-month month day-of-week".
+    Fields accept *, numbers, ranges (a-b), lists (a,b) and steps (*/n, a-b/n, a/n).
+    Day of week is 0-6 with 0 = Sunday.
+    """
+
+    FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression '{expression}': expected 5 fields")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(part, low, high) for part, (low, high) in zip(parts, self.FIELDS))
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for field_item in field.split(","):
+            item, step = field_item, 1
+            if "/" in item:
+                item, step_str = item.split("/", 1)
+                step = int(step_str)
+                if step <= 0:
+                    raise ValueError(f"Invalid step in cron field '{field}'")
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(v) for v in item.split("-", 1))
+            elif "/" in field_item:
+                start, end = int(item), high  # "5/15" means 5-high/15
+            else:
+                start = end = int(item)
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        # Standard cron: when both day fields are restricted, either one may match
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def _next_wall_time(self, after: datetime) -> datetime:
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skips whole months, days and hours that cannot match, so rare expressions are found quickly.
+        # Nine years bound the search: Feb 29 can be 8 years away around a century
+        limit = moment.year + 9
+        while moment.year < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression '{self.expression}' never fires")
+
+    def first(self, now: float) -> float:
+        wall_now = datetime.now()
+        return now + (self._next_wall_time(wall_now) - wall_now).total_seconds()
+
+    def next_after(self, deadline: float, now: float) -> float:
+        """First matching minute strictly after the one `deadline` fired for, and after `now`"""
+        # Deadlines are kept on the monotonic clock, cron matching uses wall time.
+        # The deadline is mapped back to the minute it was computed for (rounded, the two clocks
+        # drift apart slightly), so a tick that fires a little early cannot select the same minute again.
+        wall_now = datetime.now()
+        fired = wall_now + timedelta(seconds=deadline - now + 30)
+        fired = fired.replace(second=0, microsecond=0)
+        return now + (self._next_wall_time(max(fired, wall_now)) - wall_now).total_seconds()
+
+    def __repr__(self):
+        return f"cron '{self.expression}'"
+
+
+class ScheduledJob:
+    def __init__(self, app, schedule, overrun=OVERRUN_SKIP, name=None, bindings=None):
+        if overrun not in (OVERRUN_SKIP, OVERRUN_COALESCE):
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+        self.app = app
+        self.schedule = schedule
+        self.overrun = overrun
+        self.name = name or app.name
+        self.bindings = bindings
+        self.running = False
+        self.pending = False  # a coalesced tick waiting for the current run to end
+        self.cancelled = False
+        self.stats = {"runs": 0, "skipped": 0, "coalesced": 0, "rejected": 0, "failures": 0,
+                      "last_duration": None, "max_lateness": 0.0}
+
+
+class AppScheduler:
+    """
+    Runs many IoTApps at fixed rates or on cron schedules.
+    Deadlines are computed from the schedule, not from the end of the previous run,
+    so periodic apps do not drift. At most `max_concurrent` runs are in progress:
+    ticks that find every slot busy are rejected and counted.
+    """
+
+    def __init__(self, write_fn=print, input_fn=None, max_concurrent=4, cache=None):
+        self.write_fn = write_fn
+        self.cache = cache  # Optional ResponseCache shared by every run
+        self.input_fn = input_fn  # None: non-interactive runs, inputs come from the app and its bindings
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="AppScheduler")
+        self._heap = []  # (deadline, sequence, job)
+        self._sequence = 0
+        self._jobs = []
+        self._lock = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def add_app(self, app, interval=None, cron=None, overrun=OVERRUN_SKIP, bindings=None):
+        """Schedules an app either every `interval` seconds or with a cron expression"""
+        if (interval is None) == (cron is None):
+            raise ValueError("Specify exactly one of interval or cron")
+        schedule = FixedRate(interval) if interval is not None else CronSchedule(cron)
+        job = ScheduledJob(app, schedule, overrun, bindings=bindings)
+        with self._lock:
+            self._jobs.append(job)
+            self._push(job, schedule.first(time.monotonic()))
+            self._lock.notify()
+        return job
+
+    def remove_app(self, job):
+        with self._lock:
+            job.cancelled = True
+            if job in self._jobs:
+                self._jobs.remove(job)
+
+    def jobs(self):
+        return list(self._jobs)
+
+    def _push(self, job, deadline):
+        self._sequence += 1
+        heapq.heappush(self._heap, (deadline, self._sequence, job))
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="AppSchedulerLoop", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        with self._lock:
+            self._running = False
+            self._lock.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+    def run_forever(self):
+        """Blocks until interrupted, used by the headless entry point"""
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1.0)
+        except KeyboardInterrupt:
+            self.write_fn("[SCHEDULER] Interrupted, waiting for running apps...\n")
+        finally:
+            self.stop()
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                while self._running and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._lock.wait(timeout)
+                if not self._running:
+                    return
+                deadline, _, job = heapq.heappop(self._heap)
+                if job.cancelled:
+                    continue
+                now = time.monotonic()
+                self._push(job, job.schedule.next_after(deadline, now))
+                job.stats["max_lateness"] = max(job.stats["max_lateness"], now - deadline)
+                self._tick(job)
+
+    def _tick(self, job):
+        """Called with the lock held when a deadline of the job is reached"""
+        if job.running:
+            if job.overrun == OVERRUN_COALESCE and not job.pending:
+                job.pending = True
+                job.stats["coalesced"] += 1
+            else:
+                job.stats["skipped"] += 1
+            return
+        if not self._slots.acquire(blocking=False):
+            job.stats["rejected"] += 1
+            self.write_fn(f"[SCHEDULER] Concurrency cap reached, skipping tick of '{job.name}'\n")
+            return
+        job.running = True
+        self._pool.submit(self._run_job, job)
+
+    def _run_job(self, job):
+        while True:
+            start = time.monotonic()
+            try:
+                invoke_iot_app(job.app, self.write_fn, self.input_fn, bindings=job.bindings, cache=self.cache)
+                job.stats["runs"] += 1
+            except Exception as e:
+                job.stats["failures"] += 1
+                self.write_fn(f"[SCHEDULER] Run of '{job.name}' failed: {e}\n")
+            job.stats["last_duration"] = time.monotonic() - start
+            with self._lock:
+                if job.pending and self._running and not job.cancelled:
+                    # Coalesced tick: run again right away, keeping the slot
+                    job.pending = False
+                    continue
+                job.running = False
+                self._slots.release()
+                return
+
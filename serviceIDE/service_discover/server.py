@@ -1,70 +1,173 @@
 import threading
 import time
 import queue
-import json
+import select
 import socket
 import struct
-import re
+import sys
 
-from service_discover.processor import process_tweet
+from service_discover.processor import process_tweet, TWEET_TYPES
+from service_discover.tweet_decoder import decode_tweet, TweetDecodeError, MAX_TWEET_SIZE
+from service_discover.metrics import metrics
 from models.base_classes import IoTContext
 
-# Code to communicate with the main application
-tweet_queue = queue.Queue()
-address_queue = queue.Queue()
-context = IoTContext()
+# Typed tweets (models.tweet) for downstream consumers, the oldest ones are dropped when nobody reads them
+TWEET_QUEUE_SIZE = 1024
+tweet_queue = queue.Queue(maxsize=TWEET_QUEUE_SIZE)
+# Upper bound on the things kept in memory, the least recently announced one is evicted first
+MAX_THINGS = 5000
+context = IoTContext(max_things=MAX_THINGS)
+
+# Linux reports the number of datagrams dropped by the kernel (socket buffer full)
+# as ancillary data when SO_RXQ_OVFL is enabled. Python does not export the constant.
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40 if sys.platform.startswith("linux") else None)
+DEFAULT_RCVBUF_SIZE = 4 * 1024 * 1024
+
+
+def publish_tweet(tweet):
+    """Appends a processed tweet to tweet_queue, discarding the oldest one if the queue is full"""
+    while True:
+        try:
+            tweet_queue.put_nowait(tweet)
+            return
+        except queue.Full:
+            try:
+                tweet_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def create_multicast_socket(multicast_group, port, rcvbuf_size=DEFAULT_RCVBUF_SIZE):
+    """Creates a non-blocking UDP socket bound to the port and joined to the multicast group"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if rcvbuf_size:
+        # The kernel may clamp this to net.core.rmem_max, the effective value is read back by the listener
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf_size)
+    if SO_RXQ_OVFL is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        except OSError:
+            pass
+    sock.bind(('', port))
+    join_multicast_group(sock, multicast_group)
+    sock.setblocking(False)
+    return sock
+
+
+def join_multicast_group(sock, multicast_group):
+    """Adds the membership of an additional multicast group to an already bound socket"""
+    local_ip = IoTContext._get_local_ip()
+    mreq = struct.pack("4s4s", socket.inet_aton(multicast_group), socket.inet_aton(local_ip))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+
 
 class TweetListener(threading.Thread):
-    def __init__(self, multicast_group='232.1.1.1', port=1235, buffer_size=1024):
+    def __init__(self, multicast_group='232.1.1.1', port=1235, buffer_size=MAX_TWEET_SIZE,
+                 rcvbuf_size=DEFAULT_RCVBUF_SIZE, batch_size=256, poll_timeout=0.5, verbose=True):
         super().__init__(daemon=True)
         self.multicast_group = multicast_group
         self.port = port
         self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.poll_timeout = poll_timeout
+        self.verbose = verbose
         self.running = True
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.sock.bind(('', self.port))
+        self.sock = create_multicast_socket(self.multicast_group, self.port, rcvbuf_size)
+        self.rcvbuf_size = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        self._ancbufsize = socket.CMSG_SPACE(4) if SO_RXQ_OVFL is not None else 0
 
-        local_ip = IoTContext._get_local_ip()
-        mreq = struct.pack("4s4s", socket.inet_aton(self.multicast_group), socket.inet_aton(local_ip))
-        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        # received: datagrams read from the socket, processed: handed to process_tweet,
+        # dropped: datagrams lost in user space (truncated, rejected by the decoder or failing in process_tweet),
+        # rejected: datagrams the decoder refused, by reason, ignored: tweets of other types (e.g. probes),
+        # kernel_drops: datagrams the kernel discarded because the socket buffer was full,
+        # overruns: bursts that filled a whole batch, i.e. the socket still had data queued
+        self.stats = {
+            "received": 0,
+            "processed": 0,
+            "dropped": 0,
+            "truncated": 0,
+            "kernel_drops": 0,
+            "overruns": 0,
+            "batches": 0,
+            "ignored": 0,
+            "rejected": {},
+        }
 
-    def fix_invalid_json(self, json_str):
-        """
-        Escapes incorrect quotes in the 'API' field
-        """
-        def escape_quotes(match):
-            field_content = match.group(1)
-            # Escape internal quotes with \"
-            field_content = field_content.replace('"', r'\"')
-            return f'"API": "{field_content}"'
+    def receive_batch(self):
+        """Drains up to batch_size datagrams from the socket without blocking"""
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                data, ancdata, flags, addr = self.sock.recvmsg(self.buffer_size, self._ancbufsize)
+            except (BlockingIOError, InterruptedError):
+                break
+            self.stats["received"] += 1
+            metrics.inc("tweets_received_total")
+            for level, type_, cmsg_data in ancdata:
+                if level == socket.SOL_SOCKET and type_ == SO_RXQ_OVFL and len(cmsg_data) >= 4:
+                    # Cumulative counter maintained by the kernel for this socket
+                    self.stats["kernel_drops"] = struct.unpack("I", cmsg_data[:4])[0]
+            if flags & socket.MSG_TRUNC:
+                self.stats["truncated"] += 1
+                self.stats["dropped"] += 1
+                metrics.inc("tweets_dropped_total", reason="truncated")
+                continue
+            batch.append((data, addr))
+        else:
+            self.stats["overruns"] += 1
+        self.stats["batches"] += 1
+        return batch
+
+    def handle_datagram(self, data, addr):
+        """Decodes a single datagram and updates the context"""
+        try:
+            tweet_data = decode_tweet(data, TWEET_TYPES)
+        except TweetDecodeError as e:
+            self.stats["dropped"] += 1
+            self.stats["rejected"][e.reason] = self.stats["rejected"].get(e.reason, 0) + 1
+            metrics.inc("tweets_dropped_total", reason=e.reason)
+            if self.verbose:
+                print(f"[Listener] Rejected datagram from {addr}: {e}")
+            return
+        if tweet_data is None:
+            self.stats["ignored"] += 1
+            return
+        if self.verbose:
+            print(f"[Listener] Received {tweet_data['Tweet Type']} tweet from {addr}")
+
+        try:
+            tweet_obj = process_tweet(tweet_data, addr, context=context)
+            self.stats["processed"] += 1
+            metrics.inc("tweets_processed_total")
+            if tweet_obj is not None:
+                publish_tweet(tweet_obj)
+
+        except Exception as e:
+            self.stats["dropped"] += 1
+            metrics.inc("tweets_dropped_total", reason="error")
+            print(f"[Listener] Error while receiving or processing tweet: {e}")
 
-        # Match field "API": "value with unescaped quotes"
-        fixed_str = re.sub(r'"API"\s*:\s*"([^"]+:\[.*?\]\:\(.*?\))"', escape_quotes, json_str)
-        return fixed_str
+    def get_stats(self):
+        """Returns a copy of the receive counters"""
+        return dict(self.stats, rejected=dict(self.stats["rejected"]), rcvbuf_size=self.rcvbuf_size)
 
     def run(self):
         print("[Listener] Starting tweet listener on multicast group...")
         while self.running:
             try:
-                data, addr = self.sock.recvfrom(self.buffer_size)
-                tweet_json = data.decode('utf-8')
-                print(f"[Listener] Received tweet from {addr}: {tweet_json}")
-
-                # Fix JSON if malformed
-                tweet_json = self.fix_invalid_json(tweet_json)
-
-                tweet_data = json.loads(tweet_json)
-
-                tweet_obj = process_tweet(tweet_data, addr, context=context)
-                if tweet_obj:
-                    tweet_queue.put(tweet_obj)
-                    address_queue.put(addr)
-
-            except Exception as e:
+                # Sleep in the kernel until data arrives, then empty the socket in bursts
+                readable, _, _ = select.select([self.sock], [], [], self.poll_timeout)
+                if not readable:
+                    continue
+                for data, addr in self.receive_batch():
+                    self.handle_datagram(data, addr)
+            except (OSError, ValueError) as e:
+                if not self.running:
+                    break
                 print(f"[Listener] Error while receiving or processing tweet: {e}")
-            time.sleep(0.1)
+                time.sleep(self.poll_timeout)
 
     def stop(self):
         self.running = False
@@ -0,0 +1,73 @@
+import threading
+
+from service_discover.metrics import metrics
+
+# Only idempotent reads are shared by default: two identical Actions are two intended effects
+COALESCED_TYPES = frozenset({"report"})
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls: the first caller of a key runs the function,
+    the callers arriving while it is in flight wait for it and get the same result (or exception).
+    Nothing is kept once the call completes, see ResponseCache for reuse over time.
+    """
+
+    def __init__(self):
+        self.stats = {"calls": 0, "executed": 0, "coalesced": 0}
+        self._in_flight = {}  # key -> _Call
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns (result, shared): shared is True when the result came from another caller's call"""
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._in_flight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._in_flight[key] = _Call()
+                self.stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            metrics.inc("calls_coalesced_total")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def get_stats(self):
+        """Returns a copy of the counters"""
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._in_flight))
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from models.base_classes import THING, ENTITY, SERVICE, RELATIONSHIP
+
+# Things re-announce themselves every TWEET_INTERVAL (120s in mock_tweeter):
+# an object is evicted after missing three announcement cycles
+DEFAULT_TTL = 360.0
+DEFAULT_SWEEP_INTERVAL = 30.0
+
+
+class TTLSweeper:
+    """
+    Background thread that periodically evicts the things, entities and services
+    of the context that have not been announced for more than `ttl` seconds.
+    """
+
+    def __init__(self, context, ttl=DEFAULT_TTL, interval=DEFAULT_SWEEP_INTERVAL, verbose=True):
+        if ttl <= 0 or interval <= 0:
+            raise ValueError("ttl and interval must be positive")
+        self.context = context
+        self.ttl = ttl
+        self.interval = interval
+        self.verbose = verbose
+        self.stats = {"sweeps": 0, "evicted": 0, THING: 0, ENTITY: 0, SERVICE: 0, RELATIONSHIP: 0}
+        self._stop = threading.Event()
+        self._thread = None
+        context.add_eviction_listener(self._count)
+
+    def _count(self, kind, key, obj):
+        self.stats[kind] += 1
+        if self.verbose and kind == THING:
+            print(f"[Sweeper] Evicted thing {key} ({obj.name}), not seen for "
+                  f"{time.monotonic() - obj.last_seen:.0f}s")
+
+    def sweep(self, now=None):
+        """Runs one eviction pass, returns the number of evicted objects"""
+        evicted = self.context.evict_stale(self.ttl, now=now)
+        self.stats["sweeps"] += 1
+        if evicted:
+            self.stats["evicted"] += evicted
+            if self.verbose:
+                print(f"[Sweeper] {evicted} stale objects evicted")
+        return evicted
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"[Sweeper] Error during sweep: {e}")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="TTLSweeper", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_stats(self):
+        """Returns a copy of the eviction counters"""
+        return dict(self.stats)
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+TRACE_FORMAT = 1
+DEFAULT_TRACE_PATH = os.path.join(os.path.expanduser("~"), ".serviceIDE", "traces.jsonl")
+DEFAULT_MAX_BYTES = 1024 * 1024  # size of the trace file before it is rolled over
+DEFAULT_BACKUPS = 2               # rolled over files kept: traces.jsonl.1, traces.jsonl.2
+
+# Span kinds
+RUN = "run"          # the whole app run
+SERVICE = "service"  # a service instance, from the build of its request to its result
+BUILD = "build"      # build_request, user input included
+CALL = "call"        # the outbound call, retries included
+CACHED = "cached"    # response taken from the ResponseCache
+EDGE = "edge"        # relationship decision, instantaneous
+SKIPPED = "skipped"  # service not run because no incoming relationship fired
+
+# Positional fields of a stored span
+SPAN_FIELDS = ("id", "parent", "kind", "name", "start", "duration", "attrs")
+
+
+class Trace:
+    """
+    Spans of one app run. Times are given as time.perf_counter() values and stored
+    as milliseconds from the start of the run. Spans can be added from any worker thread.
+    """
+
+    def __init__(self, app_name, origin=None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.app_name = app_name
+        self.started_at = time.time()
+        self.origin = time.perf_counter() if origin is None else origin
+        self.spans = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def new_id(self):
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+            return span_id
+
+    def add(self, kind, name, start, end=None, parent=None, span_id=None, **attrs):
+        """Records a span, end=None for an instantaneous event; returns its id"""
+        if span_id is None:
+            span_id = self.new_id()
+        end = start if end is None else end
+        span = [span_id, parent, kind, name, round((start - self.origin) * 1000, 3),
+                round((end - start) * 1000, 3), attrs or None]
+        with self._lock:
+            self.spans.append(span)
+        return span_id
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: (span[4], span[0]))
+        return {"format": TRACE_FORMAT, "id": self.trace_id, "app": self.app_name,
+                "started_at": self.started_at, "spans": spans}
+
+
+def span_dicts(trace):
+    """Spans of an encoded trace as dicts, in start order"""
+    return [dict(zip(SPAN_FIELDS, span)) for span in trace["spans"]]
+
+
+class TraceStore:
+    """
+    Appends traces to a JSON Lines file, one compact line per run. Past max_bytes the file
+    is rolled over (traces.jsonl -> traces.jsonl.1 -> ...) and only `backups` old files are kept.
+    """
+
+    def __init__(self, path=DEFAULT_TRACE_PATH, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS, enabled=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def _files(self):
+        """Trace files, newest first"""
+        return [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+
+    def _roll_over(self):
+        files = self._files()
+        for older, newer in reversed(list(zip(files[1:], files[:-1]))):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+
+    def save(self, trace):
+        if not self.enabled:
+            return
+        line = json.dumps(trace.to_dict(), separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self._roll_over()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"[Trace] Could not save the trace of {trace.app_name}: {e}")
+
+    def recent(self, app_name=None, limit=50):
+        """Stored traces, newest first, optionally only those of one app"""
+        traces = []
+        with self._lock:
+            for path in self._files():
+                if not os.path.exists(path):
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+                for line in reversed(lines):
+                    try:
+                        trace = json.loads(line)
+                    except ValueError:
+                        continue  # line cut by a crash while writing
+                    if trace.get("format") != TRACE_FORMAT or (app_name is not None and trace.get("app") != app_name):
+                        continue
+                    traces.append(trace)
+                    if len(traces) >= limit:
+                        return traces
+        return traces
+
+    def latest(self, app_name=None):
+        traces = self.recent(app_name, limit=1)
+        return traces[0] if traces else None
+
+
+trace_store = TraceStore()
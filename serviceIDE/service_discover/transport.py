@@ -0,0 +1,222 @@
+import json
+import select
+import socket
+import threading
+import time
+
+DEFAULT_ATLAS_PORT = 6668  # Used when the thing did not announce an Identity_Language port
+DEFAULT_TIMEOUT = 10.0
+MAX_RESPONSE_SIZE = 1024 * 1024
+RECV_CHUNK_SIZE = 4096
+# A connection must stay open this long after a reply before its endpoint is trusted to keep connections open
+KEEPALIVE_PROBE_DELAY = 0.1
+
+_decoder = json.JSONDecoder()
+
+
+def is_complete_message(buffer: bytes) -> bool:
+    """
+    A response is complete when it ends with a newline delimiter or
+    when it holds a whole JSON document (Atlas replies with one JSON object).
+    """
+    stripped = buffer.rstrip()
+    if not stripped:
+        return False
+    if buffer.endswith(b"\n"):
+        return True
+    if stripped[-1:] not in (b"}", b"]"):
+        return False
+    try:
+        _decoder.raw_decode(stripped.decode("utf-8"))
+        return True
+    except (ValueError, UnicodeDecodeError):
+        return False
+
+
+def read_message(sock, max_size=MAX_RESPONSE_SIZE):
+    """
+    Reads from the socket until the message is complete or the peer closes.
+    Returns (data, peer_closed).
+    """
+    buffer = bytearray()
+    while True:
+        chunk = sock.recv(RECV_CHUNK_SIZE)
+        if not chunk:
+            return bytes(buffer), True
+        buffer += chunk
+        if len(buffer) > max_size:
+            raise ValueError(f"Response larger than {max_size} bytes")
+        if is_complete_message(buffer):
+            return bytes(buffer), False
+
+
+def _peer_closed(sock) -> bool:
+    """Checks without blocking whether the peer already closed an idle connection"""
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except OSError:
+        return True
+
+
+class ConnectionPool:
+    """
+    Keeps idle connections per (ip, port).
+    An endpoint is trusted to keep connections open only once an idle connection to it was still open
+    KEEPALIVE_PROBE_DELAY after the reply; until then each call gets a new connection. Endpoints that
+    close the connection after each reply are remembered and served with one-shot connections from then on.
+    """
+
+    def __init__(self, max_idle_per_endpoint=4, idle_timeout=30.0):
+        self.max_idle_per_endpoint = max_idle_per_endpoint
+        self.idle_timeout = idle_timeout
+        self._idle = {}  # (ip, port) -> [(socket, released_at)]
+        self._keepalive = {}  # (ip, port) -> bool, missing while unknown
+        self._lock = threading.Lock()
+        self.stats = {"connects": 0, "reused": 0, "one_shot": 0}
+
+    def supports_keepalive(self, endpoint):
+        """True only once the endpoint was seen keeping a connection open"""
+        return self._keepalive.get(endpoint, False)
+
+    def acquire(self, endpoint, timeout):
+        """Returns (socket, reused)"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                idle = self._idle.get(endpoint)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+            sock, released_at = entry
+            if now - released_at > self.idle_timeout:
+                sock.close()
+                continue
+            if _peer_closed(sock):
+                if endpoint not in self._keepalive:
+                    self.mark_one_shot(endpoint)
+                sock.close()
+                continue
+            if endpoint not in self._keepalive:
+                if now - released_at < KEEPALIVE_PROBE_DELAY:
+                    # Too early to tell whether the thing is about to close it
+                    sock.close()
+                    continue
+                self._keepalive[endpoint] = True
+            sock.settimeout(timeout)
+            self.stats["reused"] += 1
+            return sock, True
+
+        sock = socket.create_connection(endpoint, timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stats["connects"] += 1
+        if self._keepalive.get(endpoint) is False:
+            self.stats["one_shot"] += 1
+        return sock, False
+
+    def release(self, endpoint, sock, peer_closed):
+        """Returns the connection to the pool, or closes it if the endpoint does not keep it open"""
+        if peer_closed:
+            self.mark_one_shot(endpoint)
+        # Connections to an endpoint of unknown behaviour are kept too: acquire() decides whether to trust them
+        if peer_closed or self._keepalive.get(endpoint) is False or _peer_closed(sock):
+            sock.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(endpoint, [])
+            if len(idle) < self.max_idle_per_endpoint:
+                idle.append((sock, time.monotonic()))
+                return
+        sock.close()
+
+    def mark_one_shot(self, endpoint):
+        """Stops pooling connections for an endpoint that does not keep them open"""
+        self._keepalive[endpoint] = False
+
+    def discard(self, sock):
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for sock, _ in connections:
+                sock.close()
+
+
+def _record_phases(timings, start, connected, sent):
+    """Fills the timings dict of a request, if the caller asked for one"""
+    if timings is not None:
+        timings.update(connect=connected - start, send=sent - connected, receive=time.perf_counter() - sent)
+
+
+class AtlasTransport:
+    """Sends service calls to Atlas things over pooled TCP connections"""
+
+    def __init__(self, pool=None):
+        self.pool = pool if pool is not None else ConnectionPool()
+
+    def request(self, ip, port, payload: bytes, timeout=DEFAULT_TIMEOUT, timings=None) -> str:
+        """
+        Sends the payload and returns the response.
+        If a timings dict is given, it receives the "connect", "send" and "receive" durations in seconds.
+        """
+        endpoint = (ip, int(port) if port else DEFAULT_ATLAS_PORT)
+        start = time.perf_counter()
+        sock, reused = self.pool.acquire(endpoint, timeout)
+        sent = connected = time.perf_counter()
+        try:
+            sock.sendall(payload)
+        except OSError:
+            self.pool.discard(sock)
+            # A pooled connection closed by the thing while idle: the request did not get through,
+            # it can be sent once more on a new connection
+            if reused:
+                return self._one_shot(endpoint, payload, timeout, timings)
+            _record_phases(timings, start, connected, sent)
+            raise
+        sent = time.perf_counter()
+        try:
+            data, peer_closed = read_message(sock)
+        except (OSError, ValueError) as e:
+            # The thing may have received the request: resending it is up to the caller (see RetryPolicy)
+            self.pool.discard(sock)
+            if reused and isinstance(e, ConnectionError):
+                # A reused connection reset before the reply: the thing closes its connections after all
+                self.pool.mark_one_shot(endpoint)
+            raise
+        finally:
+            _record_phases(timings, start, connected, sent)
+        if peer_closed and not data:
+            self.pool.discard(sock)
+            if reused:
+                self.pool.mark_one_shot(endpoint)
+            raise ConnectionError(f"{endpoint[0]}:{endpoint[1]} closed the connection without a response")
+        self.pool.release(endpoint, sock, peer_closed)
+        return data.decode("utf-8")
+
+    def _one_shot(self, endpoint, payload, timeout, timings=None):
+        """Sends the request on a fresh connection that is closed afterwards"""
+        start = time.perf_counter()
+        with socket.create_connection(endpoint, timeout=timeout) as sock:
+            connected = time.perf_counter()
+            self.pool.stats["connects"] += 1
+            sock.sendall(payload)
+            sent = time.perf_counter()
+            data, _ = read_message(sock)
+        _record_phases(timings, start, connected, sent)
+        if not data:
+            raise ConnectionError(f"{endpoint[0]}:{endpoint[1]} closed the connection without a response")
+        return data.decode("utf-8")
+
+    def close(self):
+        self.pool.close_all()
+
+
+# Shared by every service call of the IDE
+transport = AtlasTransport()
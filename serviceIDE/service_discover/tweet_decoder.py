@@ -0,0 +1,81 @@
+import json
+import re
+
+# Largest datagram accepted, the listeners read at most this many bytes
+MAX_TWEET_SIZE = 8192
+
+_OBJECT_START = re.compile(rb'\s*\{')
+_TWEET_TYPE = re.compile(rb'"Tweet Type"\s*:\s*"([^"\\]{1,64})"')
+_API_KEY = re.compile(r'"API"\s*:\s*"')
+# End of an API value: the closing parenthesis of the output followed by the closing quote
+_API_END = re.compile(r'\)"\s*[,}]')
+
+_decoder = json.JSONDecoder()
+
+
+class TweetDecodeError(ValueError):
+    """A datagram that is not a valid tweet, reason is a short tag used for the listener stats"""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+def peek_tweet_type(data):
+    """Reads the "Tweet Type" of a raw datagram without decoding it, None if missing"""
+    match = _TWEET_TYPE.search(data)
+    if match is None:
+        return None
+    return match.group(1).decode('ascii', 'replace')
+
+
+def repair_api_field(text):
+    """
+    Escapes the quotes that Atlas leaves unescaped inside the "API" value, e.g.
+    "API": "CheckFlameStatus:[NULL]:("flameStatus",int, NULL)". Only the API value is scanned.
+    """
+    match = _API_KEY.search(text)
+    if match is None:
+        return text
+    start = match.end()
+    end = _API_END.search(text, start)
+    if end is None:
+        return text
+    stop = end.start() + 1  # the closing quote of the value
+    value = text[start:stop]
+    if '"' not in value or '\\"' in value:
+        return text
+    return text[:start] + value.replace('"', '\\"') + text[stop:]
+
+
+def decode_tweet(data, accepted=None):
+    """
+    Turns a raw datagram into a tweet dict.
+    Returns None for well-formed tweets of a type not in `accepted` (e.g. discovery probes, when given),
+    raises TweetDecodeError for oversized or garbage datagrams. The checks that reject garbage
+    run on the raw bytes, the payload is decoded to text only once.
+    """
+    if len(data) > MAX_TWEET_SIZE:
+        raise TweetDecodeError("oversized", f"datagram of {len(data)} bytes")
+    start = _OBJECT_START.match(data)
+    if start is None:
+        raise TweetDecodeError("garbage", "datagram is not a JSON object")
+    tweet_type = peek_tweet_type(data)
+    if tweet_type is None:
+        raise TweetDecodeError("garbage", "datagram has no Tweet Type")
+    if accepted is not None and tweet_type not in accepted:
+        return None
+
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise TweetDecodeError("garbage", f"invalid UTF-8: {e}")
+    if tweet_type == "Service":
+        text = repair_api_field(text)
+    try:
+        tweet, end = _decoder.raw_decode(text, start.end() - 1)
+    except ValueError as e:
+        raise TweetDecodeError("invalid", f"invalid {tweet_type} tweet: {e}")
+    if text[end:].strip():
+        raise TweetDecodeError("invalid", f"trailing data after the {tweet_type} tweet")
+    return tweet
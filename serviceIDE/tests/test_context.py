@@ -0,0 +1,73 @@
+import sys
+import threading
+
+from models.base_classes import IoTContext, SERVICE, ADDED, REMOVED, CHANGELOG_SIZE
+from service_discover.processor import process_tweet
+from benchmarks.bench_listener import make_thing_tweets
+
+ADDR = ("10.0.0.1", 1235)
+
+
+def test_changes_since_while_writers_run():
+    context = IoTContext(max_things=50)
+    stop = threading.Event()
+    errors = []
+    views = []
+
+    def writer(offset):
+        for i in range(offset, offset + 2000):
+            for tweet in make_thing_tweets(i):
+                process_tweet(tweet, ADDR, context=context)
+
+    def reader():
+        services, seen = set(), [0]
+        views.append(services)
+        try:
+            while not stop.is_set():
+                follow(services, seen)
+            follow(services, seen)
+        except Exception as e:
+            errors.append(e)
+
+    def follow(services, seen):
+        # Same incremental refresh as the GUI tabs
+        changes = context.changes_since(seen[0])
+        if changes is None:
+            with context._lock:
+                services.clear()
+                services.update(context._service_index)
+                seen[0] = context.version
+            return
+        for action, kind, key in changes:
+            if kind == SERVICE:
+                if action == ADDED:
+                    services.add(key)
+                elif action == REMOVED:
+                    services.discard(key)
+        seen[0] += len(changes)
+
+    def long_reader():
+        # Walks a long tail of the changelog, the window in which writers append is wide
+        try:
+            while not stop.is_set():
+                context.changes_since(max(0, context.version - CHANGELOG_SIZE // 2))
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(2)] + [threading.Thread(target=long_reader)]
+    writers = [threading.Thread(target=writer, args=(offset,)) for offset in (0, 100000)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for t in readers + writers:
+            t.start()
+        for t in writers:
+            t.join()
+        stop.set()
+        for t in readers:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+    for services in views:
+        assert services == set(context._service_index)
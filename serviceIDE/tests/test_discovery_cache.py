@@ -0,0 +1,33 @@
+import json
+
+from models.base_classes import IoTContext
+from service_discover.discovery_cache import encode_snapshot, decode_state
+
+
+def round_trip(context):
+    state = json.loads(json.dumps(encode_snapshot(context.snapshot())))
+    things, relationships = decode_state(state)
+    return {thing.id: thing for thing in things}, relationships
+
+
+def test_round_trip_keeps_things_entities_and_services():
+    context = IoTContext()
+    context.add_thing("T1", ("10.0.0.5", 1235), "Pi", "S", "ZeroW", "Lab", "RaspberryPiCo", "unit")
+    context.add_entity_to_thing("T1", "TemperatureSensor", "E1", "S", "Sensor", "", "Temp sensor", "")
+    context.add_service_to_entity("T1", "GetTemperature", "E1", "S", "GetTemperature:[NULL]:(temperature,float,NULL)",
+                                  "Report", "Environment", "Reads temperature", "temperature", "10.0.0.5")
+    things, _ = round_trip(context)
+    thing = things["T1"]
+    assert thing.address == ("10.0.0.5", 1235)
+    assert thing.entities[0].entity_id == "E1"
+    service = thing.entities[0].services[0]
+    assert (service.name, service.output_name, service.output_type) == ("GetTemperature", "temperature", "float")
+
+
+def test_round_trip_keeps_a_plain_ip_address():
+    context = IoTContext()
+    context.add_thing("T1", "10.0.0.5", "Pi", "S", "ZeroW", "Lab", "RaspberryPiCo", "unit")
+    context.add_thing("T2", None, "Pi", "S", "ZeroW", "Lab", "RaspberryPiCo", "unit")
+    things, _ = round_trip(context)
+    assert things["T1"].address == "10.0.0.5"
+    assert things["T2"].address == ()
@@ -0,0 +1,22 @@
+import pytest
+
+from service_discover.health import percentile
+
+
+@pytest.mark.parametrize("values, fraction, expected", [
+    ([1, 2], 0.5, 1),
+    ([1, 2, 3, 4], 0.5, 2),
+    ([1, 2, 3, 4], 0.75, 3),
+    ([1, 2, 3, 4], 0.9, 4),
+    (list(range(1, 11)), 0.9, 9),
+    (list(range(1, 101)), 0.99, 99),
+    (list(range(1, 101)), 0.07, 7),
+    ([5], 0.99, 5),
+    ([1, 2, 3], 0.0, 1),
+])
+def test_percentile_is_nearest_rank(values, fraction, expected):
+    assert percentile(values, fraction) == expected
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 0.5) is None
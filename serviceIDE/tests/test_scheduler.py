@@ -0,0 +1,41 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from service_discover.scheduler import CronSchedule
+
+
+def next_by_minute(schedule, after):
+    """Reference search, one minute at a time"""
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while True:
+        if (moment.minute in schedule.minutes and moment.hour in schedule.hours
+                and moment.month in schedule.months and schedule._day_matches(moment)):
+            return moment
+        moment += timedelta(minutes=1)
+
+
+@pytest.mark.parametrize("expression", ["* * * * *", "5/15 * * * *", "30 4 1,15 * 5", "0 */6 * * 1-5",
+                                        "59 23 * * *", "*/7 9-17 10-20 * *"])
+def test_next_wall_time_matches_minute_by_minute_search(expression):
+    schedule = CronSchedule(expression)
+    for day in range(0, 3 * 365, 73):
+        after = datetime(2025, 1, 1, 13, 27, 41) + timedelta(days=day, minutes=day * 7)
+        assert schedule._next_wall_time(after) == next_by_minute(schedule, after)
+
+
+def test_rare_expression_is_found_quickly():
+    schedule = CronSchedule("0 0 29 2 *")
+    start = time.perf_counter()
+    assert schedule._next_wall_time(datetime(2096, 3, 1)) == datetime(2104, 2, 29)
+    assert time.perf_counter() - start < 0.05
+
+
+def test_step_on_a_single_value():
+    assert sorted(CronSchedule("5/15 * * * *").minutes) == [5, 20, 35, 50]
+
+
+def test_impossible_expression():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *")._next_wall_time(datetime(2026, 1, 1))
@@ -0,0 +1,91 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from service_discover.transport import AtlasTransport, KEEPALIVE_PROBE_DELAY
+
+REPLY = b'{"Status":"Successful"}'
+
+
+def start_server(handle):
+    """Serves each connection with handle(conn) on its own thread, returns the port"""
+    srv = socket.socket()
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind(("127.0.0.1", 0))
+    srv.listen(64)
+
+    def serve():
+        while True:
+            try:
+                conn, _ = srv.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return srv, srv.getsockname()[1]
+
+
+def close_after_reply(delay):
+    def handle(conn):
+        if conn.recv(4096):
+            conn.sendall(REPLY)
+            time.sleep(delay)
+        conn.close()
+    return handle
+
+
+def keep_open(conn):
+    with conn:
+        while conn.recv(4096):
+            conn.sendall(REPLY)
+
+
+@pytest.mark.parametrize("delay", [0, 0.005])
+def test_thing_closing_after_reply_is_never_reused(delay):
+    srv, port = start_server(close_after_reply(delay))
+    transport = AtlasTransport()
+    try:
+        for _ in range(20):
+            assert transport.request("127.0.0.1", port, b"{}", timeout=2) == REPLY.decode()
+        assert transport.pool.stats["reused"] == 0
+        assert not transport.pool.supports_keepalive(("127.0.0.1", port))
+    finally:
+        transport.close()
+        srv.close()
+
+
+def test_thing_closing_late_is_marked_one_shot():
+    srv, port = start_server(close_after_reply(KEEPALIVE_PROBE_DELAY * 2))
+    transport = AtlasTransport()
+    endpoint = ("127.0.0.1", port)
+    try:
+        transport.request(*endpoint, b"{}", timeout=2)
+        time.sleep(KEEPALIVE_PROBE_DELAY * 1.5)
+        # Still open after the probe delay: trusted, but the thing closes it while the request is sent
+        with pytest.raises(ConnectionError):
+            transport.request(*endpoint, b"{}", timeout=2)
+        assert not transport.pool.supports_keepalive(endpoint)
+        assert transport.request(*endpoint, b"{}", timeout=2) == REPLY.decode()
+        assert transport.pool.stats["one_shot"] == 1
+    finally:
+        transport.close()
+        srv.close()
+
+
+def test_keepalive_thing_is_reused_once_confirmed():
+    srv, port = start_server(keep_open)
+    transport = AtlasTransport()
+    try:
+        transport.request("127.0.0.1", port, b"{}", timeout=2)
+        time.sleep(KEEPALIVE_PROBE_DELAY * 1.5)
+        for _ in range(5):
+            transport.request("127.0.0.1", port, b"{}", timeout=2)
+        assert transport.pool.supports_keepalive(("127.0.0.1", port))
+        assert transport.pool.stats["connects"] == 1
+        assert transport.pool.stats["reused"] == 5
+    finally:
+        transport.close()
+        srv.close()